@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+#
+# Benchmarks de los caminos calientes del tablero, el agente y el dibujo.
+# Se corren con `python -m benchmarks run` y se comparan con
+# `python -m benchmarks compare base.json nuevo.json`.
@@ -0,0 +1,74 @@
+# benchmarks/__main__.py
+#
+# Línea de comandos de los benchmarks:
+#   python -m benchmarks run [--salida base.json] [--filtro board agent ...]
+#   python -m benchmarks compare base.json nuevo.json [--umbral 0.1] [--relativo]
+#
+# benchmarks/baselines/referencia.json se grabó en una sola máquina (la que
+# figura en su campo 'machine'): comparar tiempos absolutos contra ella solo
+# dice algo en esa máquina. En otra, hay que grabar una base propia o usar
+# --relativo, que compara cada tiempo dividido por calibration.python de su
+# misma corrida.
+
+import argparse
+import json
+import sys
+
+from benchmarks.suite import REFERENCIA, REPETICIONES, compare, run
+
+
+def _format(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * scale >= 1:
+            return f'{seconds * scale:8.2f} {unit}'
+    return f'{seconds * 1e9:8.1f} ns'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks del Mundo de Wumpus')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    correr = sub.add_parser('run', help='corre los benchmarks')
+    correr.add_argument('--salida', help='guarda los resultados en este JSON')
+    correr.add_argument('--filtro', nargs='*', help='solo los benchmarks cuyo nombre contenga alguno')
+    correr.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    comparar = sub.add_parser('compare', help='compara dos JSON y marca regresiones')
+    comparar.add_argument('base')
+    comparar.add_argument('nuevo')
+    comparar.add_argument('--umbral', type=float, default=0.10,
+                          help='diferencia relativa a partir de la cual se marca (0.10 = 10%%)')
+    comparar.add_argument('--relativo', action='store_true',
+                          help=f'compara los tiempos divididos por {REFERENCIA} de cada corrida '
+                               '(para corridas de máquinas distintas)')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'run':
+        def progress(name, result):
+            if result is None:
+                print(f'{name:32} (omitido)')
+            else:
+                memory = f'  memoria {result["bytes"] / 1024:.1f} KiB' if 'bytes' in result else ''
+                print(f'{name:32} {_format(result["median"])}/op  (mejor {_format(result["best"]).strip()}){memory}')
+        results = run(args.filtro, args.repeticiones, progress)
+        if args.salida:
+            with open(args.salida, 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.nuevo) as f:
+        new = json.load(f)
+    if not args.relativo and base.get('machine') != new.get('machine'):
+        print('Aviso: las corridas son de máquinas distintas; los tiempos absolutos '
+              'no son comparables (usar --relativo)', file=sys.stderr)
+    rows = compare(base, new, args.umbral, args.relativo)
+    for name, old, current, ratio, status in rows:
+        if args.relativo:
+            print(f'{name:32} {old:9.2f} -> {current:9.2f}  x{ratio:5.2f}  {status}')
+        else:
+            print(f'{name:32} {_format(old)} -> {_format(current)}  x{ratio:5.2f}  {status}')
+    return 1 if any(status == 'REGRESIÓN' for *_, status in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
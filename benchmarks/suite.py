@@ -0,0 +1,478 @@
+# benchmarks/suite.py
+#
+# Definición de los benchmarks y el arnés que los mide.
+
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from functools import lru_cache
+
+from src.board import Board
+from src.agent import Agent
+from src.knowledge import KNOWLEDGE_BACKENDS
+from src.policytable import default_table
+from src.rules import initial_state, is_over, step
+from src.simulation import run_episode
+
+BENCHMARKS = {}       # nombre -> (función, es_macro)
+TIEMPO_MINIMO = 0.05  # Segundos mínimos por repetición de un micro-benchmark
+REPETICIONES = 5
+REFERENCIA = 'calibration.python'  # Mide la máquina, no el juego (ver compare)
+
+
+def benchmark(name, macro=False):
+    """
+    Registra un benchmark.
+
+    La función recibe loops y devuelve (segundos, operaciones), o
+    (segundos, operaciones, bytes) si además informa la memoria que ocupa
+    lo medido. Los micro se calibran subiendo loops hasta que una corrida
+    dura TIEMPO_MINIMO; los macro se corren una vez por repetición con
+    loops=1 y cuentan sus propias operaciones (episodios o pasos).
+    """
+    def register(fn):
+        BENCHMARKS[name] = (fn, macro)
+        return fn
+    return register
+
+
+# --- Calibración: Python puro, sin código del juego ---
+@benchmark(REFERENCIA)
+def bench_calibration(loops):
+    # Trabajo fijo de diccionarios, enteros y llamadas: cambia con la máquina
+    # y la versión de Python, nunca con el repo
+    inicio = time.perf_counter()
+    total = 0
+    for i in range(loops):
+        d = {}
+        for k in range(16):
+            d[k] = k * i
+        total += sum(d.values()) + len(str(i))
+    return time.perf_counter() - inicio, loops
+
+
+# --- Micro: tablero ---
+@benchmark('board.perceive')
+def bench_perceive(loops):
+    board = Board(5, rng=random.Random(1))
+    cells = [(x, y) for x in range(5) for y in range(5)]
+    perceive = board.perceive
+    inicio = time.perf_counter()
+    for i in range(loops):
+        x, y = cells[i % 25]
+        perceive(x, y, False)
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('board.percept_flags')
+def bench_percept_flags(loops):
+    board = Board(5, rng=random.Random(1))
+    cells = [(x, y) for x in range(5) for y in range(5)]
+    flags = board.percept_flags
+    inicio = time.perf_counter()
+    for i in range(loops):
+        x, y = cells[i % 25]
+        flags(x, y, False)
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('board.shoot_arrow')
+def bench_shoot_arrow(loops):
+    # Mitad de los disparos aciertan (el Wumpus revive para el siguiente)
+    board = Board(5, rng=random.Random(1))
+    wx, wy = board.wumpus_pos
+    shots = [(wx, 0, 'RIGHT') if wy > 0 else (wx, 4, 'LEFT'), (0, 0, 'UP')]
+    shoot = board.shoot_arrow
+    inicio = time.perf_counter()
+    for i in range(loops):
+        x, y, direction = shots[i & 1]
+        shoot(x, y, direction)
+        board.wumpus_alive = True
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('rules.step')
+def bench_rules_step(loops):
+    # Acciones al azar desde el estado inicial; al terminar se vuelve a él
+    board = Board(5, rng=random.Random(1))
+    rng = random.Random(7)
+    actions = [rng.randrange(8) for _ in range(1024)]
+    start = state = initial_state(2)
+    inicio = time.perf_counter()
+    for i in range(loops):
+        state, _ = step(board, state, actions[i & 1023])
+        if is_over(state):
+            state = start
+    return time.perf_counter() - inicio, loops
+
+
+def _bench_place(size, loops):
+    board = Board(size, rng=random.Random(1))
+    n = size * size
+    inicio = time.perf_counter()
+    for _ in range(loops):
+        board.cells = bytearray(n)
+        board.place_elements()
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('board.place_elements_5x5')
+def bench_place_5(loops):
+    return _bench_place(5, loops)
+
+
+@benchmark('board.place_elements_512x512')
+def bench_place_512(loops):
+    return _bench_place(512, loops)
+
+
+# --- Micro: agente (solo el tiempo de auto_move dentro de episodios reales) ---
+def _bench_auto_move(reasoning, loops):
+    # Los episodios los juega run_episode (las reglas de src.rules.step); solo
+    # se cronometran las llamadas a auto_move
+    rng = random.Random(2)
+    timing = [0.0, 0]
+
+    def timed(auto_move):
+        def measured(board, heard_scream):
+            inicio = time.perf_counter()
+            direction = auto_move(board, heard_scream)
+            timing[0] += time.perf_counter() - inicio
+            timing[1] += 1
+            return direction
+        return measured
+
+    while timing[1] < loops:
+        board = Board(5, rng=rng)
+        agent = Agent(5, rng=rng, reasoning=reasoning)
+        agent.auto_move = timed(agent.auto_move)
+        run_episode(board, agent, max_steps=200)
+    return timing[0], timing[1]
+
+
+@benchmark('agent.auto_move_basic')
+def bench_auto_move_basic(loops):
+    return _bench_auto_move('basic', loops)
+
+
+@benchmark('agent.auto_move_probabilistic')
+def bench_auto_move_probabilistic(loops):
+    return _bench_auto_move('probabilistic', loops)
+
+
+@benchmark('agent.auto_move_logic')
+def bench_auto_move_logic(loops):
+    return _bench_auto_move('logic', loops)
+
+
+@benchmark('agent.auto_move_search')
+def bench_auto_move_search(loops):
+    return _bench_auto_move('search', loops)
+
+
+@benchmark('agent.auto_move_table')
+def bench_auto_move_table(loops):
+    # Solo con la tabla compilada (python -m src.policytable compilar)
+    if default_table(5) is None:
+        return None
+    return _bench_auto_move('table', loops)
+
+
+# --- Micro: backends de conocimiento del agente ---
+@lru_cache(maxsize=None)
+def _exploration(size):
+    # Guion fijo de una exploración: casillas en orden de recorrido en anchura
+    # desde (0, 0) y, para cada una, si se percibió algo (no se marcan vecinas)
+    rng = random.Random(5)
+    order, seen = [(0, 0)], {(0, 0)}
+    for x, y in order:
+        for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= n[0] < size and 0 <= n[1] < size and n not in seen:
+                seen.add(n)
+                order.append(n)
+    return tuple((pos, rng.random() < 0.3) for pos in order)
+
+
+def _explore(knowledge, script, rng):
+    # Lo que hace el agente con su memoria en cada paso: visitar, marcar,
+    # preguntar por las vecinas y elegir una casilla de la frontera
+    visited, safe, unsafe = knowledge.visited, knowledge.safe_cells, knowledge.unsafe_cells
+    frontier, size = knowledge.frontier_cells, knowledge.size
+    for (x, y), perceived in script:
+        if (x, y) in unsafe:
+            continue
+        visited.add((x, y))
+        safe.add((x, y))
+        if perceived:
+            if x + 1 < size and (x + 1, y) not in visited:
+                unsafe.add((x + 1, y))
+        else:
+            knowledge.mark_neighbors_safe((x, y))
+        for n in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if n in safe and n not in visited:
+                break
+        if frontier:
+            frontier.choice(rng)
+
+
+@lru_cache(maxsize=None)
+def _knowledge_bytes(backend, size):
+    # Memoria que retiene la base de conocimiento tras explorar todo el tablero
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        knowledge = KNOWLEDGE_BACKENDS[backend](size)
+        _explore(knowledge, _exploration(size), random.Random(1))
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def _bench_knowledge(backend, loops):
+    # La operación es un paso del guion en 64x64 (una base nueva por pasada)
+    script = _exploration(64)
+    rng = random.Random(1)
+    done, elapsed = 0, 0.0
+    while done < loops:
+        part = script[:loops - done]
+        knowledge = KNOWLEDGE_BACKENDS[backend](64)
+        inicio = time.perf_counter()
+        _explore(knowledge, part, rng)
+        elapsed += time.perf_counter() - inicio
+        done += len(part)
+    return elapsed, done, _knowledge_bytes(backend, 64)
+
+
+@benchmark('knowledge.sets_64x64')
+def bench_knowledge_sets(loops):
+    return _bench_knowledge('sets', loops)
+
+
+@benchmark('knowledge.bitboard_64x64')
+def bench_knowledge_bitboard(loops):
+    return _bench_knowledge('bitboard', loops)
+
+
+# --- Macro: episodios completos sin interfaz ---
+@benchmark('episode.5x5', macro=True)
+def bench_episode_5(loops):
+    # 200 episodios; la operación es un episodio
+    rng = random.Random(3)
+    pares = [(Board(5, rng=rng), Agent(5, rng=rng)) for _ in range(200)]
+    inicio = time.perf_counter()
+    for board, agent in pares:
+        run_episode(board, agent)
+    return time.perf_counter() - inicio, len(pares)
+
+
+def _bench_big_episode(size, steps):
+    # Tableros grandes: no es un episodio completo, se corta a los steps
+    # pasos (2000) y la operación es un paso
+    rng = random.Random(4)
+    board = Board(size, rng=rng)
+    agent = Agent(size, rng=rng)
+    inicio = time.perf_counter()
+    result = run_episode(board, agent, max_steps=steps)
+    return time.perf_counter() - inicio, result.steps
+
+
+@benchmark('episode.64x64_2000_steps', macro=True)
+def bench_episode_64(loops):
+    # Los primeros 2000 pasos de un episodio en 64x64
+    return _bench_big_episode(64, 2000)
+
+
+@benchmark('episode.512x512_2000_steps', macro=True)
+def bench_episode_512(loops):
+    # Los primeros 2000 pasos de un episodio en 512x512
+    return _bench_big_episode(512, 2000)
+
+
+@benchmark('vecenv.step_4096', macro=True)
+def bench_vecenv(loops):
+    # 4096 entornos con acciones al azar; la operación es un paso de un entorno
+    try:
+        from src.vecenv import VectorEnv
+        import numpy as np
+    except ImportError:
+        return None
+    env = VectorEnv(4096, seed=6)
+    env.reset()
+    acciones = np.random.default_rng(6).integers(0, 8, size=(200, 4096))
+    inicio = time.perf_counter()
+    for row in acciones:
+        env.step(row)
+    return time.perf_counter() - inicio, acciones.size
+
+
+# --- Dibujo (pygame con el driver de video dummy) ---
+def _gui():
+    # Abre la ventana de main.py sin mostrarla; None si falta pygame
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    try:
+        import main
+    except ImportError:
+        return None
+    if getattr(main, 'window', None) is None:
+        main.configure(main.parse_args(['--tam', '64', '--sin-sonido']))
+        main.open_window()
+    return main
+
+
+def _render_state(main, rng):
+    # Una partida a medio jugar (300 pasos con las reglas de run_episode) para dibujar
+    board = Board(main.GRID_SIZE, rng=rng)
+    agent = Agent(main.GRID_SIZE, rng=rng)
+    run_episode(board, agent, max_steps=300)
+    return board, agent
+
+
+@benchmark('render.frame_idle')
+def bench_frame_idle(loops):
+    main = _gui()
+    if main is None:
+        return None
+    board, agent = _render_state(main, random.Random(5))
+    main.renderer.draw(main.window, board, agent, set())
+    inicio = time.perf_counter()
+    for _ in range(loops):
+        main.renderer.draw(main.window, board, agent, set())
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('render.frame_step')
+def bench_frame_step(loops):
+    # El agente va y viene entre dos casillas: dos casillas sucias por cuadro
+    main = _gui()
+    if main is None:
+        return None
+    board, agent = _render_state(main, random.Random(5))
+    x, y = agent.get_position()
+    other = (x, y + 1) if y + 1 < main.GRID_SIZE else (x, y - 1)
+    agent.visited.add(other)
+    main.renderer.draw(main.window, board, agent, set())
+    inicio = time.perf_counter()
+    for i in range(loops):
+        agent.x, agent.y = other if i & 1 else (x, y)
+        main.renderer.draw(main.window, board, agent, set())
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('render.status_redraw')
+def bench_status_redraw(loops):
+    main = _gui()
+    if main is None:
+        return None
+    agent = Agent(main.GRID_SIZE)
+    message = "Percibes viento, Percibes hedor, ¡Grito! El agente disparó la flecha automáticamente."
+    inicio = time.perf_counter()
+    for _ in range(loops):
+        main.status_key = None
+        main.draw_status(main.window, agent, message, False)
+    return time.perf_counter() - inicio, loops
+
+
+@benchmark('render.status_idle')
+def bench_status_idle(loops):
+    main = _gui()
+    if main is None:
+        return None
+    agent = Agent(main.GRID_SIZE)
+    main.draw_status(main.window, agent, "Percibes viento", False)
+    inicio = time.perf_counter()
+    for _ in range(loops):
+        main.draw_status(main.window, agent, "Percibes viento", False)
+    return time.perf_counter() - inicio, loops
+
+
+def measure(fn, macro, repeat=REPETICIONES, min_time=TIEMPO_MINIMO):
+    """
+    Mide un benchmark y devuelve segundos por operación (mejor y mediana),
+    más los bytes que informe el benchmark, si informa.
+
+    None si el benchmark no se puede correr (p. ej. falta pygame).
+    """
+    loops = 1
+    if not macro:
+        while True:
+            result = fn(loops)
+            if result is None:
+                return None
+            if result[0] >= min_time:
+                break
+            loops *= 10 if result[0] < min_time / 10 else 2
+    per_op = []
+    for _ in range(repeat):
+        result = fn(loops)
+        if result is None:
+            return None
+        seconds, ops = result[:2]
+        per_op.append(seconds / max(1, ops))
+    measured = {'best': min(per_op), 'median': statistics.median(per_op), 'loops': loops}
+    if len(result) > 2:
+        measured['bytes'] = result[2]
+    return measured
+
+
+def run(names=None, repeat=REPETICIONES, progress=None):
+    results = {}
+    for name, (fn, macro) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        result = measure(fn, macro, repeat)
+        if result is not None:
+            results[name] = result
+        if progress:
+            progress(name, result)
+    return {
+        'machine': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def compare(base, new, threshold=0.10, relative=False):
+    """
+    Compara dos corridas por el mejor tiempo de cada benchmark (el menos
+    afectado por el ruido de la máquina).
+
+    Devuelve filas (nombre, base, nuevo, cociente, estado) donde estado es
+    'REGRESIÓN' si el nuevo tarda más de (1 + threshold) veces la base,
+    'mejora' si tarda menos de (1 - threshold) veces y '' si no.
+
+    Los tiempos absolutos solo se pueden comparar entre corridas de la
+    misma máquina. Con relative=True cada tiempo se divide por el de
+    REFERENCIA de su propia corrida antes de comparar, así que lo que se
+    compara es cuánto más lento que Python puro es cada benchmark; eso
+    sobrevive a un cambio de máquina (no del todo: cachés y versiones de
+    Python no escalan igual para todo).
+    """
+    scale_base = scale_new = 1.0
+    if relative:
+        if REFERENCIA not in base['results'] or REFERENCIA not in new['results']:
+            raise ValueError(f"Para comparar relativo las dos corridas necesitan {REFERENCIA}")
+        scale_base = base['results'][REFERENCIA]['best']
+        scale_new = new['results'][REFERENCIA]['best']
+    rows = []
+    for name, old in base['results'].items():
+        current = new['results'].get(name)
+        if current is None or (relative and name == REFERENCIA):
+            continue
+        old_time, new_time = old['best'] / scale_base, current['best'] / scale_new
+        ratio = new_time / old_time
+        if ratio > 1 + threshold:
+            status = 'REGRESIÓN'
+        elif ratio < 1 - threshold:
+            status = 'mejora'
+        else:
+            status = ''
+        rows.append((name, old_time, new_time, ratio, status))
+    return rows
@@ -1,8 +1,22 @@
-import pygame
+import argparse
 import os
 import sys
-from src.board import Board
+import threading
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame
+
+from src import metrics
+from src.board import Board, ENTRANCE, PIT, WUMPUS, TREASURE, BREEZE, STENCH, SCREAM
 from src.agent import Agent
+from src.config import TAM, VIDAS
+from src.simulation import run_episode, max_steps_for
+from src.replay import ReplayLog
+from src.rules import (DIRECTIONS, MOVE_ACTIONS, SHOOT, HEARD_SCREAM, DIED, LOST, FELL_IN_PIT,
+                       FOUND_TREASURE, WON, KILLED_WUMPUS, agent_action, capture, cell_of,
+                       destination, percept_flags, step, sync)
+from src.render import GridRenderer, TextCache, ZOOM_MIN, load_sprites, wrap_message
 
 # --- NUEVA FUNCIÓN: Para rutas de recursos (imágenes, sonidos, etc.) ---
 def resource_path(relative_path):
@@ -11,148 +25,475 @@ def resource_path(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
+def cache_path():
+    # Carpeta para los sprites ya escalados (se puede borrar sin problema)
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'wumpus_game')
+
+# --- PARÁMETROS DE LA PARTIDA (línea de comandos) ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Mundo de Wumpus')
+    parser.add_argument('--tam', type=int, default=TAM, help='lado del tablero')
+    parser.add_argument('--pozos', type=int, default=None, help='cantidad de pozos (por defecto según densidad)')
+    parser.add_argument('--vidas', type=int, default=VIDAS, help='vidas del agente')
+    parser.add_argument('--episodios', type=int, default=100, help='episodios que corre la tecla N')
+    parser.add_argument('--repeticion', metavar='DIRECTORIO', default=None,
+                        help='muestra un episodio grabado con src.replay en vez de jugar')
+    parser.add_argument('--episodio', type=int, default=0, help='episodio del log a repetir')
+    parser.add_argument('--sin-sonido', action='store_true', help='no inicializa el audio')
+    parser.add_argument('--tiempo-inicio', action='store_true',
+                        help='muestra cuánto tarda en aparecer el primer cuadro')
+    parser.add_argument('--metricas', metavar='PREFIJO', default=None,
+                        help='mide desde el inicio; la tecla M guarda PREFIJO.json y PREFIJO.prom')
+    return parser.parse_args(argv)
+
 # --- CONFIGURACIÓN ---
-CELL_SIZE = 100         # Puedes ajustarlo a 80 o 70 si quieres más pequeño
-GRID_SIZE = 5           # 5x5 como pide el proyecto
-STATUS_HEIGHT = max(100, int(CELL_SIZE * 1.2))  # Altura proporcional al tamaño de celda
-WINDOW_SIZE = CELL_SIZE * GRID_SIZE
-FPS = 30               # Cuadros por segundo
+BOARD_PIXELS = 500      # Lado del tablero en pantalla; las celdas se achican para caber
+STATUS_HEIGHT = 120     # Altura del panel de estado
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (211, 211, 211)
 RED = (255, 0, 0)
 
-pygame.init()
-pygame.mixer.init()
-window = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + STATUS_HEIGHT))
-pygame.display.set_caption('Mundo de Wumpus')
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, int(CELL_SIZE * 0.2))      # Fuente normal
-font_big = pygame.font.SysFont(None, int(CELL_SIZE * 0.3))  # Fuente grande
-
-# --- MODIFICA LA FUNCIÓN PARA CARGAR SPRITES ---
-def load_sprite(filename, scale):
-    path = resource_path(os.path.join('assets', filename))
-    img = pygame.image.load(path).convert_alpha()
-    return pygame.transform.scale(img, (scale, scale))
-
-# --- Carga de imágenes (USA resource_path) ---
-adventurer_img = load_sprite('adventurer.png', CELL_SIZE - 10)
-wumpus_img     = load_sprite('wumpus.png',     CELL_SIZE - 10)
-hole_img       = load_sprite('pit.png',        CELL_SIZE - 10)
-treasure_img   = load_sprite('treasure.png',   CELL_SIZE - 10)
-entrance_img   = load_sprite('entrance.png',   CELL_SIZE - 10)
-
-# --- Carga de sonidos (USA resource_path) ---
-scream_sound = pygame.mixer.Sound(resource_path(os.path.join('assets', 'scream.wav')))
-win_sound    = pygame.mixer.Sound(resource_path(os.path.join('assets', 'win.wav')))
-lose_sound   = pygame.mixer.Sound(resource_path(os.path.join('assets', 'lose.wav')))
+def configure(args):
+    # Medidas que dependen de los parámetros de la partida
+    global GRID_SIZE, N_PITS, LIVES, EPISODIOS_LOTE, CELL_SIZE
+    global WINDOW_SIZE, WINDOW_WIDTH, STATUS_RECT
+    GRID_SIZE = args.tam    # 5x5 como pide el proyecto, o lo que se pida por línea de comandos
+    N_PITS = args.pozos
+    LIVES = args.vidas
+    EPISODIOS_LOTE = args.episodios
+    # Zoom inicial: el tablero entero si entra; si no, la cámara muestra una parte
+    CELL_SIZE = max(ZOOM_MIN, min(100, BOARD_PIXELS // GRID_SIZE))
+    WINDOW_SIZE = min(BOARD_PIXELS, CELL_SIZE * GRID_SIZE)
+    WINDOW_WIDTH = max(WINDOW_SIZE, BOARD_PIXELS)  # El panel de estado necesita ese ancho
+    STATUS_RECT = pygame.Rect(0, WINDOW_SIZE, WINDOW_WIDTH, STATUS_HEIGHT)
+
+# --- Imágenes: se escalan una vez por tamaño de celda y quedan en cache en disco ---
+SPRITE_FILES = ('adventurer.png', 'wumpus.png', 'pit.png', 'treasure.png', 'entrance.png')
+
+def open_window():
+    # Solo video y fuentes: el audio se inicia aparte (y puede no estar)
+    global window, font, font_big, renderer
+    pygame.display.init()
+    pygame.font.init()
+    window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_SIZE + STATUS_HEIGHT))
+    window.fill(GRAY)
+    pygame.display.set_caption('Mundo de Wumpus')
+    font = pygame.font.Font(None, 20)      # Fuente normal
+    font_big = pygame.font.Font(None, 30)  # Fuente grande
+    # --- Dibuja el tablero: cámara sobre bloques pre-compuestos que sigue al agente ---
+    renderer = GridRenderer(GRID_SIZE, (WINDOW_SIZE, WINDOW_SIZE), CELL_SIZE, sprites_for)
+
+def sprites_for(size):
+    # Sprites para un nivel de zoom (size = lado de la imagen en píxeles)
+    paths = [resource_path(os.path.join('assets', f)) for f in SPRITE_FILES]
+    adventurer_img, wumpus_img, hole_img, treasure_img, entrance_img = load_sprites(
+        paths, size, cache_path())
+    return {ENTRANCE: entrance_img, PIT: hole_img, WUMPUS: wumpus_img, TREASURE: treasure_img}, adventurer_img
+
+# --- Sonidos: opcionales y cargados en segundo plano ---
+SOUND_FILES = {'scream': 'scream.wav', 'win': 'win.wav', 'lose': 'lose.wav'}
+sounds = {}  # nombre -> pygame.mixer.Sound, a medida que terminan de cargarse
+
+def init_mixer():
+    # En el hilo principal, como pide SDL; en máquinas sin audio falla y se
+    # juega en silencio
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Sin sonido: {e}", file=sys.stderr)
+        return False
+    return True
+
+def load_sounds():
+    # Corre en un hilo aparte: leer y decodificar los archivos es lo más
+    # lento del arranque. Cada sonido se puede usar apenas termina de cargarse
+    try:
+        for name, filename in SOUND_FILES.items():
+            sounds[name] = pygame.mixer.Sound(resource_path(os.path.join('assets', filename)))
+    except pygame.error as e:
+        print(f"Sin sonido: {e}", file=sys.stderr)
+
+
+# --- Métricas (src.metrics): la tecla M las guarda, y las activa si no lo estaban ---
+METRICAS_PREFIJO = 'metricas'
+
+def enable_metrics():
+    metrics.enable()
+    metrics.instrument(sys.modules[__name__], 'draw_status', 'render.status')
+    metrics.instrument(pygame.display, 'update', 'render.present')
+
+def save_metrics():
+    if not metrics.enabled():
+        enable_metrics()
+        print("Métricas activadas; M de nuevo para guardarlas")
+        return
+    print("Métricas guardadas en", ", ".join(metrics.export(METRICAS_PREFIJO)))
 
 
 # --- Función para reiniciar todos los valores del juego ---
+replay_record = None  # Episodio grabado que se está repitiendo (--repeticion)
+
 def reset_vars():
-    return Board(), Agent(), False, "", True, set(), False
-
-board, agent, heard_scream, message, running, peligros_revelados, show_menu = reset_vars()
-
-# --- Dibuja el tablero mostrando solo celdas visitadas, reveladas, o del agente ---
-def draw_grid(win, board, agent, peligros_revelados):
-    for i in range(GRID_SIZE):
-        for j in range(GRID_SIZE):
-            x, y = j * CELL_SIZE, i * CELL_SIZE
-            rect = pygame.Rect(x, y, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(win, WHITE, rect)
-            pygame.draw.rect(win, BLACK, rect, 2)
-            # Solo dibuja sprites en casillas visitadas, reveladas, o donde está el agente
-            if (i, j) in agent.visited or (i, j) == agent.get_position() or (i, j) in peligros_revelados:
-                if board.grid[i][j] == 'E':
-                    win.blit(entrance_img, rect.move(5, 5))
-                if board.grid[i][j] == 'P':
-                    win.blit(hole_img, rect.move(5, 5))
-                if board.grid[i][j] == 'W' and board.wumpus_alive:
-                    win.blit(wumpus_img, rect.move(5, 5))
-                # Muestra el tesoro si está ahí o el agente lo acaba de tomar
-                if (board.grid[i][j] == 'T') or ((i, j) == agent.get_position() and agent.has_treasure):
-                    win.blit(treasure_img, rect.move(5, 5))
-            else:
-                pygame.draw.rect(win, GRAY, rect)
-                pygame.draw.rect(win, BLACK, rect, 2)
-            # Siempre dibuja el aventurero sobre todo lo demás
-            if (i, j) == agent.get_position():
-                win.blit(adventurer_img, rect.move(5, 5))
+    if replay_record is not None:
+        return replay_record.board(), replay_record.agent(), False, "", True, set(), False
+    board = Board(GRID_SIZE, N_PITS)
+    return board, Agent(GRID_SIZE, LIVES, n_pits=board.n_pits), False, "", True, set(), False
+
+
+def draw_frame(win, board, agent, peligros_revelados, message, show_menu):
+    # Actualiza en pantalla solo los rectángulos que se redibujaron
+    rects = renderer.draw(win, board, agent, peligros_revelados)
+    if draw_status(win, agent, message, show_menu):
+        rects.append(STATUS_RECT)
+    if rects:
+        pygame.display.update(rects)
 
 # --- Dibuja panel de estado, mensajes e instrucciones ---
+text_cache = TextCache()
+status_key = None  # Estado que muestra el panel ahora; None obliga a redibujarlo
+
 def draw_status(win, agent, message, show_menu):
-    pygame.draw.rect(win, GRAY, (0, WINDOW_SIZE, WINDOW_SIZE, STATUS_HEIGHT))
-    menu_msg = font.render("Presiona A para Auto-Juego, R para reiniciar o Q para salir", True, BLACK)
-    vidas_text = font.render(f'Vidas: {agent.lives}', True, BLACK)
-    flecha_text = font.render(f'Flecha: {"Sí" if agent.has_arrow else "No"}', True, BLACK)
-    tesoro_text = font.render(f'Tesoro: {"Sí" if agent.has_treasure else "No"}', True, BLACK)
+    # Devuelve False sin tocar la pantalla si nada de lo que muestra el panel cambió
+    global status_key
+    key = (agent.lives, agent.has_arrow, agent.has_treasure, message, modo_auto_juego, velocidad)
+    if key == status_key:
+        return False
+    status_key = key
+    text = text_cache.render
+    pygame.draw.rect(win, GRAY, STATUS_RECT)
+    menu_msg = text(font, "Presiona A para Auto-Juego, R para reiniciar o Q para salir", BLACK)
+    vidas_text = text(font, f'Vidas: {agent.lives}', BLACK)
+    flecha_text = text(font, f'Flecha: {"Sí" if agent.has_arrow else "No"}', BLACK)
+    tesoro_text = text(font, f'Tesoro: {"Sí" if agent.has_treasure else "No"}', BLACK)
     win.blit(menu_msg, (10, WINDOW_SIZE + 5))
     win.blit(vidas_text, (10, WINDOW_SIZE + 25))
     win.blit(flecha_text, (160, WINDOW_SIZE + 25))
     win.blit(tesoro_text, (320, WINDOW_SIZE + 25))
     # Mensaje principal (multi-línea si es largo)
-    lines = []
-    if message:
-        while len(message) > 45:
-            idx = message[:45].rfind(" ")
-            lines.append(message[:idx])
-            message = message[idx+1:]
-        lines.append(message)
-    for i, line in enumerate(lines):
-        msg = font.render(
+    for i, line in enumerate(wrap_message(message)):
+        msg = text(
+            font,
             line,
-            True,
             RED if "pierdes" in line.lower() or "fin" in line.lower() or "victoria" in line.lower() else BLACK
         )
         win.blit(msg, (10, WINDOW_SIZE + 45 + 30 * i))   # Espacio mayor entre líneas
-    instrucciones = font.render(
+    instrucciones = text(
+        font,
         "Flechas: Mover   |   Espacio: Disparar   |   Gana si sales con el tesoro",
-        True,
         BLACK
     )
     win.blit(instrucciones, (10, WINDOW_SIZE + STATUS_HEIGHT - 35))
     if modo_auto_juego:
-        auto_msg = font.render("Modo auto-juego: ACTIVADO", True, RED)
+        auto_msg = text(
+            font,
+            f"Modo auto-juego: ACTIVADO ({velocidad} pasos/s)   +/-: velocidad   F: final   N: {EPISODIOS_LOTE} partidas",
+            RED
+        )
         win.blit(auto_msg, (10, WINDOW_SIZE + STATUS_HEIGHT - 60))
+    return True
 
 
 #controla el modo si avanza o modo disparo
 modo_disparo = False
 # Controla si el agente juega solo
 modo_auto_juego = False
-# Temporizador para auto_move
-ultimo_auto_move = 0
-intervalo_auto_move = 1000  # milisegundos = 1 segundos
-
-# --- Ciclo principal del juego ---
-while True:
-    while running:
-        window.fill(GRAY)
-        draw_grid(window, board, agent, peligros_revelados)
-        draw_status(window, agent, message, False)
-        pygame.display.flip()
-
-        for event in pygame.event.get():
+# Pausa tras perder una vida: el agente vuelve a la entrada al llegar RESPAWN
+esperando_respawn = False
+
+# --- Eventos propios: el reloj de la simulación va aparte del dibujo ---
+AUTO_TICK = pygame.USEREVENT       # Pasos del auto-juego
+RESPAWN = pygame.USEREVENT + 1     # Termina la pausa tras perder una vida
+LOTE_TICK = pygame.USEREVENT + 2   # Siguiente tanda de episodios de la tecla N
+CUADRO_MS = 33              # El auto-juego no redibuja más seguido que esto (~30 cuadros/s)
+VELOCIDAD_MAX = 1 << 16     # Pasos por segundo como máximo
+velocidad = 1               # Pasos por segundo del auto-juego; +/- la duplica o la divide
+lote = None                 # [hechos, ganados] mientras corre la tecla N
+PAUSA_MUERTE = 1500         # milisegundos que se muestra la muerte antes de reaparecer
+
+def schedule_respawn():
+    # En vez de congelar el proceso con delay(), agenda el regreso a la entrada
+    global esperando_respawn
+    esperando_respawn = True
+    pygame.time.set_timer(RESPAWN, PAUSA_MUERTE, loops=1)
+
+def intervalo_auto_move():
+    # El temporizador nunca va más rápido que un cuadro; por encima de eso se
+    # dan varios pasos por tick y solo se dibuja el último (se saltean cuadros)
+    return max(CUADRO_MS, 1000 // velocidad)
+
+def set_auto_timer():
+    pygame.time.set_timer(AUTO_TICK, intervalo_auto_move() if modo_auto_juego else 0)
+
+def respawn():
+    # El agente vuelve a la entrada después de perder una vida
+    global esperando_respawn, message
+    esperando_respawn = False
+    agent.x, agent.y = 0, 0
+    agent.visited.add((0, 0))
+    message = ""
+
+def play(name, turbo=False):
+    # En turbo no suena nada: serían cientos de sonidos por segundo. Tampoco
+    # si no hay audio o si el sonido todavía no terminó de cargarse
+    sound = sounds.get(name)
+    if sound is not None and not turbo:
+        sound.play()
+
+def apply_action(action, turbo=False, auto=False, state=None):
+    """
+    Aplica una acción (códigos de src.rules) con las reglas de step() y
+    muestra lo que pasó: mensaje, sonido, peligros revelados y la pausa de
+    muerte. auto indica que la tomó el agente (aprende de lo que le pasa).
+    state es el estado de antes de la acción; si no se da, se toma ahora.
+    """
+    global heard_scream, message, running, show_menu
+    if state is None:
+        state = capture(board, agent, heard_scream)
+    target = destination(GRID_SIZE, cell_of(state), action) if action < SHOOT else None
+    state, events = step(board, state, action)
+    sync(state, board, agent)
+    heard_scream = bool(state & HEARD_SCREAM)
+
+    # --- Disparo ---
+    if target is None:
+        direction = DIRECTIONS[action - SHOOT]
+        if events & KILLED_WUMPUS:
+            play('scream', turbo)
+            if auto:
+                message = "¡Grito! El agente disparó la flecha automáticamente."
+            else:
+                message = f"¡Has matado al Wumpus hacia {direction}! Se escucha un grito."
+        elif not auto:
+            message = f"La flecha no dio en el blanco ({direction})."
+        return
+
+    pos = divmod(target, GRID_SIZE)
+    if auto:
+        agent.learn(pos, events, heard_scream)
+    else:
+        agent.visited.add(pos)
+
+    # Si cae en un pozo o lo devora el Wumpus
+    if events & DIED:
+        peligros_revelados.add(pos)
+        if events & LOST:
+            message = "¡Has perdido todas tus vidas! Fin del juego."
+            play('lose', turbo)
+            show_menu = True
+            running = False
+        else:
+            if events & FELL_IN_PIT:
+                message = "¡Te caíste en un pozo! Pierdes una vida."
+            else:
+                message = "¡El Wumpus te devoró! Pierdes una vida."
+            if turbo:
+                respawn()
+            else:
+                # step() ya lo devolvió a la entrada: se muestra la muerte hasta respawn()
+                agent.x, agent.y = pos
+                schedule_respawn()
+
+    # Si encuentra el tesoro
+    elif events & FOUND_TREASURE:
+        message = "¡Encontraste el tesoro!"
+        play('win', turbo)
+
+    # Si sale con el tesoro por la entrada
+    elif events & WON:
+        message = "¡FELICIDADES! Has salido con el tesoro. ¡Victoria!"
+        play('win', turbo)
+        show_menu = True
+        running = False
+
+    # Mensajes de percepción (puede seguir jugando)
+    else:
+        flags = percept_flags(board, state)
+        msg = []
+        if flags & BREEZE:
+            msg.append("Percibes viento")
+        if flags & STENCH:
+            msg.append("Percibes hedor")
+        if flags & SCREAM:
+            msg.append("¡Grito! El agente disparó la flecha automáticamente." if auto else "¡Grito!")
+        message = ", ".join(msg) if msg else ""
+
+def auto_step(turbo=False):
+    """
+    Un paso del auto-juego con las reglas de la partida en pantalla.
+
+    En turbo no hay sonidos ni pausa de muerte (el agente reaparece en
+    el acto). Devuelve False si el agente no pudo moverse ni disparar.
+    """
+    # El estado se toma antes: auto_move dispara por su cuenta (gasta la flecha
+    # y mata al Wumpus en el tablero), y step() tiene que ver ese disparo
+    state = capture(board, agent, heard_scream)
+    tenia_flecha = agent.has_arrow
+    direction = agent.auto_move(board, heard_scream)
+    action = agent_action(agent, tenia_flecha, direction)
+    if action is None:
+        return False
+    apply_action(action, turbo, auto=True, state=state)
+    return True
+
+def run_steps(pasos):
+    # Varios pasos seguidos sin dibujar, cortando si se pasa del tiempo de un cuadro
+    turbo = pasos > 1
+    if turbo and esperando_respawn:
+        respawn()
+    limite = time.perf_counter() + CUADRO_MS / 1000
+    for _ in range(pasos):
+        if not running or not auto_step(turbo) or time.perf_counter() > limite:
+            break
+
+def run_to_end():
+    # Corre el episodio hasta que termine (o se trabe) y muestra solo el final
+    global message
+    if esperando_respawn:
+        respawn()
+    for _ in range(max_steps_for(GRID_SIZE)):
+        if not running:
+            return
+        if not auto_step(turbo=True):
+            message = "El agente no puede avanzar más."
+            return
+    message = "Se alcanzó el tope de pasos del episodio."
+
+def start_batch():
+    # Arranca EPISODIOS_LOTE partidas sin interfaz; corren por tandas en LOTE_TICK
+    global lote, running, esperando_respawn
+    lote = [0, 0]
+    running = False
+    esperando_respawn = False
+    pygame.event.post(pygame.event.Event(LOTE_TICK))
+
+def run_batch_chunk():
+    # Una tanda de episodios que entra en un cuadro; se muestra el último y el
+    # porcentaje de partidas ganadas hasta ahora
+    global board, agent, peligros_revelados, heard_scream, message, show_menu, lote
+    limite = time.perf_counter() + CUADRO_MS / 1000
+    while lote[0] < EPISODIOS_LOTE:
+        board = Board(GRID_SIZE, N_PITS)
+        agent = Agent(GRID_SIZE, LIVES, n_pits=board.n_pits)
+        resultado = run_episode(board, agent)
+        lote[0] += 1
+        lote[1] += resultado.won
+        if time.perf_counter() > limite:
+            break
+    peligros_revelados = set(agent.danger_cells)
+    heard_scream = not board.wumpus_alive
+    message = f"Lote: {lote[0]}/{EPISODIOS_LOTE} partidas, {lote[1] / lote[0]:.0%} ganadas"
+    if lote[0] < EPISODIOS_LOTE:
+        pygame.event.post(pygame.event.Event(LOTE_TICK))
+    else:
+        message = f"Lote terminado: {lote[1]}/{lote[0]} partidas ganadas ({lote[1] / lote[0]:.0%})"
+        show_menu = True
+        lote = None
+
+def main(argv=None):
+    global board, agent, heard_scream, message, running, peligros_revelados, show_menu
+    global modo_disparo, modo_auto_juego, velocidad, lote, status_key, replay_record
+    global METRICAS_PREFIJO
+    inicio = time.perf_counter()
+    args = parse_args(argv)
+    if args.repeticion:
+        # El tablero y las vidas salen del registro; el agente repite sus acciones
+        replay_record = ReplayLog(args.repeticion)[args.episodio]
+        args.tam, args.vidas = replay_record.size, replay_record.lives
+    configure(args)
+    open_window()
+    if args.metricas:
+        METRICAS_PREFIJO = args.metricas
+        enable_metrics()
+    if replay_record is not None:
+        modo_auto_juego = True
+        set_auto_timer()
+    if not args.sin_sonido and init_mixer():
+        threading.Thread(target=load_sounds, daemon=True).start()
+    board, agent, heard_scream, message, running, peligros_revelados, show_menu = reset_vars()
+    draw_frame(window, board, agent, peligros_revelados, message, show_menu)
+    if args.tiempo_inicio:
+        print(f"Primer cuadro en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # --- Ciclo principal del juego ---
+    # Duerme en event.wait() hasta que haya algo que atender (tecla, temporizador
+    # o ventana); después procesa todo lo pendiente y redibuja solo lo que cambió.
+    while True:
+        draw_frame(window, board, agent, peligros_revelados, message, show_menu)
+
+        for event in [pygame.event.wait()] + pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()  # La ventana se tapó: redibujar todo
+                status_key = None
+
+            # --- Cámara: rueda o Z/X para el zoom, arrastrar para moverla, C para volver al agente ---
+            elif event.type == pygame.MOUSEWHEEL:
+                renderer.zoom(1 if event.y > 0 else -1)
+            elif event.type == pygame.MOUSEMOTION and event.buttons[0]:
+                renderer.pan(-event.rel[0], -event.rel[1])
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_z, pygame.K_x, pygame.K_c):
+                if event.key == pygame.K_c:
+                    renderer.recenter()
+                else:
+                    renderer.zoom(1 if event.key == pygame.K_z else -1)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                save_metrics()
+
+            elif event.type == RESPAWN:
+                if esperando_respawn:
+                    respawn()
+
+            elif event.type == LOTE_TICK:
+                if lote is not None:
+                    run_batch_chunk()
+
+            # --- Menú de reinicio/salir cuando termina el juego ---
+            elif not running:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_r:
+                        # Reiniciar juego completo
+                        board, agent, heard_scream, message, running, peligros_revelados, show_menu = reset_vars()
+                        lote = None
+                    elif event.key == pygame.K_n:
+                        start_batch()
+                    elif event.key == pygame.K_q:
+                        pygame.quit()
+                        sys.exit()
+
+            # --- AUTO JUEGO ---
+            elif event.type == AUTO_TICK:
+                pasos = max(1, velocidad * intervalo_auto_move() // 1000)
+                if modo_auto_juego and (pasos > 1 or not esperando_respawn):
+                    run_steps(pasos)
 
             # Permite movimiento siempre que el mensaje NO sea de muerte, fin o victoria
-            elif event.type == pygame.KEYDOWN and not (
+            elif event.type == pygame.KEYDOWN and not esperando_respawn and not (
                 "pierdes" in message.lower()
                 or "fin" in message.lower()
                 or "victoria" in message.lower()
             ):
                 x, y = agent.get_position()
-                moved = False
 
                 # Tecla A → activar/desactivar modo auto-juego
                 if event.key == pygame.K_a:
                     modo_auto_juego = not modo_auto_juego
                     message = "Modo auto-juego ACTIVADO" if modo_auto_juego else "Modo auto-juego DESACTIVADO"
+                    set_auto_timer()
+                elif event.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+                    velocidad = min(VELOCIDAD_MAX, velocidad * 2)
+                    set_auto_timer()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    velocidad = max(1, velocidad // 2)
+                    set_auto_timer()
+                elif event.key == pygame.K_f and modo_auto_juego:
+                    run_to_end()
+                elif event.key == pygame.K_n:
+                    start_batch()
 
                 if event.key == pygame.K_SPACE and agent.has_arrow and not modo_disparo:
                     modo_disparo = True
@@ -171,202 +512,19 @@ while True:
                         direction = 'RIGHT'
 
                     if direction:
-                        if board.shoot_arrow(x, y, direction):
-                            message = f"¡Has matado al Wumpus hacia {direction}! Se escucha un grito."
-                            scream_sound.play()
-                            heard_scream = True
-                        else:
-                            message = f"La flecha no dio en el blanco ({direction})."
-                        agent.has_arrow = False
+                        apply_action(SHOOT + MOVE_ACTIONS[direction])
                         modo_disparo = False  # Salir del modo disparo
 
                 # --- Movimiento normal si no está en modo disparo ---
                 elif not modo_disparo:
                     if event.key == pygame.K_UP and x > 0:
-                        agent.move('UP')
-                        moved = True
+                        apply_action(MOVE_ACTIONS['UP'])
                     elif event.key == pygame.K_DOWN and x < GRID_SIZE - 1:
-                        agent.move('DOWN')
-                        moved = True
+                        apply_action(MOVE_ACTIONS['DOWN'])
                     elif event.key == pygame.K_LEFT and y > 0:
-                        agent.move('LEFT')
-                        moved = True
+                        apply_action(MOVE_ACTIONS['LEFT'])
                     elif event.key == pygame.K_RIGHT and y < GRID_SIZE - 1:
-                        agent.move('RIGHT')
-                        moved = True
-                if moved:
-                    pos = agent.get_position()
-                    agent.visited.add(pos)
-                    percepciones = board.perceive(pos[0], pos[1], heard_scream)
-                    # Si cae en un pozo
-                    if 'Pozo' in percepciones:
-                        agent.lives -= 1
-                        peligros_revelados.add(pos)
-                        if agent.lives == 0:
-                            message = "¡Has perdido todas tus vidas! Fin del juego."
-                            lose_sound.play()
-                            show_menu = True
-                            running = False
-                        else:
-                            message = "¡Te caíste en un pozo! Pierdes una vida."
-                            # Muestra el tablero actualizado antes del delay
-                            window.fill(GRAY)
-                            draw_grid(window, board, agent, peligros_revelados)
-                            draw_status(window, agent, message, False)
-                            pygame.display.flip()
-                            pygame.time.delay(1500)
-                            agent.x, agent.y = 0, 0
-                            agent.visited.add((0, 0))
-                            message = ""
-                    # Si lo devora el Wumpus
-                    elif 'Wumpus' in percepciones:
-                        agent.lives -= 1
-                        peligros_revelados.add(pos)
-                        if agent.lives == 0:
-                            message = "¡Has perdido todas tus vidas! Fin del juego."
-                            lose_sound.play()
-                            show_menu = True
-                            running = False
-                        else:
-                            message = "¡El Wumpus te devoró! Pierdes una vida."
-                            window.fill(GRAY)
-                            draw_grid(window, board, agent, peligros_revelados)
-                            draw_status(window, agent, message, False)
-                            pygame.display.flip()
-                            pygame.time.delay(1500)
-                            agent.x, agent.y = 0, 0
-                            agent.visited.add((0, 0))
-                            message = ""
-                    # Si encuentra el tesoro
-                    elif 'Tesoro' in percepciones and not agent.has_treasure:
-                        message = "¡Encontraste el tesoro!"
-                        agent.has_treasure = True
-                        board.grid[pos[0]][pos[1]] = ''
-                        win_sound.play()  # Sonido de victoria al recoger tesoro
-                    # Si sale con el tesoro por la entrada
-                    elif agent.has_treasure and pos == (0, 0):
-                        message = "¡FELICIDADES! Has salido con el tesoro. ¡Victoria!"
-                        win_sound.play()
-                        show_menu = True
-                        running = False
-                    # Mensajes de percepción (puede seguir jugando)
-                    else:
-                        msg = []
-                        if 'Viento' in percepciones:
-                            msg.append("Percibes viento")
-                        if 'Hedor' in percepciones:
-                            msg.append("Percibes hedor")
-                        if 'Grito' in percepciones:
-                            msg.append("¡Grito!")
-                        message = ", ".join(msg) if msg else ""
-
-        # --- AUTO JUEGO ---
-        if modo_auto_juego and running:
-            tiempo_actual = pygame.time.get_ticks()
-            if tiempo_actual - ultimo_auto_move >= intervalo_auto_move:
-                direction = agent.auto_move(board, heard_scream)
-                if direction:
-                    agent.move(direction)
-                    moved = True
-                    agent.visited.add(agent.get_position())
-                    
-                    pos = agent.get_position()
-                    percepciones = board.perceive(pos[0], pos[1], heard_scream)
-                    
-                    # Si cae en un pozo
-                    if 'Pozo' in percepciones:
-                        agent.lives -= 1
-                        peligros_revelados.add(pos)
-                        agent.danger_cells.add(pos)
-                        if agent.lives == 0:
-                            message = "¡Has perdido todas tus vidas! Fin del juego."
-                            lose_sound.play()
-                            show_menu = True
-                            running = False
-                        else:
-                            message = "¡Te caíste en un pozo! Pierdes una vida."
-                            window.fill(GRAY)
-                            draw_grid(window, board, agent, peligros_revelados)
-                            draw_status(window, agent, message, False)
-                            pygame.display.flip()
-                            pygame.time.delay(1500)
-                            agent.x, agent.y = 0, 0
-                            agent.visited.add((0, 0))
-                            message = ""
-                    
-                    # Si lo devora el Wumpus
-                    elif 'Wumpus' in percepciones:
-                        agent.lives -= 1
-                        peligros_revelados.add(pos)
-                        agent.danger_cells.add(pos)
-                        
-                        # si tengo flecha, guardo la posicion del wumpus para ir a cazarlo
-                        if agent.has_arrow:
-                            agent.wumpus_target = pos
-
-                        if agent.lives == 0:
-                            message = "¡Has perdido todas tus vidas! Fin del juego."
-                            lose_sound.play()
-                            show_menu = True
-                            running = False
-                        else:
-                            message = "¡El Wumpus te devoró! Pierdes una vida."
-                            window.fill(GRAY)
-                            draw_grid(window, board, agent, peligros_revelados)
-                            draw_status(window, agent, message, False)
-                            pygame.display.flip()
-                            pygame.time.delay(1500)
-                            agent.x, agent.y = 0, 0
-                            agent.visited.add((0, 0))
-                            message = ""
-                    
-                    # Si encuentra el tesoro
-                    elif 'Tesoro' in percepciones and not agent.has_treasure:
-                        message = "¡Encontraste el tesoro!"
-                        agent.has_treasure = True
-                        board.grid[pos[0]][pos[1]] = ''
-                        agent.safe_cells.add(pos)
-                        agent.visited.add(pos)
-                        win_sound.play()
-                    
-                    # Si sale con el tesoro por la entrada
-                    elif agent.has_treasure and pos == (0, 0):
-                        message = "¡FELICIDADES! Has salido con el tesoro. ¡Victoria!"
-                        win_sound.play()
-                        show_menu = True
-                        running = False
-                    
-                    # Mensajes de percepción normal (opcional)
-                    else:
-                        msg = []
-                        if 'Viento' in percepciones:
-                            msg.append("Percibes viento")
-                        if 'Hedor' in percepciones:
-                            msg.append("Percibes hedor")
-                        if 'Grito' in percepciones:
-                            agent.wumpus_target = None
-                            msg.append("¡Grito! El agente disparó la flecha automáticamente.")
-                        message = ", ".join(msg) if msg else ""
-                ultimo_auto_move = tiempo_actual
-        clock.tick(FPS)
-
-    # --- Menú de reinicio/salir cuando termina el juego ---
-    while True:
-        window.fill(GRAY)
-        draw_grid(window, board, agent, peligros_revelados)
-        draw_status(window, agent, message, True)
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    # Reiniciar juego completo
-                    board, agent, heard_scream, message, running, peligros_revelados, show_menu = reset_vars()
-                    break
-                elif event.key == pygame.K_q:
-                    pygame.quit()
-                    sys.exit()
-        if running:
-            break
+                        apply_action(MOVE_ACTIONS['RIGHT'])
+
+if __name__ == '__main__':
+    main()
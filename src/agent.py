@@ -1,20 +1,97 @@
 # src/agent.py
 
+import random
+
+from src.board import BREEZE, STENCH, SCREAM, DANGER_HERE, default_pits
+from src.config import TAM, VIDAS
+from src.inference import HazardModel
+from src.knowledge import KNOWLEDGE_BACKENDS
+from src.logic import LogicModel
+from src.planner import Planner
+from src.policytable import QUIETO, default_table, zobrist
+from src.rules import DIRECTIONS, SHOOT, DIED, EATEN, FOUND_TREASURE
+from src.search import NODOS, SearchPolicy
+
+# Modos de razonamiento de auto_move:
+# - 'basic': solo marca seguras las vecinas de casillas sin percepciones y
+#   explora una casilla de la frontera elegida al azar.
+# - 'probabilistic': además deduce pozos y Wumpus con HazardModel y explora
+#   siempre la casilla de menor riesgo.
+# - 'logic': deduce con una base de conocimiento proposicional (LogicModel)
+#   y explora primero lo demostrado seguro.
+# - 'search': deduce como 'probabilistic', pero cuando hay que arriesgarse
+#   decide con búsqueda sobre mundos muestreados (SearchPolicy), que puede
+#   elegir también disparar a ciegas.
+# - 'table': cada jugada es una consulta a la política compilada offline
+#   (src.policytable); lo que no esté en la tabla (o todo, si no se compiló
+#   la tabla para este tamaño) lo decide como 'search'.
+HAZARD_MODELS = {'probabilistic': HazardModel, 'logic': LogicModel, 'search': HazardModel,
+                 'table': HazardModel}
+REASONING_MODES = ('basic',) + tuple(HAZARD_MODELS)
+
 class Agent:
-    def __init__(self):
+    def __init__(self, size=TAM, lives=VIDAS, rng=None, knowledge='sets',
+                 reasoning='probabilistic', search=None, table=None, n_pits=None):
+        if reasoning not in REASONING_MODES:
+            raise ValueError(f"Modo de razonamiento desconocido: {reasoning}")
+        # Generador aleatorio inyectable (por defecto el módulo random global)
+        self.rng = rng if rng is not None else random
+        self.size = size  # Lado del tablero en el que se mueve
         # Posición inicial
         self.x, self.y = 0, 0
         # Estado del agente
-        self.lives = 2
+        self.lives = lives
         self.has_arrow = True
         self.has_treasure = False
-        # Memoria del agente
-        self.visited = set()        # Casillas visitadas
-        self.safe_cells = set()     # Casillas seguras conocidas
-        self.unsafe_cells = set()   # Casillas deducidas como peligrosas
-        self.frontier_cells = set() # Casillas frontera para explorar
-        self.danger_cells = set()   # Casillas conocidas como peligrosas (Pozo, Wumpus)
+        self.last_shot = None  # Dirección en la que disparó la flecha, si la usó
+        # Memoria del agente (la frontera se mantiene sola al marcar casillas).
+        # knowledge='bitboard' la guarda en bits por fila en vez de sets de tuplas
+        self.knowledge = KNOWLEDGE_BACKENDS[knowledge](size)
+        self.visited = self.knowledge.visited                # Casillas visitadas
+        self.safe_cells = self.knowledge.safe_cells          # Casillas seguras conocidas
+        self.unsafe_cells = self.knowledge.unsafe_cells      # Casillas deducidas como peligrosas
+        self.frontier_cells = self.knowledge.frontier_cells  # Casillas frontera para explorar
+        self.danger_cells = self.knowledge.danger_cells      # Casillas conocidas como peligrosas (Pozo, Wumpus)
         self.wumpus_target = None   # Posición del Wumpus conocida (para intentar matarlo)
+        # Caminos por casillas seguras (volver a la salida, acercarse al Wumpus)
+        self.planner = Planner(size)
+        self.knowledge.listeners.append(self.planner)
+        # Deducción de pozos y Wumpus (no se usa en modo básico). El a priori
+        # de pozo por casilla sale de los pozos reales del tablero (n_pits)
+        self.reasoning = reasoning
+        n_pits = default_pits(size) if n_pits is None else n_pits
+        pit_prior = n_pits / (size * size)
+        model = HAZARD_MODELS.get(reasoning)
+        if model is HazardModel:
+            self.hazards = HazardModel(self.knowledge, size, pit_prior)
+        else:
+            self.hazards = model(self.knowledge, size) if model else None
+        self.explore_target = None  # Casilla hacia la que se dirige explorando
+        # Búsqueda para las decisiones riesgosas (search: opciones de SearchPolicy).
+        # Con un rng propio (simulaciones, torneos, compilar la tabla) la
+        # búsqueda se corta por nodos y no por reloj, así la semilla alcanza
+        # para repetir la partida; al jugar en la ventana manda el tiempo
+        search = dict(search or {})
+        if rng is not None:
+            search.setdefault('nodes', NODOS)
+        search.setdefault('pit_prior', pit_prior)
+        self.search = (SearchPolicy(size, self.rng, **search)
+                       if reasoning in ('search', 'table') else None)
+        self.shot_line = None  # Casillas en la línea del último disparo, hasta saber si acertó
+        # Política compilada (table: PolicyTable o algo con get(clave); por defecto
+        # la de src.policytable.default_table, si se compiló para este tamaño,
+        # n_pits y lives) y la clave de Zobrist de lo observado
+        self.table = None
+        if reasoning == 'table':
+            if table is None:
+                table = default_table(size, n_pits, lives)
+            self.table = table
+        self.zobrist = zobrist(size) if self.table is not None else None
+        self.key = 0
+        # Lo que ya entró en la clave: casillas, el grito (bit size*size) y las
+        # muertes (desde el bit size*size + 1, una por casilla y causa)
+        self._keyed = 0
+        self._pending = []  # (casilla, percepción, línea de tiro) todavía sin incorporar
 
         # Inicialmente en la casilla de entrada (0,0)
         self.visited.add((0, 0))
@@ -27,154 +104,237 @@ class Agent:
         # Mover al agente según la dirección indicada
         if direction == 'UP' and self.x > 0:
             self.x -= 1
-        elif direction == 'DOWN' and self.x < 4:
+        elif direction == 'DOWN' and self.x < self.size - 1:
             self.x += 1
         elif direction == 'LEFT' and self.y > 0:
             self.y -= 1
-        elif direction == 'RIGHT' and self.y < 4:
+        elif direction == 'RIGHT' and self.y < self.size - 1:
             self.y += 1
 
+    def record_death(self, pos, by_wumpus):
+        # El agente murió en pos: la casilla queda marcada como peligrosa
+        self.danger_cells.add(pos)
+        if self.zobrist:
+            # Morir otra vez en la misma casilla no enseña nada (y dos XOR se anularían)
+            death = 2 * (pos[0] * self.size + pos[1]) + bool(by_wumpus)
+            bit = 1 << (self.size * self.size + 1 + death)
+            if not self._keyed & bit:
+                self._keyed |= bit
+                self.key ^= self.zobrist.death[death]
+        if by_wumpus:
+            # Si tengo flecha, guardo la posición del Wumpus para ir a cazarlo
+            if self.has_arrow:
+                self.wumpus_target = pos
+            if self.hazards:
+                self.hazards.wumpus_found(pos)
+        elif self.hazards:
+            self.hazards.pit_found(pos)
+
+    def learn(self, pos, events, heard_scream):
+        # Lo que deja saber un paso que llevó a pos (eventos de src.rules.step)
+        self.visited.add(pos)
+        if events & DIED:
+            self.record_death(pos, by_wumpus=bool(events & EATEN))
+        elif events & FOUND_TREASURE:
+            self.safe_cells.add(pos)
+        elif heard_scream:
+            self.wumpus_target = None
+
     def auto_move(self, board, heard_scream):
         """
         Algoritmo básico para que el agente se mueva solo.
 
+        - Con el tesoro, vuelve a (0,0) por el camino seguro más corto.
         - Marca casillas seguras si no percibe viento ni hedor.
-        - Construye la frontera de exploración.
-        - Elige la siguiente casilla segura a visitar (básico BFS-like).
+        - Si conoce la casilla del Wumpus, va hasta una vecina y dispara.
+        - Elige al azar una casilla de la frontera (mantenida incrementalmente),
+          o con deducción (probabilística o lógica) la de menor riesgo.
         - Devuelve la dirección en la que debe moverse.
-        """
-        from random import choice
 
+        En modo 'table' la jugada sale de una consulta a la política
+        compilada con la clave de lo observado; solo si la clave no está se
+        sigue con lo de arriba (como en modo 'search').
+
+        Cada fase es un método aparte (_update_knowledge, _hunt,
+        _choose_target, _select_move) para poder medirlas por separado
+        con src.metrics.
+        """
         current_pos = self.get_position()
+        if not self.has_treasure:
+            self._update_knowledge(board, current_pos, heard_scream)
+
+        # Política compilada: una consulta por jugada
+        if self.table is not None:
+            action = self.table.get(self._table_key(current_pos))
+            if action is not None:
+                return self._play(board, current_pos, action)
+            self._catch_up()
 
-        # PRIORIDAD: regresar si ya tiene el tesoro
+        # PRIORIDAD: regresar si ya tiene el tesoro, por el camino seguro más corto
         if self.has_treasure:
             if current_pos == (0, 0):
                 return None  # Ya llegó
+            return self.planner.step_to_exit(current_pos)
 
-            # Posibles movimientos: UP, DOWN, LEFT, RIGHT
-            moves = []
-            if self.x > 0:
-                moves.append(('UP', (self.x - 1, self.y)))
-            if self.x < 4:
-                moves.append(('DOWN', (self.x + 1, self.y)))
-            if self.y > 0:
-                moves.append(('LEFT', (self.x, self.y - 1)))
-            if self.y < 4:
-                moves.append(('RIGHT', (self.x, self.y + 1)))
-
-            # Filtrar solo movimientos a celdas seguras
-            # safe_moves = [(dir, pos) for dir, pos in moves if pos in self.safe_cells or pos in self.visited]
-            safe_moves = [(dir, pos) for dir, pos in moves if pos in self.safe_cells and pos not in self.danger_cells]
-
-
-            # Si hay movimientos seguros, elegir el que acerque más a (0,0)
-            if safe_moves:
-                # Ordenar por distancia Manhattan a (0,0)
-                safe_moves.sort(key=lambda m: abs(m[1][0] - 0) + abs(m[1][1] - 0))
-                # Devolver la dirección que más acerque a (0,0)
-                return safe_moves[0][0]
-            else:
-                # No hay camino seguro conocido → quedarse quieto (puedes mejorarlo con A* si querés)
-                return None
+        # Cazando al wumpus
+        if self.wumpus_target and self.has_arrow:
+            done, step = self._hunt(board, current_pos)
+            if done:
+                return step
+
+        # --- Elegir próximo movimiento ---
+        target = self._choose_target(current_pos)
+        if target is None:
+            # Si no hay frontera → quedarse quieto (None)
+            return None
+        if target in DIRECTIONS:
+            # La búsqueda prefirió disparar a ciegas antes de arriesgarse
+            self._shoot(board, current_pos, target)
+            return None
+        return self._select_move(current_pos, target)
 
-        perceptions = board.perceive(current_pos[0], current_pos[1], heard_scream)
+    def _table_key(self, current_pos):
+        cell = current_pos[0] * self.size + current_pos[1]
+        key = self.key ^ self.zobrist.position[cell]
+        return key ^ self.zobrist.treasure if self.has_treasure else key
 
+    def _play(self, board, current_pos, action):
+        # Ejecuta una acción guardada en la tabla (códigos de src.rules, o QUIETO)
+        if action == QUIETO:
+            return None
+        if action >= SHOOT:
+            self._shoot(board, current_pos, DIRECTIONS[action - SHOOT])
+            return None
+        return DIRECTIONS[action]
+
+    def _update_knowledge(self, board, current_pos, heard_scream):
+        flags = board.percept_flags(current_pos[0], current_pos[1], heard_scream)
+        if self.table is not None:
+            # Con la tabla alcanza con la clave: la percepción (y el disparo que
+            # espera su grito) se incorpora recién si la tabla no tiene la jugada
+            self._key_percepts(current_pos, flags)
+            self._pending.append((current_pos, flags, self.shot_line))
+            self.shot_line = None
+            return
+        self._absorb(current_pos, flags)
+
+    def _catch_up(self):
+        # Incorpora las percepciones que quedaron pendientes mientras jugaba la tabla
+        for pos, flags, shot_line in self._pending:
+            self.shot_line = shot_line
+            self._absorb(pos, flags)
+        self._pending.clear()
+
+    def _absorb(self, current_pos, flags):
         # Si piso un Pozo o Wumpus, marco la celda como peligrosa
-        if 'Pozo' in perceptions or 'Wumpus' in perceptions:
+        if flags & DANGER_HERE:
             self.danger_cells.add(current_pos)
 
         # --- Actualizar conocimiento ---
         # Si no percibe Viento, Hedor, Pozo o Wumpus → marca adyacentes como seguras
-        if not any(p in perceptions for p in ['Viento', 'Hedor', 'Pozo', 'Wumpus']):
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nx, ny = current_pos[0] + dx, current_pos[1] + dy
-                if 0 <= nx < 5 and 0 <= ny < 5:
-                    if (nx, ny) not in self.visited and (nx, ny) not in self.safe_cells:
-                        self.safe_cells.add((nx, ny))
-        else:
+        if not flags & (BREEZE | STENCH | DANGER_HERE):
+            self.knowledge.mark_neighbors_safe(current_pos)
+        elif self.hazards is None:
             # Si percibe Viento o Hedor → no marca adyacentes como seguras
-            # (opcional: podrías marcar como posibles peligrosas)
             pass
-        
-        # Cazando al wumpus
-        if self.wumpus_target and self.has_arrow:
-            target_x, target_y = self.wumpus_target
-            current_x, current_y = self.get_position()
 
-            #Me alineo una casilla antes del wumpus para no morir y poder disparar la flecha
-            # Si estoy alineado en fila
+        # Modos con deducción: incorporar la percepción y lo que se deduzca de ella
+        if self.hazards and not flags & DANGER_HERE:
+            if flags & SCREAM:
+                self.hazards.wumpus_killed()
+            elif self.shot_line:
+                # La flecha no dio: el Wumpus no está en esa línea
+                self.hazards.wumpus_missed(self.shot_line)
+            self.shot_line = None
+            self.hazards.observe(current_pos, flags)
+            if self.hazards.wumpus_at and self.has_arrow and not self.wumpus_target:
+                self.wumpus_target = self.hazards.wumpus_at
+
+    def _hunt(self, board, current_pos):
+        # Devuelve (decidido, dirección): dispara desde una vecina del Wumpus
+        # o se acerca a ella; si no hay camino seguro, sigue explorando
+        target_x, target_y = self.wumpus_target
+        current_x, current_y = current_pos
+
+        # Desde una casilla vecina al wumpus se dispara SIN moverse
+        if abs(current_x - target_x) + abs(current_y - target_y) == 1:
             if current_x == target_x:
-                distance = abs(current_y - target_y)
-                if distance == 1:
-                    # Disparar en la dirección correcta SIN moverse
-                    board.shoot_arrow(current_x, current_y, 'RIGHT' if target_y > current_y else 'LEFT')
-                    self.has_arrow = False
-                    self.wumpus_target = None
-                    return None
-                else:
-                    # Moverse acercándose SOLO por safe_cells
-                    if current_y < target_y:
-                        next_pos = (current_x, current_y + 1)
-                        if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                            return 'RIGHT'
-                    elif current_y > target_y:
-                        next_pos = (current_x, current_y - 1)
-                        if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                            return 'LEFT'
-
-            # Si estoy en la misma columna (Y == Y)
-            elif current_y == target_y:
-                distance = abs(current_x - target_x)
-                if distance == 1:
-                    # Disparar en la dirección correcta SIN moverse
-                    board.shoot_arrow(current_x, current_y, 'DOWN' if target_x > current_x else 'UP')
-                    self.has_arrow = False
-                    self.wumpus_target = None
-                    return None
-                else:
-                    # Moverse acercándose SOLO por safe_cells
-                    if current_x < target_x:
-                        next_pos = (current_x + 1, current_y)
-                        if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                            return 'DOWN'
-                    elif current_x > target_x:
-                        next_pos = (current_x - 1, current_y)
-                        if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                            return 'UP'
-
-            # Si no estoy alineado → moverme hacia el Wumpus (solo por safe_cells)
-            if current_x < target_x:
-                next_pos = (current_x + 1, current_y)
-                if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                    return 'DOWN'
-            elif current_x > target_x:
-                next_pos = (current_x - 1, current_y)
-                if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                    return 'UP'
-            elif current_y < target_y:
-                next_pos = (current_x, current_y + 1)
-                if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                    return 'RIGHT'
-            elif current_y > target_y:
-                next_pos = (current_x, current_y - 1)
-                if next_pos in self.safe_cells and next_pos not in self.danger_cells:
-                    return 'LEFT'
-
-        # --- Construir frontera ---
-        self.frontier_cells = set()
-        for cell in self.safe_cells:
-            for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nx, ny = cell[0] + dx, cell[1] + dy
-                if 0 <= nx < 5 and 0 <= ny < 5:
-                    if (nx, ny) not in self.visited and (nx, ny) not in self.unsafe_cells:
-                        self.frontier_cells.add((nx, ny))
+                direction = 'RIGHT' if target_y > current_y else 'LEFT'
+            else:
+                direction = 'DOWN' if target_x > current_x else 'UP'
+            self._shoot(board, current_pos, direction)
+            return True, None
 
-        # --- Elegir próximo movimiento ---
-        if self.frontier_cells:
-            target_cell = choice(list(self.frontier_cells))
-            tx, ty = target_cell
+        # Si no, acercarse a una vecina del wumpus SOLO por casillas seguras
+        step = self.planner.step_to_target(current_pos, self.wumpus_target)
+        return step is not None, step
+
+    def _key_percepts(self, current_pos, flags):
+        # Suma a la clave la percepción de una casilla nueva y el grito, una vez cada uno
+        cell = current_pos[0] * self.size + current_pos[1]
+        if not flags & DANGER_HERE and not self._keyed >> cell & 1:
+            self._keyed |= 1 << cell
+            self.key ^= self.zobrist.observed[4 * cell + (flags & (BREEZE | STENCH))]
+        scream = 1 << (self.size * self.size)
+        if flags & SCREAM and not self._keyed & scream:
+            self._keyed |= scream
+            self.key ^= self.zobrist.scream
+
+    def _shoot(self, board, current_pos, direction):
+        x, y = current_pos
+        if self.zobrist:
+            self.key ^= self.zobrist.shot[4 * (x * self.size + y) + DIRECTIONS.index(direction)]
+        board.shoot_arrow(x, y, direction)
+        self.has_arrow = False
+        self.last_shot = direction
+        self.wumpus_target = None
+        dx, dy = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}[direction]
+        line = []
+        x, y = x + dx, y + dy
+        while 0 <= x < self.size and 0 <= y < self.size:
+            line.append((x, y))
+            x, y = x + dx, y + dy
+        self.shot_line = line
+
+    def _choose_target(self, current_pos):
+        """
+        Casilla hacia la que explorar.
+
+        En modo básico, una casilla de la frontera al azar. En los modos con
+        deducción, primero las casillas seguras sin visitar (la vecina si
+        hay, si no una cualquiera); si no queda ninguna, la casilla de la
+        frontera con menor probabilidad de pozo o Wumpus (hazards.safest).
+        En modo 'search' esa última elección la hace SearchPolicy, que
+        también puede devolver una dirección en la que disparar.
+        """
+        if not self.hazards:
+            return self.frontier_cells.choice(self.rng) if self.frontier_cells else None
+        hazards = self.hazards
+        target = self.explore_target
+        # El objetivo anterior sigue valiendo si no se visitó ni resultó peligroso,
+        # salvo que fuera riesgoso y ahora haya opciones seguras
+        if (target is None or target in self.visited or target in self.unsafe_cells
+                or (target not in self.safe_cells and hazards.safe_unvisited)):
+            target = None
+            for n in self.planner.neighbors(current_pos):
+                if n in hazards.safe_unvisited:
+                    target = n
+                    break
+            if target is None and hazards.safe_unvisited:
+                target = hazards.safe_unvisited.choice(self.rng)
+            if target is None and self.search is not None:
+                target = self.search.choose(self, current_pos)
+                if target in DIRECTIONS:
+                    return target
+            if target is None:
+                target = hazards.safest(self.rng)
+            self.explore_target = target
+        return target
 
+    def _select_move(self, current_pos, target):
+        # Dirección del próximo paso hacia target
+        tx, ty = target
+        if not self.hazards:
             # Decidir hacia qué dirección moverse
             if tx < self.x:
                 return 'UP'
@@ -184,6 +344,19 @@ class Agent:
                 return 'LEFT'
             elif ty > self.y:
                 return 'RIGHT'
+            return None
 
-        # Si no hay frontera → quedarse quieto (None)
-        return None
+        if abs(tx - self.x) + abs(ty - self.y) == 1:
+            # Vecina: entrar directamente
+            if tx < self.x:
+                return 'UP'
+            elif tx > self.x:
+                return 'DOWN'
+            elif ty < self.y:
+                return 'LEFT'
+            return 'RIGHT'
+        # Con deducción se camina hasta ella por casillas seguras
+        step = self.planner.step_to_target(current_pos, target, 'explore')
+        if step is None:
+            self.explore_target = None  # No hay camino seguro hasta ella
+        return step
@@ -1,87 +1,282 @@
 # src/board.py
 
 import random
-from src.config import TAM, N_POZOS
+from src.config import TAM, DENSIDAD_POZOS
+
+# Códigos de casilla: el tablero se guarda como un arreglo plano de bytes
+EMPTY, ENTRANCE, WUMPUS, TREASURE, PIT = range(5)
+SYMBOLS = ('', 'E', 'W', 'T', 'P')
+CODES = {symbol: code for code, symbol in enumerate(SYMBOLS)}
+
+# Percepciones como banderas de bits (camino rápido, sin listas ni strings)
+BREEZE, STENCH, PIT_HERE, WUMPUS_HERE, TREASURE_HERE, SCREAM = 1, 2, 4, 8, 16, 32
+DANGER_HERE = PIT_HERE | WUMPUS_HERE
+
+# Nombres de la API clásica, en el mismo orden en que los devolvía perceive()
+_PERCEPT_NAMES = ((BREEZE, 'Viento'), (STENCH, 'Hedor'), (TREASURE_HERE, 'Tesoro'),
+                  (PIT_HERE, 'Pozo'), (WUMPUS_HERE, 'Wumpus'), (SCREAM, 'Grito'))
+PERCEPTS_BY_MASK = tuple(tuple(name for flag, name in _PERCEPT_NAMES if mask & flag)
+                         for mask in range(64))
+
+
+class _GridRow:
+    # Vista de una fila del tablero que habla en letras ('', 'E', 'W', 'T', 'P')
+    __slots__ = ('board', 'start')
+
+    def __init__(self, board, start):
+        self.board = board
+        self.start = start
+
+    def __len__(self):
+        return self.board.size
+
+    def __getitem__(self, j):
+        if not 0 <= j < self.board.size:
+            raise IndexError(j)
+        return SYMBOLS[self.board.cells[self.start + j]]
+
+    def __setitem__(self, j, symbol):
+        if not 0 <= j < self.board.size:
+            raise IndexError(j)
+        # Pasa por el tablero para mantener al día las percepciones
+        self.board.set_cell(self.start // self.board.size, j, CODES[symbol])
+
+    def __iter__(self):
+        return (SYMBOLS[c] for c in self.board.cells[self.start:self.start + self.board.size])
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _Grid:
+    # Vista compatible con la antigua lista de listas: board.grid[i][j]
+    __slots__ = ('board',)
+
+    def __init__(self, board):
+        self.board = board
+
+    def __len__(self):
+        return self.board.size
+
+    def __getitem__(self, i):
+        size = self.board.size
+        if not 0 <= i < size:
+            raise IndexError(i)
+        return _GridRow(self.board, i * size)
+
+    def __iter__(self):
+        size = self.board.size
+        return (_GridRow(self.board, i * size) for i in range(size))
+
+
+def default_pits(size):
+    # Cantidad de pozos para un tablero de size x size con la densidad por defecto
+    return max(1, round(DENSIDAD_POZOS * size * size))
+
+
+def safe_zone(size):
+    # Zona segura inicial (0,0), (0,1), (1,0), (1,1) como índices planos, ordenados
+    return (0, 1, size, size + 1)
+
+
+def _occupied(cells):
+    # Índices de las casillas no vacías, sin recorrer el tablero en Python
+    if hasattr(cells, 'nonzero'):
+        return cells.nonzero()[0].tolist()
+    found = []
+    for code in range(1, len(SYMBOLS)):
+        i = cells.find(code)
+        while i != -1:
+            found.append(i)
+            i = cells.find(code, i + 1)
+    return found
+
 
 class Board:
-    def __init__(self):
-        self.grid = [['' for _ in range(TAM)] for _ in range(TAM)]
+    def __init__(self, size=TAM, n_pits=None, rng=None, layout=None):
+        # Generador aleatorio inyectable (por defecto el módulo random global)
+        self.rng = rng if rng is not None else random
         self.wumpus_alive = True   # Si el Wumpus está vivo
-        self.place_elements()
+        if layout is not None and getattr(layout, 'ndim', 1) == 2:
+            size = layout.shape[0]
+        self.size = size
+        if layout is None:
+            if size < 2:
+                raise ValueError("El tablero debe ser de al menos 2x2")
+            self.n_pits = default_pits(size) if n_pits is None else n_pits
+            # Casillas en orden fila por fila: la (i, j) está en i * size + j
+            self.cells = bytearray(size * size)
+            self.place_elements()
+        else:
+            # Envuelve un mundo ya generado (p. ej. una fila de worldgen) sin copiarlo;
+            # los cambios del tablero (tesoro recogido) se escriben en ese mismo arreglo
+            self.cells = layout.reshape(-1) if hasattr(layout, 'reshape') else layout
+            if len(self.cells) != size * size:
+                raise ValueError(f"El mundo debe tener {size * size} casillas")
+        self.grid = _Grid(self)
+        # Índice de posiciones: se mantiene al día en cada cambio del tablero
+        self.wumpus_pos = None     # (x, y) del Wumpus (vivo o muerto)
+        self.treasure_pos = None   # (x, y) del tesoro, None si ya lo recogieron
+        self.pits = set()          # Posiciones de los pozos
+        # Percepciones precalculadas por casilla (banderas BREEZE, STENCH, ...)
+        self.percepts = bytearray(size * size)
+        for cell in _occupied(self.cells):
+            code = self.cells[cell]
+            self._index(cell, code)
+            self._add_percepts(cell, code)
+        if layout is not None:
+            self.n_pits = len(self.pits)
+
+    def _index(self, cell, code):
+        pos = divmod(cell, self.size)
+        if code == WUMPUS:
+            self.wumpus_pos = pos
+        elif code == TREASURE:
+            self.treasure_pos = pos
+        elif code == PIT:
+            self.pits.add(pos)
+
+    def _unindex(self, cell, code):
+        pos = divmod(cell, self.size)
+        if code == WUMPUS and self.wumpus_pos == pos:
+            self.wumpus_pos = None
+        elif code == TREASURE and self.treasure_pos == pos:
+            self.treasure_pos = None
+        elif code == PIT:
+            self.pits.discard(pos)
+
+    def entities(self):
+        """Recorre los elementos del tablero como ((x, y), código), sin mirar las casillas vacías."""
+        if self.cells[0] == ENTRANCE:
+            yield (0, 0), ENTRANCE
+        for pos in self.pits:
+            yield pos, PIT
+        if self.wumpus_pos is not None:
+            yield self.wumpus_pos, WUMPUS
+        if self.treasure_pos is not None:
+            yield self.treasure_pos, TREASURE
+
+    def _neighbors(self, cell):
+        size = self.size
+        x, y = divmod(cell, size)
+        if x > 0:
+            yield cell - size
+        if x < size - 1:
+            yield cell + size
+        if y > 0:
+            yield cell - 1
+        if y < size - 1:
+            yield cell + 1
+
+    def _add_percepts(self, cell, code):
+        # Suma a la máscara lo que aporta un elemento en 'cell'
+        if code == PIT:
+            self.percepts[cell] |= PIT_HERE
+            for n in self._neighbors(cell):
+                self.percepts[n] |= BREEZE
+        elif code == WUMPUS:
+            if self.wumpus_alive:
+                self.percepts[cell] |= WUMPUS_HERE
+            for n in self._neighbors(cell):
+                self.percepts[n] |= STENCH
+        elif code == TREASURE:
+            self.percepts[cell] |= TREASURE_HERE
+
+    def _recompute_percepts(self, cell):
+        # Recalcula desde cero la máscara de una sola casilla
+        cells = self.cells
+        mask = 0
+        code = cells[cell]
+        if code == PIT:
+            mask |= PIT_HERE
+        elif code == WUMPUS and self.wumpus_alive:
+            mask |= WUMPUS_HERE
+        elif code == TREASURE:
+            mask |= TREASURE_HERE
+        for n in self._neighbors(cell):
+            if cells[n] == PIT:
+                mask |= BREEZE
+            elif cells[n] == WUMPUS:
+                mask |= STENCH
+        self.percepts[cell] = mask
+
+    def set_cell(self, x, y, code):
+        """Cambia el contenido de (x, y) y actualiza solo las percepciones afectadas."""
+        cell = x * self.size + y
+        self._unindex(cell, self.cells[cell])
+        self.cells[cell] = code
+        self._index(cell, code)
+        self._recompute_percepts(cell)
+        for n in self._neighbors(cell):
+            self._recompute_percepts(n)
 
     def place_elements(self):
+        size = self.size
         # Coloca la entrada siempre en (0, 0)
-        self.grid[0][0] = 'E'
+        self.cells[0] = ENTRANCE
 
         # Zona segura inicial: (0,0), (0,1), (1,0), (1,1)
-        zona_segura_inicial = {(0,0), (0,1), (1,0), (1,1)}
-
-        # posiciones_libres = [(i, j) for i in range(TAM) for j in range(TAM) if self.grid[i][j] == '']
-        posiciones_libres = [(i, j) for i in range(TAM) for j in range(TAM)
-                            if self.grid[i][j] == '' and (i, j) not in zona_segura_inicial]
+        zona_segura_inicial = safe_zone(size)
+        n_libres = size * size - len(zona_segura_inicial)
+        if 2 + self.n_pits > n_libres:
+            raise ValueError("No hay lugar para el Wumpus, el tesoro y todos los pozos")
 
-        # Coloca Wumpus
-        x, y = random.choice(posiciones_libres)
-        self.grid[x][y] = 'W'
-        posiciones_libres.remove((x, y))
+        # Elige posiciones distintas fuera de la zona segura sin armar la lista
+        # de casillas libres: sample sobre un range no recorre todo el tablero
+        elegidas = []
+        for libre in self.rng.sample(range(n_libres), 2 + self.n_pits):
+            for segura in zona_segura_inicial:
+                if libre >= segura:
+                    libre += 1
+            elegidas.append(libre)
 
-        # Coloca tesoro
-        x, y = random.choice(posiciones_libres)
-        self.grid[x][y] = 'T'
-        posiciones_libres.remove((x, y))
-
-        # Coloca pozos
-        for _ in range(N_POZOS):
-            x, y = random.choice(posiciones_libres)
-            self.grid[x][y] = 'P'
-            posiciones_libres.remove((x, y))
+        # Coloca Wumpus, tesoro y pozos, en ese orden
+        self.cells[elegidas[0]] = WUMPUS
+        self.cells[elegidas[1]] = TREASURE
+        for cell in elegidas[2:]:
+            self.cells[cell] = PIT
 
     def print_board(self):  # Solo para depuración
         for fila in self.grid:
-            print(fila)
+            print(list(fila))
 
-    def perceive(self, x, y, heard_scream=False):
-        percepciones = []
-        # Viento y hedor (casillas adyacentes)
-        for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < TAM and 0 <= ny < TAM:
-                if self.grid[nx][ny] == 'P':
-                    percepciones.append('Viento')
-                if self.grid[nx][ny] == 'W':
-                    percepciones.append('Hedor')
-        if self.grid[x][y] == 'T':
-            percepciones.append('Tesoro')
-        if self.grid[x][y] == 'P':
-            percepciones.append('Pozo')
-        if self.grid[x][y] == 'W' and self.wumpus_alive:
-            percepciones.append('Wumpus')
+    def percept_flags(self, x, y, heard_scream=False):
+        # Camino rápido: un entero con las banderas BREEZE, STENCH, ... de (x, y)
         if heard_scream:
-            percepciones.append('Grito')
-        return percepciones
+            return self.percepts[x * self.size + y] | SCREAM
+        return self.percepts[x * self.size + y]
 
-    def shoot_arrow(self, x, y, direction):
-        dx, dy = 0, 0
+    def perceive(self, x, y, heard_scream=False):
+        # Vista compatible: lista de percepciones en español ('Viento', 'Hedor', ...)
+        return list(PERCEPTS_BY_MASK[self.percept_flags(x, y, heard_scream)])
+
+    def in_line_of_fire(self, x, y, direction):
+        # La flecha vuela en línea recta hasta el borde: basta con ver si el
+        # Wumpus está alineado con (x, y) y del lado hacia el que se dispara
+        if self.wumpus_pos is None:
+            return False
+        wx, wy = self.wumpus_pos
         if direction == 'UP':
-            dx = -1
+            return wy == y and wx < x
         elif direction == 'DOWN':
-            dx = 1
+            return wy == y and wx > x
         elif direction == 'LEFT':
-            dy = -1
-        elif direction == 'RIGHT':
-            dy = 1
-        else:
-            return False  # Dirección inválida
+            return wx == x and wy < y
+        return wx == x and wy > y
+
+    def kill_wumpus(self):
+        self.wumpus_alive = False
+        # El hedor sigue, pero el Wumpus ya no mata en su casilla
+        wx, wy = self.wumpus_pos
+        self.percepts[wx * self.size + wy] &= ~WUMPUS_HERE
 
-        nx, ny = x + dx, y + dy
-        # Dispara en línea recta mientras esté dentro del tablero
-        while 0 <= nx < TAM and 0 <= ny < TAM:
-            if self.grid[nx][ny] == 'W' and self.wumpus_alive:
-                self.wumpus_alive = False
-                return True  # ¡Wumpus muerto!
-            nx += dx
-            ny += dy
-        return False  # No le dio al Wumpus
+    def shoot_arrow(self, x, y, direction):
+        if direction not in ('UP', 'DOWN', 'LEFT', 'RIGHT'):
+            return False  # Dirección inválida
+        if not self.wumpus_alive or not self.in_line_of_fire(x, y, direction):
+            return False  # No le dio al Wumpus
+        self.kill_wumpus()
+        return True  # ¡Wumpus muerto!
 
 # Test rápido (puedes borrar esto después)
 if __name__ == '__main__':
@@ -1,4 +1,8 @@
 # src/config.py
 
-TAM = 5  # Tamaño del tablero (5x5)
+TAM = 5  # Tamaño del tablero por defecto (5x5)
 N_POZOS = 3  # Número de pozos, puedes ajustar según dificultad
+VIDAS = 2  # Vidas con las que empieza el agente
+
+# Densidad de pozos del tablero por defecto; en otros tamaños se mantiene la proporción
+DENSIDAD_POZOS = N_POZOS / (TAM * TAM)
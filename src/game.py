@@ -1,88 +1,110 @@
 # src/game.py
 
-from src.board import Board
+from src.board import Board, SYMBOLS, PERCEPTS_BY_MASK
 from src.agent import Agent
+from src.config import TAM, VIDAS
+from src.rules import (DIRECTIONS, MOVE_ACTIONS, SHOOT, HEARD_SCREAM, SHOT, KILLED_WUMPUS,
+                       FELL_IN_PIT, EATEN, LOST, FOUND_TREASURE, WON,
+                       capture, percept_flags, step, sync)
+
+class Player:
+    """
+    Estado mínimo de quien juega a mano: posición, vidas, flecha y tesoro.
+
+    Sirve en lugar de Agent cuando no hace falta la memoria del agente
+    automático (p. ej. las sesiones de src.server, que son miles).
+    """
+    __slots__ = ('size', 'x', 'y', 'lives', 'has_arrow', 'has_treasure')
+
+    def __init__(self, size=TAM, lives=VIDAS):
+        self.size = size
+        self.x, self.y = 0, 0
+        self.lives = lives
+        self.has_arrow = True
+        self.has_treasure = False
+
+    get_position = Agent.get_position
+    move = Agent.move
+
 
 class Game:
-    def __init__(self):
-        self.board = Board()
-        self.agent = Agent()
+    def __init__(self, size=TAM, n_pits=None, lives=VIDAS, board=None, agent=None):
+        self.board = board if board is not None else Board(size=size, n_pits=n_pits)
+        self.agent = agent if agent is not None else Agent(size=size, lives=lives, n_pits=self.board.n_pits)
         self.running = True
-        self.heard_scream = False  # Si el agente escuchó el grito
+        # Estado de src.rules; agente y tablero se actualizan desde él en cada paso
+        self.state = capture(self.board, self.agent)
+
+    @property
+    def heard_scream(self):
+        # Si el agente escuchó el grito
+        return bool(self.state & HEARD_SCREAM)
 
     def print_state(self):
-        for i in range(len(self.board.grid)):
-            row = ''
-            for j in range(len(self.board.grid[i])):
-                if (i, j) == self.agent.get_position():
-                    row += 'A '  # A de Agente
-                elif self.board.grid[i][j] != '':
-                    row += self.board.grid[i][j] + ' '
-                else:
-                    row += '. '
-            print(row)
+        filas = [['.'] * len(self.board.grid) for _ in range(len(self.board.grid))]
+        for (i, j), code in self.board.entities():
+            filas[i][j] = SYMBOLS[code]
+        x, y = self.agent.get_position()
+        filas[x][y] = 'A'  # A de Agente
+        for fila in filas:
+            print(' '.join(fila) + ' ')
         print(f"Vidas: {self.agent.lives}, Flecha: {self.agent.has_arrow}, Tesoro: {self.agent.has_treasure}")
 
+    def observe(self):
+        # Percepciones en la casilla del agente ('Viento', 'Hedor', ...)
+        return list(PERCEPTS_BY_MASK[percept_flags(self.board, self.state)])
+
+    def command(self, move):
+        """Ejecuta un comando (UP/DOWN/LEFT/RIGHT, SHOOT <DIRECCION>, Q); devuelve los mensajes."""
+        move = move.upper().strip()
+        if move in DIRECTIONS:
+            action = MOVE_ACTIONS[move]
+        elif move.startswith('SHOOT') and self.agent.has_arrow:
+            try:
+                _, direction = move.split()
+            except ValueError:
+                return ["Uso: SHOOT <DIRECCION>"]
+            if direction not in DIRECTIONS:
+                return ["Dirección inválida. Usa UP, DOWN, LEFT, RIGHT."]
+            action = SHOOT + MOVE_ACTIONS[direction]
+        elif move == 'Q':
+            self.running = False
+            return []
+        else:
+            return ["Acción inválida."]
+
+        self.state, events = step(self.board, self.state, action)
+        sync(self.state, self.board, self.agent)
+        mensajes = []
+        if events & KILLED_WUMPUS:
+            mensajes.append("¡Has matado al Wumpus! Se escucha un grito en todo el tablero.")
+        elif events & SHOT:
+            mensajes.append("La flecha no dio en el blanco.")
+        if events & FELL_IN_PIT:
+            mensajes.append("¡Te caíste en un pozo! Pierdes una vida.")
+        elif events & EATEN:
+            mensajes.append("¡El Wumpus te devoró! Pierdes una vida.")
+        if events & LOST:
+            mensajes.append("¡Has perdido todas tus vidas! Fin del juego.")
+            self.running = False
+        elif events & FOUND_TREASURE:
+            mensajes.append("¡Encontraste el tesoro!")
+        elif events & WON:
+            mensajes.append("¡FELICIDADES! Has salido con el tesoro. ¡Victoria!")
+            self.running = False
+        return mensajes
+
     def play(self):
+        # Partida por consola: el mismo juego que sirve src.server, con input() y print
         while self.running:
             self.print_state()
-            pos = self.agent.get_position()
-
-            # Condición de victoria
-            if self.agent.has_treasure and pos == (0, 0):
-                print("¡FELICIDADES! Has salido con el tesoro. ¡Victoria!")
-                self.running = False
-                continue
-
-            percepciones = self.board.perceive(pos[0], pos[1], self.heard_scream)
+            percepciones = self.observe()
             print(f"Percepciones: {', '.join(percepciones) if percepciones else 'Nada especial.'}")
 
-            # Lógica de muerte (el Wumpus solo mata si está vivo)
-            if 'Pozo' in percepciones:
-                print("¡Te caíste en un pozo! Pierdes una vida.")
-                self.agent.lives -= 1
-                if self.agent.lives == 0:
-                    print("¡Has perdido todas tus vidas! Fin del juego.")
-                    self.running = False
-                else:
-                    self.agent.x, self.agent.y = 0, 0
-                continue
-            if 'Wumpus' in percepciones:
-                print("¡El Wumpus te devoró! Pierdes una vida.")
-                self.agent.lives -= 1
-                if self.agent.lives == 0:
-                    print("¡Has perdido todas tus vidas! Fin del juego.")
-                    self.running = False
-                else:
-                    self.agent.x, self.agent.y = 0, 0
-                continue
-            if 'Tesoro' in percepciones and not self.agent.has_treasure:
-                print("¡Encontraste el tesoro!")
-                self.agent.has_treasure = True
-                self.board.grid[pos[0]][pos[1]] = ''
-
             # Comando de usuario
-            move = input("Acción (UP/DOWN/LEFT/RIGHT, SHOOT <DIRECCION>, Q para salir): ").upper().strip()
-            if move in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                self.agent.move(move)
-            elif move.startswith('SHOOT') and self.agent.has_arrow:
-                try:
-                    _, direction = move.split()
-                    if direction in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                        if self.board.shoot_arrow(pos[0], pos[1], direction):
-                            print("¡Has matado al Wumpus! Se escucha un grito en todo el tablero.")
-                            self.heard_scream = True
-                        else:
-                            print("La flecha no dio en el blanco.")
-                        self.agent.has_arrow = False
-                    else:
-                        print("Dirección inválida. Usa UP, DOWN, LEFT, RIGHT.")
-                except ValueError:
-                    print("Uso: SHOOT <DIRECCION>")
-            elif move == 'Q':
-                self.running = False
-            else:
-                print("Acción inválida.")
+            move = input("Acción (UP/DOWN/LEFT/RIGHT, SHOOT <DIRECCION>, Q para salir): ")
+            for mensaje in self.command(move):
+                print(mensaje)
 
 if __name__ == '__main__':
     juego = Game()
@@ -0,0 +1,420 @@
+# src/inference.py
+#
+# Inferencia probabilística de peligros: probabilidad de pozo y de Wumpus
+# en cada casilla a partir de las percepciones de viento y hedor.
+
+from functools import lru_cache
+from heapq import heappop, heappush
+
+from src.board import BREEZE, STENCH
+from src.config import DENSIDAD_POZOS
+from src.knowledge import IndexedSet
+
+MAX_COMPONENTE = 12  # Casillas máximas por componente para enumerar modelos (2^12)
+
+
+@lru_cache(maxsize=4096)
+def _pit_marginals(n_cells, constraints, prior):
+    """
+    Probabilidad de pozo de cada casilla de una componente de la frontera.
+
+    constraints es una tupla de máscaras de bits: cada una son las casillas
+    vecinas de una casilla con viento, y al menos una debe tener pozo. Se
+    enumeran los 2^n_cells modelos y se pondera cada uno por la probabilidad
+    a priori. La clave no depende de la posición absoluta de la componente,
+    así que configuraciones repetidas en otra parte del tablero salen de cache.
+    """
+    totals = [0.0] * n_cells
+    weight_sum = 0.0
+    weights = [prior ** k * (1 - prior) ** (n_cells - k) for k in range(n_cells + 1)]
+    for model in range(1 << n_cells):
+        if all(model & c for c in constraints):
+            w = weights[model.bit_count()]
+            weight_sum += w
+            m = model
+            while m:
+                low = m & -m
+                totals[low.bit_length() - 1] += w
+                m ^= low
+    if weight_sum == 0:
+        return tuple([prior] * n_cells)
+    return tuple(t / weight_sum for t in totals)
+
+
+class HazardTracker:
+    """
+    Base común de los modelos de peligro del agente.
+
+    Escucha a la base de conocimiento para llevar el conjunto de casillas
+    seguras sin visitar (de donde el agente elige a dónde ir) y define la
+    interfaz que usa Agent: observe(), pit_found(), wumpus_found(),
+    wumpus_killed(), wumpus_missed(), wumpus_at, risk() y safest().
+    """
+
+    def __init__(self, knowledge, size):
+        self.knowledge = knowledge
+        self.size = size
+        self.wumpus_at = None         # Casilla del Wumpus si se dedujo o se lo encontró
+        self.safe_unvisited = IndexedSet()
+        knowledge.listeners.append(self)
+
+    def neighbors(self, pos):
+        x, y = pos
+        if x > 0:
+            yield x - 1, y
+        if x < self.size - 1:
+            yield x + 1, y
+        if y > 0:
+            yield x, y - 1
+        if y < self.size - 1:
+            yield x, y + 1
+
+    # --- Avisos de la base de conocimiento ---
+    def cell_known(self, pos):
+        if pos in self.knowledge.visited:
+            self.safe_unvisited.discard(pos)
+        elif pos in self.knowledge.safe_cells:
+            self.safe_unvisited.add(pos)
+
+    def cell_blocked(self, pos):
+        self.safe_unvisited.discard(pos)
+
+    def safest(self, rng):
+        # Casilla de la frontera con menor riesgo (recorre toda la frontera)
+        risks = [(self.risk(c), c) for c in self.knowledge.frontier_cells
+                 if c not in self.knowledge.unsafe_cells]
+        risks = [(r, c) for r, c in risks if r < 1.0]
+        if not risks:
+            return None
+        lowest = min(r for r, _ in risks)
+        return rng.choice([c for r, c in risks if r == lowest])
+
+
+class HazardModel(HazardTracker):
+    """
+    Creencias del agente sobre pozos y Wumpus.
+
+    observe() incorpora la percepción de cada casilla visitada; lo que queda
+    demostrado (seguro, pozo, ubicación del Wumpus) se vuelca a la base de
+    conocimiento del agente. Las restricciones de viento se agrupan en
+    componentes independientes y cada observación recalcula solo las que
+    toca (enumerando modelos, con cache por firma). risk() y safest() son
+    consultas: no cambian nada.
+    """
+
+    def __init__(self, knowledge, size, pit_prior=DENSIDAD_POZOS):
+        super().__init__(knowledge, size)
+        self.pit_prior = pit_prior
+        self.observed = set()         # Casillas cuya percepción ya se incorporó
+        self.breezes = set()          # Casillas observadas con viento
+        self.no_pit = set()           # Casillas sin pozo demostrado
+        self.no_wumpus = set()        # Casillas sin Wumpus demostrado
+        self.pits = set()             # Pozos conocidos (el agente cayó ahí)
+        self.wumpus_dead = False
+        self.wumpus_candidates = None # None mientras no haya hedor que lo acote
+        self.pending = set()          # Sin pozo pero con Wumpus todavía posible
+        self._constraints = {}        # Viento activo -> vecinas desconocidas (al menos un pozo)
+        self._watchers = {}           # Casilla -> vientos cuya restricción la incluye
+        self._component = {}          # Viento -> vientos de su componente
+        self._probabilities = {}      # Probabilidad de pozo de las casillas con restricciones
+        # Frontera ordenada por probabilidad de pozo, separada según el Wumpus
+        # pueda estar o no en la casilla (todas las posibles comparten la misma
+        # probabilidad de Wumpus). Las entradas viejas se descartan al consultar,
+        # y lo que cambió se anota y recién se apila en safest(): casi todas las
+        # jugadas tienen una casilla segura a mano y no preguntan
+        self._heaps = ([], [])
+        self._dirty = set()           # Casillas a (re)apilar
+        self._grown = []              # Casillas conocidas: sus vecinas pueden ser frontera
+
+    # --- Observaciones ---
+    def observe(self, pos, flags):
+        if pos in self.observed:
+            return
+        self.observed.add(pos)
+        nbrs = list(self.neighbors(pos))
+        cells = nbrs + [pos]
+        no_pit = self.no_pit
+        cleared = [c for c in ((pos,) if flags & BREEZE else cells) if c not in no_pit]
+        no_pit.update(cleared)
+        if flags & STENCH:
+            self._rule_out((pos,))
+            self._narrow({n for n in nbrs if n not in self.no_wumpus})
+        else:
+            self._rule_out(cells)
+        dirty = set()
+        if flags & BREEZE:
+            self.breezes.add(pos)
+            dirty.add(pos)
+        watchers = self._watchers
+        for cell in cleared:
+            if cell in watchers:
+                dirty.update(watchers[cell])
+        if dirty:
+            cells += self._deduce(dirty)
+        self._settle(cells)
+
+    def pit_found(self, pos):
+        self.pits.add(pos)
+        self.knowledge.unsafe_cells.add(pos)
+        self._settle(self._deduce(set(self._watchers.get(pos, ()))))
+
+    def wumpus_found(self, pos):
+        if not self.wumpus_dead:
+            self.wumpus_at = pos
+            self.wumpus_candidates = {pos}
+            self._reclassify()
+            self._settle([])
+
+    def wumpus_killed(self):
+        if not self.wumpus_dead:
+            self.wumpus_dead = True
+            self.wumpus_at = None
+            self._reclassify()
+            self._settle([])
+
+    def wumpus_missed(self, cells):
+        # Flecha sin grito: el Wumpus no está en ninguna casilla de la línea
+        if self.wumpus_dead:
+            return
+        self._rule_out(cells)
+        self._settle(cells)
+
+    def wumpus_possible(self, cell):
+        if self.wumpus_dead or cell in self.no_wumpus:
+            return False
+        if self.wumpus_at is not None:
+            return cell == self.wumpus_at
+        return self.wumpus_candidates is None or cell in self.wumpus_candidates
+
+    def _rule_out(self, cells):
+        # El Wumpus no está en cells: pasan a la pila de la frontera sin Wumpus
+        new = [c for c in cells if c not in self.no_wumpus]
+        self.no_wumpus.update(new)
+        if self.wumpus_candidates is not None:
+            self.wumpus_candidates.difference_update(new)
+            self._locate()
+        self._dirty.update(new)
+
+    def _narrow(self, possible):
+        # Hedor: el Wumpus está entre possible
+        if self.wumpus_candidates is None:
+            self.wumpus_candidates = possible
+            self._reclassify()
+        else:
+            self._dirty.update(self.wumpus_candidates - possible)
+            self.wumpus_candidates &= possible
+        self._locate()
+
+    def _locate(self):
+        if len(self.wumpus_candidates) == 1 and self.wumpus_at is None:
+            self.wumpus_at = next(iter(self.wumpus_candidates))
+
+    def _settle(self, cells):
+        # Vuelca a la base de conocimiento lo que ya está demostrado
+        for cell in list(cells) + list(self.pending):
+            if cell not in self.no_pit:
+                continue
+            if self.wumpus_possible(cell):
+                self.pending.add(cell)
+            else:
+                self.pending.discard(cell)
+                if cell not in self.knowledge.safe_cells:
+                    self.knowledge.safe_cells.add(cell)
+        if self.wumpus_at is not None and not self.wumpus_dead:
+            self.knowledge.unsafe_cells.add(self.wumpus_at)
+
+    # --- Componentes de la frontera ---
+    def _deduce(self, dirty):
+        """
+        Recalcula las restricciones de los vientos de dirty y sus componentes,
+        y aplica lo que quede demostrado (pozo seguro o casilla sin pozo),
+        que a su vez puede cambiar otras restricciones. Devuelve las casillas
+        que pasaron a no tener pozo, para _settle().
+        """
+        cleared = []
+        while dirty:
+            found = self._refresh(dirty)
+            dirty = set()
+            for cell, p in found:
+                if p == 1.0:
+                    self.knowledge.unsafe_cells.add(cell)
+                elif cell not in self.no_pit:
+                    self.no_pit.add(cell)
+                    cleared.append(cell)
+                    dirty.update(self._watchers.get(cell, ()))
+        return cleared
+
+    def _refresh(self, dirty):
+        # Restricciones nuevas para dirty y componentes rehechas solo donde tocan
+        seeds = set()
+        old_cells = set()
+        for b in dirty:
+            for member in self._component.get(b, (b,)):
+                if member not in seeds:
+                    seeds.add(member)
+                    old_cells.update(self._constraints.get(member, ()))
+        for b in dirty:
+            self._constrain(b)
+        found = []
+        done = set()
+        for seed in seeds:
+            if seed in done:
+                continue
+            if seed not in self._constraints:
+                self._component.pop(seed, None)
+                continue
+            group = self._flood(seed)
+            done |= group
+            found.extend(self._solve(group))
+        for cell in old_cells:
+            if cell not in self._watchers:
+                # Quedó sin restricciones: vuelve al a priori
+                self._probabilities.pop(cell, None)
+                self._dirty.add(cell)
+        return found
+
+    def _constrain(self, b):
+        for cell in self._constraints.pop(b, ()):
+            watchers = self._watchers[cell]
+            watchers.discard(b)
+            if not watchers:
+                del self._watchers[cell]
+        nbrs = list(self.neighbors(b))
+        if any(n in self.pits for n in nbrs):
+            return
+        unknown = frozenset(n for n in nbrs if n not in self.no_pit)
+        if unknown:
+            self._constraints[b] = unknown
+            for cell in unknown:
+                self._watchers.setdefault(cell, set()).add(b)
+
+    def _flood(self, seed):
+        # Vientos conectados a seed por casillas compartidas
+        group = {seed}
+        stack = [seed]
+        while stack:
+            for cell in self._constraints[stack.pop()]:
+                for b in self._watchers[cell]:
+                    if b not in group:
+                        group.add(b)
+                        stack.append(b)
+        return group
+
+    def _solve(self, group):
+        # Probabilidad de pozo de cada casilla de la componente; devuelve las demostradas
+        group = frozenset(group)
+        for b in group:
+            self._component[b] = group
+        constraints = [self._constraints[b] for b in group]
+        cells = sorted(set().union(*constraints))
+        if len(cells) > MAX_COMPONENTE:
+            # Demasiado grande para enumerar: estimación local por restricción
+            probabilities = {}
+            for cons in constraints:
+                for c in cons:
+                    probabilities[c] = max(probabilities.get(c, self.pit_prior), 1 / len(cons))
+        else:
+            index = {c: i for i, c in enumerate(cells)}
+            masks = tuple(sorted({sum(1 << index[c] for c in cons) for cons in constraints}))
+            probabilities = dict(zip(cells, _pit_marginals(len(cells), masks, self.pit_prior)))
+        found = []
+        for cell, p in probabilities.items():
+            if self._probabilities.get(cell) != p:
+                self._probabilities[cell] = p
+                self._dirty.add(cell)
+            if p == 0.0 or p == 1.0:
+                found.append((cell, p))
+        return found
+
+    # --- Probabilidades ---
+    def pit_probability(self, cell):
+        if cell in self.pits:
+            return 1.0
+        if cell in self.no_pit:
+            return 0.0
+        return self._probabilities.get(cell, self.pit_prior)
+
+    def wumpus_probability(self, cell):
+        if not self.wumpus_possible(cell):
+            return 0.0
+        if self.wumpus_at is not None:
+            return 1.0
+        if self.wumpus_candidates is not None:
+            return 1.0 / len(self.wumpus_candidates)
+        return 1.0 / max(1, self.size * self.size - len(self.no_wumpus))
+
+    def risk(self, cell):
+        # Probabilidad de morir al entrar en la casilla
+        pit = self.pit_probability(cell)
+        if pit == 1.0:
+            return 1.0
+        return 1 - (1 - pit) * (1 - self.wumpus_probability(cell))
+
+    # --- Frontera por riesgo ---
+    def cell_known(self, pos):
+        super().cell_known(pos)
+        self._grown.append(pos)  # Si es segura, sus vecinas pueden ser frontera
+
+    def _flush(self):
+        # Apila lo anotado desde la última consulta
+        dirty = self._dirty
+        for pos in self._grown:
+            dirty.update(self.neighbors(pos))
+        self._grown.clear()
+        frontier = self.knowledge.frontier_cells
+        for cell in dirty:
+            if cell in frontier:
+                p = self.pit_probability(cell)
+                if p < 1.0:
+                    heappush(self._heaps[self.wumpus_possible(cell)], (p, cell))
+        dirty.clear()
+
+    def _reclassify(self):
+        # El Wumpus dejó de ser posible en casi todas partes: rehacer su pila
+        stale, self._heaps = self._heaps[1], (self._heaps[0], [])
+        self._dirty.update(cell for _, cell in stale)
+
+    def _valid(self, entry, wumpus):
+        p, cell = entry
+        return (cell in self.knowledge.frontier_cells and p == self.pit_probability(cell)
+                and self.wumpus_possible(cell) == wumpus)
+
+    def _top(self, wumpus):
+        heap = self._heaps[wumpus]
+        while heap and not self._valid(heap[0], wumpus):
+            heappop(heap)
+        return heap[0] if heap else None
+
+    def _ties(self, wumpus, p):
+        # Casillas válidas de la pila con probabilidad de pozo p
+        heap = self._heaps[wumpus]
+        cells = set()
+        while heap and heap[0][0] == p:
+            entry = heappop(heap)
+            if self._valid(entry, wumpus):
+                cells.add(entry[1])
+        for cell in cells:
+            heappush(heap, (p, cell))
+        return cells
+
+    def safest(self, rng):
+        """
+        Casilla de la frontera con menor riesgo (al azar entre empatadas), o
+        None si todas son mortales. Solo mira el tope de cada pila.
+        """
+        self._flush()
+        best, lowest = [], 1.0
+        for wumpus in (False, True):
+            top = self._top(wumpus)
+            if top is None:
+                continue
+            p, cell = top
+            r = 1 - (1 - p) * (1 - self.wumpus_probability(cell)) if wumpus else p
+            if r < lowest:
+                best, lowest = [(wumpus, p)], r
+            elif r == lowest:
+                best.append((wumpus, p))
+        cells = set()
+        for wumpus, p in best:
+            cells |= self._ties(wumpus, p)
+        return rng.choice(sorted(cells)) if cells else None
@@ -0,0 +1,287 @@
+# src/knowledge.py
+#
+# Memoria del agente: qué casillas visitó, cuáles sabe seguras o peligrosas
+# y cuál es la frontera de exploración, mantenida de forma incremental.
+
+
+class IndexedSet:
+    """
+    Conjunto con alta, baja, pertenencia y elección al azar en O(1).
+
+    Guarda los elementos en una lista (para elegir por índice) y un dict
+    elemento -> índice; al borrar, el último ocupa el hueco.
+    """
+
+    __slots__ = ('items', 'index')
+
+    def __init__(self, items=()):
+        self.items = []
+        self.index = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        i = self.index.pop(item, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+    def choice(self, rng):
+        return rng.choice(self.items)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self):
+        return f'IndexedSet({self.items!r})'
+
+
+class _WatchedSet(set):
+    # set normal que avisa a la base de conocimiento cuando entra algo nuevo,
+    # así agent.visited.add(pos) desde main.py mantiene la frontera al día
+    __slots__ = ('on_add',)
+
+    def __init__(self, on_add):
+        super().__init__()
+        self.on_add = on_add
+
+    def add(self, pos):
+        if pos not in self:
+            set.add(self, pos)
+            self.on_add(pos)
+
+
+class SetKnowledge:
+    """
+    Conocimiento del agente guardado en sets de tuplas (x, y).
+
+    La frontera (casillas vecinas de una segura, sin visitar y no marcadas
+    como peligrosas) se actualiza en cada alta en vez de recalcularse, así
+    que cada paso del agente cuesta lo mismo sin importar cuánto exploró.
+
+    Los listeners (p. ej. el planificador) reciben cell_known(pos) cuando una
+    casilla pasa a ser segura o visitada y cell_blocked(pos) cuando se
+    descubre peligrosa.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.listeners = []
+        self.visited = _WatchedSet(self._on_visited)        # Casillas visitadas
+        self.safe_cells = _WatchedSet(self._on_safe)         # Casillas seguras conocidas
+        self.unsafe_cells = _WatchedSet(self._on_unsafe)     # Casillas deducidas como peligrosas
+        self.danger_cells = _WatchedSet(self._on_danger)     # Casillas donde murió (Pozo, Wumpus)
+        self.frontier_cells = IndexedSet()                   # Casillas frontera para explorar
+
+    def neighbors(self, pos):
+        x, y = pos
+        if x > 0:
+            yield x - 1, y
+        if x < self.size - 1:
+            yield x + 1, y
+        if y > 0:
+            yield x, y - 1
+        if y < self.size - 1:
+            yield x, y + 1
+
+    def _on_safe(self, pos):
+        for n in self.neighbors(pos):
+            if n not in self.visited and n not in self.unsafe_cells:
+                self.frontier_cells.add(n)
+        for listener in self.listeners:
+            listener.cell_known(pos)
+
+    def _on_visited(self, pos):
+        self.frontier_cells.discard(pos)
+        for listener in self.listeners:
+            listener.cell_known(pos)
+
+    def _on_unsafe(self, pos):
+        self.frontier_cells.discard(pos)
+
+    def _on_danger(self, pos):
+        for listener in self.listeners:
+            listener.cell_blocked(pos)
+
+    def mark_neighbors_safe(self, pos):
+        # Sin viento ni hedor en pos: sus vecinas sin visitar son seguras
+        for n in self.neighbors(pos):
+            if n not in self.visited and n not in self.safe_cells:
+                self.safe_cells.add(n)
+
+
+def _bits(row):
+    # Columnas con el bit encendido en una fila, de menor a mayor
+    while row:
+        low = row & -row
+        yield low.bit_length() - 1
+        row ^= low
+
+
+class CellSetView:
+    """
+    Vista tipo set de (x, y) sobre una lista de filas de bits.
+
+    Permite seguir usando `(i, j) in agent.visited`, `agent.visited.add(pos)`
+    o iterar las casillas con el backend de bitboards.
+    """
+
+    __slots__ = ('rows', 'on_add')
+
+    def __init__(self, rows, on_add=None):
+        self.rows = rows
+        self.on_add = on_add
+
+    def __contains__(self, pos):
+        x, y = pos
+        return 0 <= x < len(self.rows) and 0 <= y and (self.rows[x] >> y) & 1 == 1
+
+    def add(self, pos):
+        x, y = pos
+        bit = 1 << y
+        if not self.rows[x] & bit:
+            self.rows[x] |= bit
+            if self.on_add:
+                self.on_add(pos)
+
+    def __iter__(self):
+        for x, row in enumerate(self.rows):
+            for y in _bits(row):
+                yield x, y
+
+    def __len__(self):
+        return sum(row.bit_count() for row in self.rows)
+
+    def __bool__(self):
+        return any(self.rows)
+
+    def __repr__(self):
+        return f'CellSetView({set(self)!r})'
+
+
+class FrontierView:
+    # Frontera del backend de bitboards: bits por fila más un IndexedSet de ids
+    # de casilla para poder elegir una al azar en O(1)
+    __slots__ = ('knowledge',)
+
+    def __init__(self, knowledge):
+        self.knowledge = knowledge
+
+    def __contains__(self, pos):
+        x, y = pos
+        return x * self.knowledge.size + y in self.knowledge.frontier_ids
+
+    def choice(self, rng):
+        return divmod(self.knowledge.frontier_ids.choice(rng), self.knowledge.size)
+
+    def __iter__(self):
+        size = self.knowledge.size
+        return (divmod(cell, size) for cell in self.knowledge.frontier_ids)
+
+    def __len__(self):
+        return len(self.knowledge.frontier_ids)
+
+    def __bool__(self):
+        return bool(self.knowledge.frontier_ids)
+
+
+class BitboardKnowledge:
+    """
+    Conocimiento del agente como bitboards: un entero por fila, un bit por columna.
+
+    La pertenencia es un shift y una máscara, sin tuplas ni hashing, y la
+    frontera de una fila se deduce de una sola vez:
+
+        frontera[r] = (seguras[r] << 1 | seguras[r] >> 1 | seguras[r-1] | seguras[r+1])
+                      & ~visitadas[r] & ~peligrosas[r]
+
+    Cada alta recalcula solo las filas vecinas a la que cambió. Los listeners
+    se avisan igual que en SetKnowledge.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.listeners = []
+        self.full = (1 << size) - 1
+        self.visited_rows = [0] * size
+        self.safe_rows = [0] * size
+        self.unsafe_rows = [0] * size
+        self.danger_rows = [0] * size
+        self.frontier_rows = [0] * size
+        self.frontier_ids = IndexedSet()
+        self.visited = CellSetView(self.visited_rows, self._on_known)
+        self.safe_cells = CellSetView(self.safe_rows, self._on_known)
+        self.unsafe_cells = CellSetView(self.unsafe_rows, self._on_change)
+        self.danger_cells = CellSetView(self.danger_rows, self._on_danger)
+        self.frontier_cells = FrontierView(self)
+
+    def _on_change(self, pos):
+        # Un cambio en la fila x puede mover la frontera de las filas x-1, x y x+1
+        self._refresh_frontier(pos[0] - 1, pos[0] + 1)
+
+    def _on_known(self, pos):
+        self._on_change(pos)
+        for listener in self.listeners:
+            listener.cell_known(pos)
+
+    def _on_danger(self, pos):
+        for listener in self.listeners:
+            listener.cell_blocked(pos)
+
+    def _refresh_frontier(self, first, last):
+        size, full = self.size, self.full
+        safe = self.safe_rows
+        for r in range(max(0, first), min(size - 1, last) + 1):
+            near = (safe[r] << 1) | (safe[r] >> 1)
+            if r > 0:
+                near |= safe[r - 1]
+            if r < size - 1:
+                near |= safe[r + 1]
+            new = near & full & ~self.visited_rows[r] & ~self.unsafe_rows[r]
+            old = self.frontier_rows[r]
+            if new == old:
+                continue
+            self.frontier_rows[r] = new
+            base = r * size
+            for y in _bits(new & ~old):
+                self.frontier_ids.add(base + y)
+            for y in _bits(old & ~new):
+                self.frontier_ids.discard(base + y)
+
+    def mark_neighbors_safe(self, pos):
+        # Sin viento ni hedor en pos: sus vecinas sin visitar son seguras (tres filas a la vez)
+        x, y = pos
+        bit = 1 << y
+        added = []
+        for r, mask in ((x - 1, bit), (x, (bit << 1) | (bit >> 1)), (x + 1, bit)):
+            if 0 <= r < self.size:
+                new = mask & self.full & ~self.visited_rows[r] & ~self.safe_rows[r]
+                if new:
+                    self.safe_rows[r] |= new
+                    added.extend((r, c) for c in _bits(new))
+        if added:
+            self._refresh_frontier(x - 2, x + 2)
+            for listener in self.listeners:
+                for cell in added:
+                    listener.cell_known(cell)
+
+
+# Backends de conocimiento disponibles para Agent(knowledge=...)
+KNOWLEDGE_BACKENDS = {'sets': SetKnowledge, 'bitboard': BitboardKnowledge}
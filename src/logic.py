@@ -0,0 +1,239 @@
+# src/logic.py
+#
+# Base de conocimiento proposicional incremental (CNF) con propagación
+# unitaria por literales vigilados, y el modelo de peligros que la usa.
+
+from src.board import BREEZE, STENCH
+from src.inference import HazardTracker
+
+
+class KnowledgeBase:
+    """
+    Cláusulas CNF sobre variables enteras (literal v o -v) con propagación unitaria.
+
+    Cada cláusula vigila dos de sus literales; cuando uno se vuelve falso
+    solo se revisan las cláusulas que lo vigilan, así que agregar un hecho
+    cuesta en proporción a las cláusulas afectadas y no al tamaño de la base.
+    Solo se deduce por propagación unitaria (incompleto pero acotado).
+    on_assign(var, value) se llama por cada variable que queda determinada;
+    desde ahí se pueden encolar más hechos con enqueue(), que se propagan
+    en la misma pasada (o con propagate()).
+
+    Una contradicción (una cláusula con todos sus literales falsos) deja
+    conflict en True y levanta ValueError; a partir de ahí la base ya no
+    responde: cualquier consulta o hecho nuevo vuelve a levantarlo.
+    """
+
+    def __init__(self, on_assign=None):
+        self.value = {}       # variable -> True/False
+        self.clauses = []     # listas de literales; las posiciones 0 y 1 son las vigiladas
+        self.watches = {}     # literal -> índices de cláusulas que lo vigilan
+        self.conflict = False
+        self.on_assign = on_assign
+        self._queue = []
+
+    def _check(self):
+        if self.conflict:
+            raise ValueError("La base de conocimiento es inconsistente")
+
+    def _contradiction(self):
+        self.conflict = True
+        self._queue.clear()
+        self._check()
+
+    def literal_value(self, lit):
+        self._check()
+        v = self.value.get(abs(lit))
+        if v is None:
+            return None
+        return v if lit > 0 else not v
+
+    def add_clause(self, literals):
+        # Simplifica con lo ya asignado antes de guardar
+        clause = []
+        for lit in literals:
+            v = self.literal_value(lit)
+            if v is True:
+                return  # Ya satisfecha
+            if v is None and lit not in clause:
+                clause.append(lit)
+        if not clause:
+            self._contradiction()
+        elif len(clause) == 1:
+            self.assert_literal(clause[0])
+        else:
+            index = len(self.clauses)
+            self.clauses.append(clause)
+            self.watches.setdefault(clause[0], []).append(index)
+            self.watches.setdefault(clause[1], []).append(index)
+
+    def assert_literal(self, lit):
+        self.enqueue(lit)
+        self.propagate()
+
+    def enqueue(self, lit):
+        # Asigna lit sin propagar todavía (la propagación en curso, o la
+        # próxima llamada a propagate(), revisa sus cláusulas)
+        v = self.literal_value(lit)
+        if v is False:
+            self._contradiction()
+        elif v is None:
+            self.value[abs(lit)] = lit > 0
+            self._queue.append(lit)
+            if self.on_assign:
+                self.on_assign(abs(lit), lit > 0)
+
+    def propagate(self):
+        self._check()
+        while self._queue:
+            false_lit = -self._queue.pop()
+            watching = self.watches.get(false_lit)
+            if not watching:
+                continue
+            keep = []
+            for i, index in enumerate(watching):
+                clause = self.clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) is True:
+                    keep.append(index)
+                    continue
+                # Buscar otro literal no falso para vigilar
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    # Unitaria (o en conflicto): clause[0] tiene que ser verdadero
+                    keep.append(index)
+                    self.enqueue(clause[0])
+            self.watches[false_lit] = keep
+
+
+class LogicModel(HazardTracker):
+    """
+    Modelo de peligros basado en la base de conocimiento proposicional.
+
+    Variables: P(x, y) hay pozo, W(x, y) está el Wumpus. Cada percepción se
+    traduce en cláusulas (viento -> alguna vecina con pozo, sin viento ->
+    ninguna, lo mismo con hedor y Wumpus) y la muerte en un hecho. Lo que
+    la propagación deja determinado se vuelca a safe_cells, unsafe_cells y
+    wumpus_at. No estima probabilidades: risk() es 0, 1 o 0.5.
+    """
+
+    def __init__(self, knowledge, size):
+        super().__init__(knowledge, size)
+        self.kb = KnowledgeBase(self._on_assign)
+        self.observed = set()
+        self.wumpus_dead = False
+        self.wumpus_vars = set()  # Variables W que aparecen en alguna cláusula
+        self.pit_free = set()     # Casillas con ¬P pero W todavía sin determinar
+        self.stench_region = None # Intersección de las cláusulas de hedor (un solo Wumpus)
+
+    def pit(self, pos):
+        return 1 + 2 * (pos[0] * self.size + pos[1])
+
+    def wumpus(self, pos):
+        return 2 + 2 * (pos[0] * self.size + pos[1])
+
+    def _cell(self, var):
+        return divmod((var - 1) // 2, self.size)
+
+    def _on_assign(self, var, value):
+        pos = self._cell(var)
+        is_pit = var % 2 == 1
+        if not is_pit and self.wumpus_dead:
+            return  # Con el Wumpus muerto el hedor ya no dice nada
+        if value:
+            self.knowledge.unsafe_cells.add(pos)
+            if not is_pit:
+                self.wumpus_at = pos
+                # Hay un solo Wumpus: en ninguna otra casilla mencionada puede estar
+                for w in self.wumpus_vars:
+                    if w != var:
+                        self.kb.enqueue(-w)
+            return
+        self._check_safe(pos)
+
+    def _check_safe(self, pos):
+        if self.kb.literal_value(-self.pit(pos)) is not True:
+            return
+        if self.wumpus_dead or self.kb.literal_value(-self.wumpus(pos)) is True:
+            self.pit_free.discard(pos)
+            if pos not in self.knowledge.safe_cells:
+                self.knowledge.safe_cells.add(pos)
+        else:
+            self.pit_free.add(pos)
+
+    def _mention_wumpus(self, positions):
+        for n in positions:
+            var = self.wumpus(n)
+            self.wumpus_vars.add(var)
+            if self.wumpus_at is not None and n != self.wumpus_at:
+                self.kb.enqueue(-var)
+
+    def observe(self, pos, flags):
+        if pos in self.observed:
+            return
+        self.observed.add(pos)
+        kb = self.kb
+        nbrs = list(self.neighbors(pos))
+        # W es "el Wumpus vivo está ahí": muerto, ya no se agregan hechos sobre W
+        # (la casilla donde se lo encontró quedó con W y contradiría el ¬W de ahora)
+        alive = not self.wumpus_dead
+        if alive:
+            self._mention_wumpus(nbrs + [pos])
+        kb.assert_literal(-self.pit(pos))
+        if alive:
+            kb.assert_literal(-self.wumpus(pos))
+        if flags & BREEZE:
+            kb.add_clause([self.pit(n) for n in nbrs])
+        else:
+            for n in nbrs:
+                kb.assert_literal(-self.pit(n))
+        if alive and flags & STENCH:
+            kb.add_clause([self.wumpus(n) for n in nbrs])
+            # Un solo Wumpus: tiene que estar en todas las zonas con hedor a la vez,
+            # así que lo que quede fuera de la intersección es ¬W
+            region = set(nbrs) if self.stench_region is None else self.stench_region & set(nbrs)
+            for n in (self.stench_region or set()) | set(nbrs):
+                if n not in region:
+                    kb.enqueue(-self.wumpus(n))
+            self.stench_region = region
+        elif alive:
+            for n in nbrs:
+                kb.assert_literal(-self.wumpus(n))
+        kb.propagate()
+
+    def pit_found(self, pos):
+        self.kb.assert_literal(self.pit(pos))
+
+    def wumpus_found(self, pos):
+        if not self.wumpus_dead:
+            self._mention_wumpus([pos])
+            self.kb.assert_literal(self.wumpus(pos))
+
+    def wumpus_killed(self):
+        if not self.wumpus_dead:
+            self.wumpus_dead = True
+            self.wumpus_at = None
+            for pos in list(self.pit_free):
+                self._check_safe(pos)
+
+    def wumpus_missed(self, cells):
+        # Flecha sin grito: ¬W en toda la línea de tiro
+        if self.wumpus_dead:
+            return
+        self._mention_wumpus(cells)
+        for pos in cells:
+            self.kb.assert_literal(-self.wumpus(pos))
+
+    def risk(self, cell):
+        p = self.kb.literal_value(self.pit(cell))
+        w = None if self.wumpus_dead else self.kb.literal_value(self.wumpus(cell))
+        if p or w:
+            return 1.0
+        if p is False and (self.wumpus_dead or w is False):
+            return 0.0
+        return 0.5
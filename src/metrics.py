@@ -0,0 +1,204 @@
+# src/metrics.py
+#
+# Contadores de llamadas e histogramas de latencia de los caminos calientes
+# (percepción, disparo, fases de auto_move y dibujo), exportables como JSON
+# o en el formato de texto de Prometheus.
+#
+# Desactivado no cuesta nada: enable() reemplaza los métodos medidos por
+# envoltorios que toman el tiempo y disable() deja los originales, así que
+# mientras no se llame a enable() el código corre exactamente igual.
+
+import functools
+import json
+import sys
+import time
+from bisect import bisect_left
+
+# Límites superiores de los cubos en segundos: de 100 ns a ~6.7 s, duplicando
+BUCKETS = tuple(1e-7 * 2 ** k for k in range(27))
+
+
+class Histogram:
+    """Cantidad de llamadas, tiempo total y cuántas cayeron en cada cubo."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # El último es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        # Estimación por el límite superior del cubo donde cae el cuantil
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': {_le(b): n for b, n in zip(self.bounds + (float('inf'),), self.counts) if n},
+        }
+
+
+def _le(bound):
+    return '+Inf' if bound == float('inf') else f"{bound:.3g}"
+
+
+class Registry:
+    """Histogramas por nombre de operación ('board.perceive', 'agent.hunt', ...)."""
+
+    def __init__(self):
+        self.histograms = {}
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def reset(self):
+        self.histograms.clear()
+
+    def as_dict(self):
+        return {name: h.as_dict() for name, h in sorted(self.histograms.items())}
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            '# HELP wumpus_call_seconds Latencia de las llamadas medidas',
+            '# TYPE wumpus_call_seconds histogram',
+        ]
+        for name, h in sorted(self.histograms.items()):
+            acumulado = 0
+            for bound, n in zip(h.bounds + (float('inf'),), h.counts):
+                acumulado += n
+                lines.append(f'wumpus_call_seconds_bucket{{op="{name}",le="{_le(bound)}"}} {acumulado}')
+            lines.append(f'wumpus_call_seconds_sum{{op="{name}"}} {h.sum!r}')
+            lines.append(f'wumpus_call_seconds_count{{op="{name}"}} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Atributos reemplazados por instrument(): (dueño, atributo) -> original
+_originals = {}
+
+
+def timed(fn, histogram):
+    # Envoltorio que suma la duración de cada llamada a fn en histogram
+    clock = time.perf_counter
+    observe = histogram.observe
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe(clock() - start)
+    return wrapper
+
+
+def instrument(owner, attr, name, registry=REGISTRY):
+    """
+    Reemplaza owner.attr (método de una clase, función de un módulo) por su
+    versión medida con el nombre name. Medir dos veces lo mismo no hace nada.
+    """
+    if (owner, attr) in _originals:
+        return
+    original = owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)
+    _originals[(owner, attr)] = original
+    setattr(owner, attr, timed(original, registry.histogram(name)))
+
+
+def _hot_paths():
+    from src.agent import Agent
+    from src.board import Board
+    from src.policytable import PolicyTable
+    from src.search import SearchPolicy
+
+    paths = [
+        (Board, 'perceive', 'board.perceive'),
+        (Board, 'percept_flags', 'board.percept_flags'),
+        (Board, 'shoot_arrow', 'board.shoot_arrow'),
+        (Agent, 'auto_move', 'agent.auto_move'),
+        (Agent, '_update_knowledge', 'agent.update_knowledge'),
+        (Agent, '_hunt', 'agent.hunt'),
+        (Agent, '_choose_target', 'agent.choose_target'),
+        (Agent, '_select_move', 'agent.select_move'),
+        (SearchPolicy, 'choose', 'search.choose'),
+        (PolicyTable, 'get', 'policy.lookup'),
+    ]
+    # El dibujo solo se mide si ya se cargó src.render (no arrastrar pygame
+    # a las corridas sin interfaz)
+    render = sys.modules.get('src.render')
+    if render is not None:
+        paths.append((render.GridRenderer, 'draw', 'render.grid'))
+    return paths
+
+
+def enable(registry=REGISTRY):
+    """Empieza a medir los caminos calientes."""
+    for owner, attr, name in _hot_paths():
+        instrument(owner, attr, name, registry)
+
+
+def disable():
+    """Deja todo como estaba: sin envoltorios y sin costo."""
+    for (owner, attr), original in _originals.items():
+        setattr(owner, attr, original)
+    _originals.clear()
+
+
+def enabled():
+    return bool(_originals)
+
+
+def export(prefix, registry=REGISTRY):
+    """Escribe prefix.json y prefix.prom con lo medido; devuelve las rutas."""
+    paths = (f"{prefix}.json", f"{prefix}.prom")
+    with open(paths[0], 'w', encoding='utf-8') as f:
+        f.write(registry.to_json())
+    with open(paths[1], 'w', encoding='utf-8') as f:
+        f.write(registry.to_prometheus())
+    return paths
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from src.config import TAM
+    from src.simulation import simulate, summarize
+
+    parser = argparse.ArgumentParser(description='Mide los caminos calientes en partidas sin interfaz')
+    parser.add_argument('episodios', type=int, nargs='?', default=1000)
+    parser.add_argument('--tam', type=int, default=TAM, help='lado del tablero')
+    parser.add_argument('--razonamiento', default='probabilistic', help='modo de razonamiento del agente')
+    parser.add_argument('--salida', default='metricas', help='prefijo de los archivos .json y .prom')
+    args = parser.parse_args()
+
+    enable()
+    resultados = simulate(args.episodios, seed=0, size=args.tam,
+                          agent_options={'reasoning': args.razonamiento})
+    disable()
+    print(summarize(resultados))
+    for name, h in REGISTRY.as_dict().items():
+        print(f"{name:24} {h['count']:>10} llamadas  media {h['mean'] * 1e6:8.2f} µs  p99 <= {h['p99'] * 1e6:.2f} µs")
+    print("Guardado en", ", ".join(export(args.salida)))
@@ -0,0 +1,140 @@
+# src/planner.py
+#
+# Planificador de caminos sobre las casillas que el agente sabe seguras.
+
+from collections import deque
+
+# Movimientos posibles y su desplazamiento (x = fila, y = columna)
+MOVES = (('UP', -1, 0), ('DOWN', 1, 0), ('LEFT', 0, -1), ('RIGHT', 0, 1))
+
+
+class DistanceField:
+    """
+    Distancia en pasos desde cada casilla transitable hasta el objetivo más cercano.
+
+    Se calcula con BFS la primera vez y luego se actualiza incrementalmente:
+    cuando aparece una casilla transitable nueva solo pueden bajar distancias,
+    así que alcanza con propagar desde ella. Con el campo armado, cada paso
+    hacia el objetivo es buscar una vecina con distancia d - 1.
+    """
+
+    def __init__(self, planner, goals):
+        self.planner = planner
+        self.goals = set(goals)
+        self.dist = {}
+        self.rebuild()
+
+    def rebuild(self):
+        self.dist = {g: 0 for g in self.goals if g in self.planner.passable}
+        self._propagate(deque(self.dist))
+
+    def add_cell(self, pos):
+        # pos acaba de volverse transitable
+        if pos in self.goals:
+            best = 0
+        else:
+            best = min((self.dist[n] for n in self.planner.neighbors(pos) if n in self.dist),
+                       default=None)
+            if best is None:
+                return  # Todavía no conecta con nada alcanzable
+            best += 1
+        if best < self.dist.get(pos, best + 1):
+            self.dist[pos] = best
+            self._propagate(deque([pos]))
+
+    def _propagate(self, queue):
+        dist, passable = self.dist, self.planner.passable
+        while queue:
+            cell = queue.popleft()
+            d = dist[cell] + 1
+            for n in self.planner.neighbors(cell):
+                if n in passable and d < dist.get(n, d + 1):
+                    dist[n] = d
+                    queue.append(n)
+
+    def next_step(self, pos):
+        # Dirección que acerca un paso al objetivo, o None si ya llegó o no hay camino
+        d = self.dist.get(pos)
+        if not d:
+            return None
+        x, y = pos
+        for direction, dx, dy in MOVES:
+            if self.dist.get((x + dx, y + dy)) == d - 1:
+                return direction
+        return None
+
+    def route(self, pos):
+        # Camino completo hasta el objetivo como lista de direcciones
+        steps = []
+        x, y = pos
+        direction = self.next_step((x, y))
+        while direction:
+            steps.append(direction)
+            _, dx, dy = next(m for m in MOVES if m[0] == direction)
+            x, y = x + dx, y + dy
+            direction = self.next_step((x, y))
+        return steps
+
+
+class Planner:
+    """
+    Grafo de casillas transitables (seguras o visitadas, sin peligro conocido)
+    con campos de distancia cacheados: uno hacia la salida (0, 0) y uno por
+    cada propósito ('hunt', 'explore') hacia las vecinas de su casilla objetivo.
+
+    Escucha a la base de conocimiento del agente: cell_known() cuando una
+    casilla pasa a ser segura o visitada y cell_blocked() cuando se descubre
+    peligrosa (esto último obliga a recalcular, pero es raro).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.passable = set()
+        self.blocked = set()
+        self.exit_field = DistanceField(self, {(0, 0)})
+        self.target_fields = {}  # propósito -> (casilla objetivo, DistanceField)
+
+    def neighbors(self, pos):
+        x, y = pos
+        if x > 0:
+            yield x - 1, y
+        if x < self.size - 1:
+            yield x + 1, y
+        if y > 0:
+            yield x, y - 1
+        if y < self.size - 1:
+            yield x, y + 1
+
+    def _fields(self):
+        yield self.exit_field
+        for _, field in self.target_fields.values():
+            yield field
+
+    def cell_known(self, pos):
+        if pos in self.passable or pos in self.blocked:
+            return
+        self.passable.add(pos)
+        for field in self._fields():
+            field.add_cell(pos)
+
+    def cell_blocked(self, pos):
+        self.blocked.add(pos)
+        if pos in self.passable:
+            self.passable.discard(pos)
+            for field in self._fields():
+                field.rebuild()
+
+    def step_to_exit(self, pos):
+        return self.exit_field.next_step(pos)
+
+    def route_to_exit(self, pos):
+        return self.exit_field.route(pos)
+
+    def step_to_target(self, pos, target, purpose='hunt'):
+        # Acerca al agente a una casilla vecina de target (desde donde puede
+        # disparar o entrar); el campo se reutiliza mientras el objetivo no cambie
+        cached = self.target_fields.get(purpose)
+        if cached is None or cached[0] != target:
+            cached = target, DistanceField(self, self.neighbors(target))
+            self.target_fields[purpose] = cached
+        return cached[1].next_step(pos)
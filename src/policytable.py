@@ -0,0 +1,316 @@
+# src/policytable.py
+#
+# Política compilada para la configuración de producción (TAM = 5,
+# N_POZOS = 3): se juegan offline todos los tableros posibles con el agente
+# de búsqueda y cada decisión queda guardada bajo la clave de lo que el
+# agente sabía en ese momento. Es una memoria de la búsqueda heurística, no
+# una política resuelta por inducción hacia atrás. El modo reasoning='table' del agente responde
+# después cada jugada con una sola consulta a la tabla, que se abre con mmap
+# al arrancar (no se carga en memoria).
+#
+# La clave es un hash de Zobrist de lo observado (percepción de cada casilla
+# visitada, muertes, disparos, grito) más la posición y si lleva el tesoro;
+# el agente la mantiene al día con un XOR por novedad.
+#
+# Archivo (little-endian):
+#   MAGIA (8 bytes) y CABECERA: lado u16, pozos u16, vidas u16, casillas u32,
+#   entradas u32 y semilla de Zobrist u64
+#   claves    u64 por casilla de la tabla hash (0 = vacía)
+#   acciones  u8 por casilla (0-3 mover, SHOOT + dirección disparar, QUIETO)
+#
+#   python -m src.policytable compilar [--mundos N]
+#   python -m src.policytable probar [episodios]
+
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from itertools import combinations
+
+from src.board import ENTRANCE, WUMPUS, TREASURE, PIT, safe_zone
+from src.config import TAM, N_POZOS, VIDAS
+from src.rules import agent_action
+from src.search import NODOS
+
+MAGIA = b'WPOL\x01\x00\x00\x00'
+CABECERA = struct.Struct('<HHH2xIIQ')
+INICIO_CLAVES = len(MAGIA) + CABECERA.size
+SEMILLA_ZOBRIST = 0x5755_4D50
+QUIETO = 8  # Acción guardada cuando auto_move no hace nada (agente atascado o ya afuera)
+
+# Opciones de SearchPolicy al compilar: sin apuro, más mundos y más nodos por
+# decisión (presupuesto en nodos: la misma semilla compila la misma tabla)
+BUSQUEDA_OFFLINE = {'particles': 128, 'nodes': 4 * NODOS}
+
+
+class Zobrist:
+    """Números al azar fijos de cada hecho que entra en la clave del agente."""
+
+    __slots__ = ('observed', 'death', 'shot', 'position', 'scream', 'treasure')
+
+    def __init__(self, size, seed=SEMILLA_ZOBRIST):
+        rng = random.Random(seed)
+        n = size * size
+        draw = lambda k: [rng.getrandbits(64) for _ in range(k)]
+        self.observed = draw(4 * n)   # casilla * 4 + (viento, hedor)
+        self.death = draw(2 * n)      # casilla * 2 + murió por el Wumpus
+        self.shot = draw(4 * n)       # casilla * 4 + dirección del disparo
+        self.position = draw(n)
+        self.scream, self.treasure = draw(2)
+
+
+@lru_cache(maxsize=16)
+def zobrist(size):
+    return Zobrist(size)
+
+
+def default_path(size=TAM):
+    # Carpeta de cache del usuario: el archivo se puede borrar y volver a compilar
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'wumpus_game', f'politica_{size}x{size}.bin')
+
+
+class PolicyTable:
+    """
+    Tabla hash de direccionamiento abierto leída con mmap.
+
+    get(key) devuelve la acción guardada para la clave o None si no está;
+    recorre las casillas desde key & mask hasta dar con la clave o con una
+    vacía (con carga de a lo sumo 1/2 casi siempre es la primera).
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIA)] != MAGIA:
+            self._mm.close()
+            raise ValueError(f"{path} no es una tabla de política")
+        (self.size, self.n_pits, self.lives, slots, self.entries,
+         seed) = CABECERA.unpack_from(self._mm, len(MAGIA))
+        if seed != SEMILLA_ZOBRIST:
+            self._mm.close()
+            raise ValueError(f"{path} se compiló con otras claves")
+        self._view = view = memoryview(self._mm)
+        keys = view[INICIO_CLAVES:INICIO_CLAVES + 8 * slots].cast('Q')
+        if sys.byteorder == 'big':
+            keys = array('Q', keys)  # Copia dada vuelta: en estas máquinas no es gratis
+            keys.byteswap()
+        self._keys = keys
+        self._actions = view[INICIO_CLAVES + 8 * slots:INICIO_CLAVES + 9 * slots]
+        self._mask = slots - 1
+
+    def get(self, key):
+        keys, mask = self._keys, self._mask
+        i = key & mask
+        while True:
+            k = keys[i]
+            if k == key:
+                return self._actions[i]
+            if not k:
+                return None
+            i = (i + 1) & mask
+
+    def __len__(self):
+        return self.entries
+
+    def close(self):
+        for view in (self._keys, self._actions, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+
+def write_table(entries, path, size=TAM, n_pits=N_POZOS, lives=VIDAS):
+    """Guarda {clave: acción} como tabla hash con carga de a lo sumo 1/2."""
+    slots = 1
+    while slots < 2 * len(entries):
+        slots <<= 1
+    mask = slots - 1
+    keys = array('Q', bytes(8 * slots))
+    actions = bytearray(slots)
+    for key, action in entries.items():
+        i = key & mask
+        while keys[i]:
+            i = (i + 1) & mask
+        keys[i] = key
+        actions[i] = action
+    if sys.byteorder == 'big':
+        keys.byteswap()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIA)
+        f.write(CABECERA.pack(size, n_pits, lives, slots, len(entries), SEMILLA_ZOBRIST))
+        f.write(keys.tobytes())
+        f.write(actions)
+    os.replace(tmp, path)  # Un agente que la tenga abierta sigue con la vieja
+
+
+@lru_cache(maxsize=4)
+def default_table(size=TAM, n_pits=N_POZOS, lives=VIDAS):
+    """
+    La tabla compilada en default_path(size), o None si no hay o se compiló
+    para otra partida (otra cantidad de pozos o de vidas).
+    """
+    try:
+        table = PolicyTable(default_path(size))
+    except (OSError, ValueError):
+        return None
+    if (table.size, table.n_pits, table.lives) != (size, n_pits, lives):
+        table.close()
+        return None
+    return table
+
+
+# --- Compilación ---
+
+def all_worlds(size=TAM, n_pits=N_POZOS):
+    """Todos los tableros posibles, como los de Board.place_elements (bytearray)."""
+    free = [c for c in range(size * size) if c not in safe_zone(size)]
+    for wumpus in free:
+        for treasure in free:
+            if treasure == wumpus:
+                continue
+            rest = [c for c in free if c != wumpus and c != treasure]
+            for pits in combinations(rest, n_pits):
+                cells = bytearray(size * size)
+                cells[0] = ENTRANCE
+                cells[wumpus] = WUMPUS
+                cells[treasure] = TREASURE
+                for c in pits:
+                    cells[c] = PIT
+                yield cells
+
+
+def count_worlds(size=TAM, n_pits=N_POZOS):
+    from math import comb
+    free = size * size - len(safe_zone(size))
+    return free * (free - 1) * comb(free - 2, n_pits)
+
+
+class _Recorder:
+    """
+    Tabla en construcción. El agente la consulta como a una PolicyTable; si
+    la clave falta decide con su búsqueda y watch() guarda lo que hizo.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.missed = None
+
+    def get(self, key):
+        action = self.entries.get(key)
+        self.missed = key if action is None else None
+        return action
+
+    def watch(self, agent):
+        auto_move = agent.auto_move
+
+        def recorded(board, heard_scream):
+            had_arrow = agent.has_arrow
+            self.missed = None
+            direction = auto_move(board, heard_scream)
+            if self.missed is not None:
+                action = agent_action(agent, had_arrow, direction)
+                self.entries[self.missed] = QUIETO if action is None else action
+            return direction
+        return recorded
+
+
+def compile_policy(worlds, size=TAM, lives=VIDAS, search=BUSQUEDA_OFFLINE, seed=0,
+                   progress=None):
+    """
+    Juega un episodio en cada tablero de worlds y devuelve {clave: acción}.
+
+    La tabla solo memoriza las decisiones de la SearchPolicy heurística en
+    los tableros jugados: no es inducción hacia atrás ni una política
+    óptima, y juega igual de bien que la búsqueda con estas opciones.
+    Cada decisión sale de la tabla si la clave ya está y si no, de la
+    búsqueda del agente (que queda guardada). Así la tabla es cerrada: en
+    cualquiera de esos tableros el modo 'table' encuentra todas sus claves
+    y juega exactamente lo mismo que al compilar. Fuera de esos tableros
+    puede faltar la clave y entonces decide la búsqueda. progress(i) se
+    llama cada 1000 tableros.
+    """
+    from src.agent import Agent
+    from src.board import Board
+    from src.simulation import run_episode
+
+    rng = random.Random(seed)
+    recorder = _Recorder()
+    for i, cells in enumerate(worlds, 1):
+        board = Board(size, layout=cells)
+        agent = Agent(size, lives, rng=rng, reasoning='table', search=search, table=recorder)
+        agent.auto_move = recorder.watch(agent)
+        run_episode(board, agent)
+        if progress and i % 1000 == 0:
+            progress(i, len(recorder.entries))
+    return recorder.entries
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Política compilada del Mundo de Wumpus')
+    sub = parser.add_subparsers(dest='orden', required=True)
+    compilar = sub.add_parser('compilar', help='juega todos los tableros y guarda la tabla')
+    compilar.add_argument('--tam', type=int, default=TAM, help='lado del tablero')
+    compilar.add_argument('--pozos', type=int, default=N_POZOS)
+    compilar.add_argument('--vidas', type=int, default=VIDAS)
+    compilar.add_argument('--mundos', type=int, default=None,
+                          help='solo esta cantidad de tableros al azar (por defecto todos)')
+    compilar.add_argument('--semilla', type=int, default=0)
+    compilar.add_argument('--salida', default=None, help='archivo (por defecto en la cache)')
+    probar = sub.add_parser('probar', help='juega partidas al azar con la tabla')
+    probar.add_argument('episodios', type=int, nargs='?', default=10000)
+    probar.add_argument('--tabla', default=None, help='archivo (por defecto el de la cache)')
+    probar.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.orden == 'compilar':
+        from src.board import Board
+
+        salida = args.salida or default_path(args.tam)
+        if args.mundos is None:
+            worlds = all_worlds(args.tam, args.pozos)
+            total = count_worlds(args.tam, args.pozos)
+        else:
+            rng = random.Random(args.semilla)
+            worlds = (Board(args.tam, args.pozos, rng=rng).cells for _ in range(args.mundos))
+            total = args.mundos
+        inicio = time.perf_counter()
+
+        def progress(i, entradas):
+            print(f"\r{i}/{total} tableros, {entradas} estados "
+                  f"({time.perf_counter() - inicio:.0f} s)", end='', flush=True)
+        entries = compile_policy(worlds, args.tam, args.vidas, seed=args.semilla, progress=progress)
+        write_table(entries, salida, args.tam, args.pozos, args.vidas)
+        print(f"\n{len(entries)} estados en {salida} ({os.path.getsize(salida) / 1e6:.1f} MB)")
+    else:
+        from src.simulation import simulate, summarize
+
+        table = PolicyTable(args.tabla or default_path())
+
+        class Counted:
+            # Cuenta aciertos y fallos de la tabla durante las partidas
+            hits = misses = 0
+
+            def get(self, key):
+                action = table.get(key)
+                if action is None:
+                    Counted.misses += 1
+                else:
+                    Counted.hits += 1
+                return action
+
+        inicio = time.perf_counter()
+        resultados = simulate(args.episodios, seed=args.semilla, size=table.size, n_pits=table.n_pits,
+                              lives=table.lives, agent_options={'reasoning': 'table', 'table': Counted()})
+        duracion = time.perf_counter() - inicio
+        print(summarize(resultados))
+        print(f"{len(table)} estados en la tabla; {Counted.hits} consultas encontradas, "
+              f"{Counted.misses} no (decididas con búsqueda); {duracion:.1f} s")
@@ -0,0 +1,379 @@
+# src/render.py
+#
+# Dibujo del tablero para la interfaz de pygame: capas estáticas
+# pre-renderizadas y redibujo solo de las casillas que cambiaron.
+
+import hashlib
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+import pygame
+
+from src.board import WUMPUS, TREASURE
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GRAY = (211, 211, 211)
+
+TEXTOS_EN_CACHE = 256  # Superficies de texto que se guardan como máximo
+
+
+def load_sprites(paths, size, cache_dir=None):
+    """
+    Carga las imágenes de paths escaladas a size x size, en un solo atlas.
+
+    El atlas (todas las imágenes ya escaladas, una al lado de la otra) se
+    guarda en cache_dir con el tamaño en el nombre; mientras sea más nuevo
+    que los originales se lee ese único archivo en vez de cargar y escalar
+    cada imagen. Devuelve subsuperficies del atlas en el orden de paths.
+    Necesita la ventana ya abierta (usa convert_alpha).
+    """
+    atlas = None
+    cache_file = None
+    if cache_dir:
+        key = hashlib.sha1('\0'.join(paths).encode()).hexdigest()[:12]
+        cache_file = os.path.join(cache_dir, f'sprites_{size}_{key}.png')
+        try:
+            if os.path.getmtime(cache_file) >= max(os.path.getmtime(p) for p in paths):
+                atlas = pygame.image.load(cache_file)
+        except (OSError, pygame.error):
+            atlas = None
+    if atlas is None:
+        atlas = pygame.Surface((size * len(paths), size), pygame.SRCALPHA)
+        for i, path in enumerate(paths):
+            atlas.blit(pygame.transform.scale(pygame.image.load(path), (size, size)), (i * size, 0))
+        if cache_file:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                pygame.image.save(atlas, cache_file)
+            except (OSError, pygame.error):
+                pass  # Sin cache en disco: la próxima vez se vuelve a escalar
+    atlas = atlas.convert_alpha()
+    return [atlas.subsurface((i * size, 0, size, size)) for i in range(len(paths))]
+
+
+CHUNK = 16           # Lado en casillas de cada bloque pre-compuesto del tablero
+ZOOM_MIN = 4         # Lado mínimo de casilla en píxeles
+ZOOM_MAX = 128       # Lado máximo de casilla en píxeles
+
+
+class GridRenderer:
+    """
+    Dibuja el tablero a través de una cámara (viewport) que sigue al agente.
+
+    El tablero se divide en bloques de CHUNK x CHUNK casillas; cada bloque
+    se compone una vez (niebla pre-renderizada más las casillas visibles)
+    y queda en una cache LRU, y solo se repinta la casilla que cambió
+    dentro de él. En cada cuadro se revisan solo las casillas que pueden
+    haber cambiado: donde estaba y donde está el agente, el Wumpus, el
+    tesoro, los peligros recién revelados y las casillas visitadas desde
+    el cuadro anterior, que avisa el conocimiento del agente (en turbo o al
+    correr hasta el final pueden ser varias). Si la cámara no se movió se
+    actualizan solo esas casillas; si se movió se pegan los bloques que
+    entran en pantalla. Así el costo depende del tamaño de la ventana y no
+    del tablero.
+
+    load_sprites(lado) devuelve ({código: imagen}, aventurero) para un lado
+    de sprite dado; se pide una vez por nivel de zoom.
+    draw() devuelve los rectángulos tocados, para pygame.display.update().
+    """
+
+    def __init__(self, size, view, cell_size, load_sprites):
+        self.size = size
+        self.view = pygame.Rect(0, 0, *view)
+        self.load_sprites = load_sprites
+        self.sprite_sets = {}         # lado de casilla -> (sprites, aventurero)
+        self.chunks = OrderedDict()   # (bloque fila, bloque columna) -> superficie
+        self.offset = (0, 0)          # Píxel del tablero en la esquina de la vista
+        self.follow = True            # La cámara sigue al agente hasta que se la arrastra
+        self.agent_pos = None         # Posición del agente en el último cuadro
+        self.visits = None            # Listener de las casillas visitadas entre cuadros
+        self.cell_size = None
+        self.moved = True             # La vista entera tiene que volver a pegarse
+        self.set_zoom(cell_size)
+        self.invalidate()
+
+    # --- Cámara ---
+    def set_zoom(self, cell_size):
+        cell_size = max(ZOOM_MIN, min(ZOOM_MAX, cell_size))
+        if cell_size == self.cell_size:
+            return
+        old = self.cell_size
+        self.cell_size = c = cell_size
+        self.margin = max(1, c // 20)
+        self.border = max(1, min(2, c // 8))
+        if c not in self.sprite_sets:
+            self.sprite_sets[c] = self.load_sprites(c - 2 * self.margin)
+        self.sprites, self.adventurer = self.sprite_sets[c]
+        self.tiles = {}               # estado visible -> superficie de la casilla
+        self.fog = self._fog_chunk()
+        self.chunks.clear()
+        # Suficientes bloques para cubrir varias veces la vista
+        across = self.view.w // (CHUNK * c) + 2, self.view.h // (CHUNK * c) + 2
+        self.max_chunks = 4 * across[0] * across[1]
+        if old is not None:
+            # Mantiene el centro de la vista al cambiar el zoom
+            cx, cy = self.offset[0] + self.view.w / 2, self.offset[1] + self.view.h / 2
+            self._move_to(int(cx * c / old - self.view.w / 2), int(cy * c / old - self.view.h / 2))
+            self.moved = True
+
+    def zoom(self, steps):
+        # Cada paso duplica (o divide a la mitad) el lado de la casilla
+        self.set_zoom(self.cell_size * 2 ** steps if steps > 0 else self.cell_size >> -steps)
+
+    def pan(self, dx, dy):
+        # Arrastrar la vista deja de seguir al agente (recenter() lo vuelve a activar)
+        self.follow = False
+        self._move_to(self.offset[0] + dx, self.offset[1] + dy)
+
+    def recenter(self):
+        # Centra ya en el agente del último cuadro: offset nunca queda sin
+        # valor para pan() o set_zoom()
+        self.follow = True
+        if self.agent_pos is not None:
+            self._center(self.agent_pos)
+
+    def _move_to(self, x, y):
+        side = self.size * self.cell_size
+        x = max(0, min(x, side - self.view.w))
+        y = max(0, min(y, side - self.view.h))
+        if (x, y) != self.offset:
+            self.offset = (x, y)
+            self.moved = True
+
+    def _follow(self, pos):
+        # Recentra solo cuando el agente se acerca al borde de la vista, así
+        # la mayoría de los pasos no mueven la cámara
+        c = self.cell_size
+        px, py = pos[1] * c, pos[0] * c
+        edge = min(2 * c, self.view.w // 4, self.view.h // 4)
+        ox, oy = self.offset
+        if edge <= px - ox <= self.view.w - c - edge and edge <= py - oy <= self.view.h - c - edge:
+            return
+        self._center(pos)
+
+    def _center(self, pos):
+        c = self.cell_size
+        self._move_to(pos[1] * c + c // 2 - self.view.w // 2, pos[0] * c + c // 2 - self.view.h // 2)
+
+    # --- Casillas y bloques ---
+    def _fog_chunk(self):
+        c = self.cell_size
+        fog = pygame.Surface((CHUNK * c, CHUNK * c))
+        fog.fill(GRAY)
+        for i in range(CHUNK):
+            for j in range(CHUNK):
+                pygame.draw.rect(fog, BLACK, (j * c, i * c, c, c), self.border)
+        return fog
+
+    def invalidate(self):
+        # Fuerza un redibujo completo en el próximo draw() (partida nueva, ventana expuesta)
+        self.board = None
+        self.agent = None
+
+    def _tile(self, state):
+        tile = self.tiles.get(state)
+        if tile is None:
+            code, here, carrying = state
+            c, m = self.cell_size, self.margin
+            tile = pygame.Surface((c, c))
+            tile.fill(WHITE)
+            pygame.draw.rect(tile, BLACK, (0, 0, c, c), self.border)
+            if code in self.sprites:
+                tile.blit(self.sprites[code], (m, m))
+            # Muestra el tesoro sobre el agente si lo acaba de tomar
+            if carrying:
+                tile.blit(self.sprites[TREASURE], (m, m))
+            # Siempre dibuja el aventurero sobre todo lo demás
+            if here:
+                tile.blit(self.adventurer, (m, m))
+            self.tiles[state] = tile
+        return tile
+
+    def _state(self, pos, board, agent, agent_pos, revealed):
+        # None si la casilla está bajo la niebla
+        here = pos == agent_pos
+        if not (here or pos in agent.visited or pos in revealed):
+            return None
+        code = board.cells[pos[0] * self.size + pos[1]]
+        if code == WUMPUS and not board.wumpus_alive:
+            code = None
+        return code, here, here and agent.has_treasure
+
+    def _paint(self, chunk, pos, state):
+        # Pinta una casilla dentro de la superficie de su bloque
+        c = self.cell_size
+        xy = ((pos[1] % CHUNK) * c, (pos[0] % CHUNK) * c)
+        if state is None:
+            chunk.blit(self.fog, xy, (xy, (c, c)))
+        else:
+            chunk.blit(self._tile(state), xy)
+
+    def _chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        chunk = self.fog.copy()
+        ci, cj = key
+        shown = self.shown
+        for i in range(ci * CHUNK, min(self.size, (ci + 1) * CHUNK)):
+            for j in range(cj * CHUNK, min(self.size, (cj + 1) * CHUNK)):
+                state = shown.get((i, j))
+                if state is not None:
+                    self._paint(chunk, (i, j), state)
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    # --- Dibujo ---
+    def draw(self, win, board, agent, revealed):
+        self.agent_pos = agent_pos = agent.get_position()
+        if board is not self.board or agent is not self.agent:
+            self._reset(board, agent, agent_pos, revealed)
+            changed = ()
+        else:
+            changed = self._update(board, agent, agent_pos, revealed)
+        if self.follow:
+            self._follow(agent_pos)
+
+        if self.moved:
+            self.moved = False
+            return [self._draw_view(win)]
+
+        rects = []
+        c = self.cell_size
+        ox, oy = self.offset
+        for pos in changed:
+            rect = pygame.Rect(pos[1] * c - ox, pos[0] * c - oy, c, c).clip(self.view)
+            if rect:
+                chunk = self._chunk((pos[0] // CHUNK, pos[1] // CHUNK))
+                area = rect.move(ox - (pos[1] // CHUNK) * CHUNK * c, oy - (pos[0] // CHUNK) * CHUNK * c)
+                win.blit(chunk, rect, area)
+                rects.append(rect)
+        return rects
+
+    def _draw_view(self, win):
+        # Pega los bloques que caen dentro de la vista
+        c = self.cell_size
+        span = CHUNK * c
+        ox, oy = self.offset
+        win.fill(GRAY, self.view)
+        clip = win.get_clip()
+        win.set_clip(self.view)
+        last = (self.size - 1) // CHUNK
+        for ci in range(oy // span, min(last, (oy + self.view.h - 1) // span) + 1):
+            for cj in range(ox // span, min(last, (ox + self.view.w - 1) // span) + 1):
+                win.blit(self._chunk((ci, cj)), (cj * span - ox, ci * span - oy))
+        # Lo que queda fuera del tablero (si es más chico que la vista) va en gris
+        side = self.size * c
+        if side - ox < self.view.w:
+            win.fill(GRAY, (side - ox, 0, self.view.w, self.view.h))
+        if side - oy < self.view.h:
+            win.fill(GRAY, (0, side - oy, self.view.w, self.view.h))
+        win.set_clip(clip)
+        return self.view
+
+    def _reset(self, board, agent, agent_pos, revealed):
+        self.board, self.agent = board, agent
+        self.revealed = set(revealed)
+        self.shown = {}               # casilla -> estado dibujado (solo las visibles)
+        for pos in set(agent.visited) | self.revealed | {agent_pos}:
+            self.shown[pos] = self._state(pos, board, agent, agent_pos, revealed)
+        self.watched = {agent_pos, board.treasure_pos, board.wumpus_pos} - {None}
+        if self.visits is not None and self.visits in self.visits.listeners:
+            self.visits.listeners.remove(self.visits)
+        self.visits = _Visits(agent.visited, agent.knowledge.listeners)
+        self.chunks.clear()
+        self.moved = True
+
+    def _update(self, board, agent, agent_pos, revealed):
+        # Casillas cuyo estado cambió desde el cuadro anterior (ya repintadas en su bloque)
+        cells = self.watched
+        if len(revealed) != len(self.revealed):
+            cells |= revealed - self.revealed
+            self.revealed = set(revealed)
+        cells.add(agent_pos)
+        if board.treasure_pos is not None:
+            cells.add(board.treasure_pos)
+        if board.wumpus_pos is not None:
+            cells.add(board.wumpus_pos)
+        # Las visitadas desde el cuadro anterior (varias en turbo)
+        if self.visits.cells:
+            cells |= self.visits.cells
+            self.visits.cells = set()
+
+        changed = []
+        for pos in cells:
+            state = self._state(pos, board, agent, agent_pos, revealed)
+            if state != self.shown.get(pos):
+                if state is None:
+                    del self.shown[pos]
+                else:
+                    self.shown[pos] = state
+                chunk = self.chunks.get((pos[0] // CHUNK, pos[1] // CHUNK))
+                if chunk is not None:
+                    self._paint(chunk, pos, state)
+                changed.append(pos)
+        self.watched = {agent_pos, board.treasure_pos, board.wumpus_pos} - {None}
+        return changed
+
+
+class _Visits:
+    # Listener del conocimiento del agente: junta las casillas que pasan a
+    # visitadas hasta que GridRenderer las repinta
+    __slots__ = ('visited', 'listeners', 'cells')
+
+    def __init__(self, visited, listeners):
+        self.visited = visited
+        self.listeners = listeners
+        self.cells = set()
+        listeners.append(self)
+
+    def cell_known(self, pos):
+        if pos in self.visited:
+            self.cells.add(pos)
+
+    def cell_blocked(self, pos):
+        pass
+
+
+class TextCache:
+    """
+    Cache LRU de textos ya rasterizados, con clave (texto, fuente, color).
+
+    font.render es lo más caro de dibujar el panel de estado y sus textos
+    cambian pocas veces por partida; al pasar de maxsize se descarta el
+    menos usado recientemente.
+    """
+
+    def __init__(self, maxsize=TEXTOS_EN_CACHE):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (text, font, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.maxsize:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+@lru_cache(maxsize=64)
+def wrap_message(message, width=45):
+    # Corta el mensaje en líneas de hasta width caracteres, en los espacios
+    lines = []
+    if message:
+        while len(message) > width:
+            idx = message[:width].rfind(" ")
+            lines.append(message[:idx])
+            message = message[idx+1:]
+        lines.append(message)
+    return tuple(lines)
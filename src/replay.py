@@ -0,0 +1,357 @@
+# src/replay.py
+#
+# Grabación de partidas en un log binario compacto, dividido en segmentos,
+# y lectura con mmap para recorrerlas o saltar a cualquiera sin copiarlas.
+#
+# Cada segmento es un par de archivos:
+#   seg-NNNNNN.rpl  cabecera MAGIA y después los registros uno tras otro
+#   seg-NNNNNN.idx  desplazamiento (uint64) de cada registro dentro del .rpl
+#
+# Registro de un episodio (little-endian):
+#   largo total u32, lado u16, vidas u8, banderas u8, acciones u32
+#   semilla u64 y pozos u32                  si tiene la bandera SEMILLA
+#   Wumpus, tesoro, pozos, pozo1, pozo2...    si no (u16, o u32 con INDICES_32)
+#   acciones de a dos por byte (4 bits cada una, la primera en los bits bajos)
+
+import bisect
+import mmap
+import os
+import random
+import struct
+
+from src.board import Board, WUMPUS, TREASURE, PIT, ENTRANCE
+from src.agent import Agent
+from src.config import TAM, VIDAS
+from src.rules import DIRECTIONS, SHOOT
+from src.simulation import run_episode
+
+MAGIA = b'WRPL\x01\x00\x00\x00'   # Identifica el formato (y su versión) al principio de cada .rpl
+SEGMENTO_BYTES = 64 << 20         # Al pasar de este tamaño se empieza un segmento nuevo
+
+# Banderas del registro
+SEMILLA = 1      # El tablero se regenera con Board(lado, pozos, rng=Random(semilla))
+GANO = 2         # El episodio terminó en victoria
+INDICES_32 = 4   # Las casillas del tablero se guardan en u32 (tableros de más de 256x256)
+
+HEADER = struct.Struct('<IHBBI')
+SEED = struct.Struct('<QI')
+OFFSET = struct.Struct('<Q')
+
+
+def _segment_paths(directory, number):
+    base = os.path.join(directory, f'seg-{number:06d}')
+    return base + '.rpl', base + '.idx'
+
+
+def _segments(directory):
+    # Números de segmento existentes, en orden
+    names = (n for n in os.listdir(directory) if n.startswith('seg-') and n.endswith('.rpl'))
+    return sorted(int(n[4:-4]) for n in names)
+
+
+def encode_episode(size, lives, won, actions, seed=None, n_pits=None, board=None):
+    """
+    Arma el registro binario de un episodio.
+
+    El tablero va como la semilla con la que se generó (seed y n_pits) o,
+    si no hay semilla, como las posiciones de sus elementos tomadas de board
+    (que tiene que estar como al principio del episodio).
+    """
+    flags = GANO if won else 0
+    if seed is not None:
+        flags |= SEMILLA
+        world = SEED.pack(seed, n_pits)
+    else:
+        cells = [board.wumpus_pos, board.treasure_pos]
+        cells = [x * size + y for x, y in cells] + [len(board.pits)]
+        cells += sorted(x * size + y for x, y in board.pits)
+        wide = size * size > 0xFFFF
+        if wide:
+            flags |= INDICES_32
+        world = struct.pack(f'<{len(cells)}{"I" if wide else "H"}', *cells)
+    packed = bytearray((len(actions) + 1) // 2)
+    for i, action in enumerate(actions):
+        packed[i >> 1] |= action << (4 * (i & 1))
+    length = HEADER.size + len(world) + len(packed)
+    return HEADER.pack(length, size, lives, flags, len(actions)) + world + packed
+
+
+class EpisodeRecord:
+    """
+    Vista de un registro dentro del log (un memoryview sobre el mmap, sin copiar).
+
+    Los campos se leen de la cabecera al pedirlos; board() y agent() arman
+    el tablero inicial y un agente que repite las acciones grabadas, y
+    replay() vuelve a jugar el episodio con las reglas de run_episode.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def size(self):
+        return HEADER.unpack_from(self.data)[1]
+
+    @property
+    def lives(self):
+        return HEADER.unpack_from(self.data)[2]
+
+    @property
+    def won(self):
+        return bool(HEADER.unpack_from(self.data)[3] & GANO)
+
+    @property
+    def n_actions(self):
+        return HEADER.unpack_from(self.data)[4]
+
+    @property
+    def seed(self):
+        if HEADER.unpack_from(self.data)[3] & SEMILLA:
+            return SEED.unpack_from(self.data, HEADER.size)[0]
+        return None
+
+    def _world_end(self):
+        _, size, _, flags, _ = HEADER.unpack_from(self.data)
+        if flags & SEMILLA:
+            return HEADER.size + SEED.size
+        width = 4 if flags & INDICES_32 else 2
+        n_pits = struct.unpack_from('<I' if width == 4 else '<H', self.data, HEADER.size + 2 * width)[0]
+        return HEADER.size + (3 + n_pits) * width
+
+    def actions(self):
+        # Decodifica las acciones empaquetadas de a dos por byte
+        data, start = self.data, self._world_end()
+        for i in range(self.n_actions):
+            yield (data[start + (i >> 1)] >> (4 * (i & 1))) & 0xF
+
+    def board(self, rng=None):
+        _, size, _, flags, _ = HEADER.unpack_from(self.data)
+        if flags & SEMILLA:
+            seed, n_pits = SEED.unpack_from(self.data, HEADER.size)
+            return Board(size, n_pits, rng=random.Random(seed))
+        fmt = 'I' if flags & INDICES_32 else 'H'
+        width = struct.calcsize(fmt)
+        wumpus, treasure, n_pits = struct.unpack_from(f'<3{fmt}', self.data, HEADER.size)
+        cells = bytearray(size * size)
+        cells[0] = ENTRANCE
+        cells[wumpus] = WUMPUS
+        cells[treasure] = TREASURE
+        for cell in struct.unpack_from(f'<{n_pits}{fmt}', self.data, HEADER.size + 3 * width):
+            cells[cell] = PIT
+        return Board(size, rng=rng, layout=cells)
+
+    def agent(self):
+        return ScriptedAgent(self.actions(), self.size, self.lives)
+
+    def replay(self):
+        # Vuelve a jugar el episodio; sin tope de pasos, termina con las acciones
+        return run_episode(self.board(), self.agent(), max_steps=self.n_actions + 1)
+
+    def __repr__(self):
+        return (f'EpisodeRecord(size={self.size}, lives={self.lives}, won={self.won}, '
+                f'actions={self.n_actions}, seed={self.seed})')
+
+
+class ScriptedAgent(Agent):
+    """
+    Agente que repite una secuencia grabada de acciones en vez de decidir.
+
+    Se usa en cualquier lugar donde va un Agent (run_episode, la interfaz
+    de pygame), así la repetición pasa por las mismas reglas que la
+    partida original. Cuando se acaban las acciones devuelve None.
+    """
+
+    def __init__(self, actions, size=TAM, lives=VIDAS):
+        super().__init__(size, lives, reasoning='basic')
+        self.script = iter(actions)
+
+    def auto_move(self, board, heard_scream):
+        action = next(self.script, None)
+        if action is None:
+            return None
+        if action >= SHOOT:
+            direction = DIRECTIONS[action - SHOOT]
+            board.shoot_arrow(self.x, self.y, direction)
+            self.has_arrow = False
+            self.last_shot = direction
+            return None
+        return DIRECTIONS[action]
+
+
+class ReplayWriter:
+    """
+    Agrega episodios al final del log de un directorio.
+
+    Si el directorio ya tiene segmentos sigue escribiendo en el último;
+    cuando un segmento pasa de segment_bytes abre el siguiente.
+    """
+
+    def __init__(self, directory, segment_bytes=SEGMENTO_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        existing = _segments(directory)
+        self.number = existing[-1] if existing else 0
+        self._open()
+
+    def _open(self):
+        rpl, idx = _segment_paths(self.directory, self.number)
+        self.records = open(rpl, 'ab')
+        self.index = open(idx, 'ab')
+        self.position = self.records.tell()
+        if self.position == 0:
+            self.records.write(MAGIA)
+            self.position = len(MAGIA)
+
+    def add(self, record):
+        if self.position + len(record) > self.segment_bytes and self.position > len(MAGIA):
+            self.close()
+            self.number += 1
+            self._open()
+        self.index.write(OFFSET.pack(self.position))
+        self.records.write(record)
+        self.position += len(record)
+
+    def record(self, board, agent, seed=None, max_steps=None):
+        """
+        Juega un episodio con run_episode y lo graba.
+
+        Con seed el tablero se guarda como esa semilla (tiene que haberse
+        generado con Board(lado, pozos, rng=Random(seed))); sin ella se
+        guardan las posiciones de sus elementos antes de empezar.
+        """
+        world = {'seed': seed, 'n_pits': board.n_pits} if seed is not None else \
+            {'board': Board(board.size, layout=bytearray(board.cells))}
+        actions = []
+        lives = agent.lives
+        result = run_episode(board, agent, max_steps, actions)
+        self.add(encode_episode(board.size, lives, result.won, actions, **world))
+        return result
+
+    def close(self):
+        self.records.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayLog:
+    """
+    Lector del log: mapea en memoria todos los segmentos de un directorio.
+
+    log[k] salta al episodio k (búsqueda binaria sobre los segmentos y un
+    acceso al índice) e iterar recorre todos en orden; en ningún caso se
+    copian ni se decodifican los registros hasta que se piden sus campos.
+    """
+
+    def __init__(self, directory):
+        self.maps = []
+        self.records = []    # memoryview de cada .rpl
+        self.offsets = []    # memoryview de cada .idx
+        self.starts = []     # número del primer episodio de cada segmento
+        total = 0
+        for number in _segments(directory):
+            rpl, idx = _segment_paths(directory, number)
+            if os.path.getsize(idx) == 0:
+                continue
+            with open(rpl, 'rb') as f, open(idx, 'rb') as g:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                index = mmap.mmap(g.fileno(), 0, access=mmap.ACCESS_READ)
+            if data[:len(MAGIA)] != MAGIA:
+                raise ValueError(f"{rpl} no es un segmento de repeticiones")
+            self.maps += [data, index]
+            self.records.append(memoryview(data))
+            self.offsets.append(memoryview(index))
+            self.starts.append(total)
+            total += len(index) // OFFSET.size
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def _record(self, segment, i):
+        data = self.records[segment]
+        offset = OFFSET.unpack_from(self.offsets[segment], i * OFFSET.size)[0]
+        length = HEADER.unpack_from(data, offset)[0]
+        return EpisodeRecord(data[offset:offset + length])
+
+    def __getitem__(self, k):
+        if k < 0:
+            k += self.total
+        if not 0 <= k < self.total:
+            raise IndexError(k)
+        segment = bisect.bisect_right(self.starts, k) - 1
+        return self._record(segment, k - self.starts[segment])
+
+    def __iter__(self):
+        for segment, index in enumerate(self.offsets):
+            for i in range(len(index) // OFFSET.size):
+                yield self._record(segment, i)
+
+    def close(self):
+        for view in self.records + self.offsets:
+            view.release()
+        for m in self.maps:
+            try:
+                m.close()
+            except BufferError:
+                pass  # Algún EpisodeRecord sigue vivo: el mapa se libera junto con él
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_episodes(directory, n_episodes, seed=0, size=TAM, n_pits=None, lives=VIDAS,
+                    max_steps=None, agent_options=None):
+    # Simula y graba n_episodes; el episodio i usa la semilla seed + i
+    agent_options = agent_options or {}
+    wins = 0
+    with ReplayWriter(directory) as writer:
+        for i in range(n_episodes):
+            episode_seed = (seed + i) % (1 << 64)
+            board = Board(size, n_pits, rng=random.Random(episode_seed))
+            agent = Agent(size, lives, rng=random.Random(~episode_seed), n_pits=board.n_pits,
+                          **agent_options)
+            wins += writer.record(board, agent, seed=episode_seed, max_steps=max_steps).won
+    return wins
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Repeticiones del Mundo de Wumpus')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    grabar = sub.add_parser('grabar', help='simula partidas y las agrega al log')
+    grabar.add_argument('directorio')
+    grabar.add_argument('partidas', type=int)
+    grabar.add_argument('--semilla', type=int, default=0)
+    grabar.add_argument('--tam', type=int, default=TAM)
+    grabar.add_argument('--pozos', type=int, default=None)
+    grabar.add_argument('--vidas', type=int, default=VIDAS)
+    ver = sub.add_parser('ver', help='muestra y vuelve a jugar un episodio del log')
+    ver.add_argument('directorio')
+    ver.add_argument('episodio', type=int)
+    args = parser.parse_args()
+
+    if args.comando == 'grabar':
+        inicio = time.perf_counter()
+        ganadas = record_episodes(args.directorio, args.partidas, args.semilla,
+                                  args.tam, args.pozos, args.vidas)
+        duracion = time.perf_counter() - inicio
+        print(f"{args.partidas} partidas grabadas ({ganadas} ganadas), {args.partidas / duracion:.0f} partidas/s")
+    else:
+        with ReplayLog(args.directorio) as log:
+            registro = log[args.episodio]
+            print(f"Episodio {args.episodio} de {len(log)}: {registro}")
+            registro.board().print_board()
+            print(registro.replay())
@@ -0,0 +1,159 @@
+# src/rules.py
+#
+# Las reglas del juego en un solo lugar: step(board, state, action) es una
+# función pura que devuelve (estado nuevo, eventos) sin tocar el tablero ni
+# al agente. El estado es un int empaquetado (posición, vidas y cuatro
+# banderas) y el tablero solo se lee, así que guardar una foto del estado
+# para mirar adelante es copiar un int y volver atrás es usar el viejo.
+#
+# Todas las interfaces (Game, el bucle de main.py, run_episode) pasan por
+# step(); capture() arma el estado desde sus objetos y sync() vuelca el
+# resultado en el agente y en el tablero que se muestra.
+
+from src.board import DANGER_HERE, PIT_HERE, TREASURE_HERE, WUMPUS_HERE, SCREAM, EMPTY
+
+# Acciones como enteros: 0-3 mover y SHOOT + dirección (4-7) disparar,
+# en el orden de DIRECTIONS
+DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+MOVE_ACTIONS = {direction: i for i, direction in enumerate(DIRECTIONS)}
+SHOOT = 4
+
+# Estado: bits 0-23 casilla plana x * size + y, bits 24-31 vidas, y banderas
+_CELL_MASK = (1 << 24) - 1
+_LIVES_SHIFT = 24
+_LIVES_ONE = 1 << _LIVES_SHIFT
+HAS_ARROW = 1 << 32
+HAS_TREASURE = 1 << 33
+WUMPUS_ALIVE = 1 << 34
+HEARD_SCREAM = 1 << 35
+
+# Eventos de un paso, como banderas de bits
+MOVED, BUMPED, FELL_IN_PIT, EATEN, LOST, FOUND_TREASURE, WON, SHOT, KILLED_WUMPUS = (
+    1 << k for k in range(9))
+DIED = FELL_IN_PIT | EATEN
+
+
+def pack(cell, lives, has_arrow=True, has_treasure=False, wumpus_alive=True, heard_scream=False):
+    return (cell | lives << _LIVES_SHIFT | HAS_ARROW * bool(has_arrow)
+            | HAS_TREASURE * bool(has_treasure) | WUMPUS_ALIVE * bool(wumpus_alive)
+            | HEARD_SCREAM * bool(heard_scream))
+
+
+def initial_state(lives):
+    # En la entrada, con flecha y el Wumpus vivo
+    return pack(0, lives)
+
+
+def cell_of(state):
+    return state & _CELL_MASK
+
+
+def position(state, size):
+    return divmod(state & _CELL_MASK, size)
+
+
+def lives_of(state):
+    return (state >> _LIVES_SHIFT) & 0xFF
+
+
+def is_over(state):
+    # Sin vidas, o de vuelta en la entrada con el tesoro
+    return lives_of(state) == 0 or (state & HAS_TREASURE and not state & _CELL_MASK)
+
+
+def destination(size, cell, direction):
+    # Casilla a la que lleva moverse desde cell (contra la pared no se mueve, como Agent.move)
+    x, y = divmod(cell, size)
+    if direction == 0:
+        return cell - size if x > 0 else cell
+    if direction == 1:
+        return cell + size if x < size - 1 else cell
+    if direction == 2:
+        return cell - 1 if y > 0 else cell
+    return cell + 1 if y < size - 1 else cell
+
+
+def percept_flags(board, state):
+    """
+    Banderas de Board.percept_flags en la casilla del estado, según el estado.
+
+    El tablero puede estar intacto o ya modificado por sync(): el tesoro
+    recogido y el Wumpus muerto se toman del estado, no de las casillas.
+    """
+    flags = board.percepts[state & _CELL_MASK]
+    if not state & WUMPUS_ALIVE:
+        flags &= ~WUMPUS_HERE
+    if state & HAS_TREASURE:
+        flags &= ~TREASURE_HERE
+    if state & HEARD_SCREAM:
+        flags |= SCREAM
+    return flags
+
+
+def step(board, state, action):
+    """
+    Aplica una acción y devuelve (estado nuevo, eventos).
+
+    - Mover: pozo o Wumpus vivo quitan una vida y devuelven a la entrada
+      (sin vidas el agente queda en la casilla donde murió); el tesoro se
+      recoge al pisarlo; con él, llegar a (0, 0) gana.
+    - Disparar: gasta la flecha; si el Wumpus vivo está en la línea de
+      tiro muere y se escucha el grito. Sin flecha no pasa nada.
+    """
+    if action >= SHOOT:
+        if not state & HAS_ARROW:
+            return state, 0
+        state &= ~HAS_ARROW
+        events = SHOT
+        if state & WUMPUS_ALIVE:
+            x, y = divmod(state & _CELL_MASK, board.size)
+            if board.in_line_of_fire(x, y, DIRECTIONS[action - SHOOT]):
+                state = (state & ~WUMPUS_ALIVE) | HEARD_SCREAM
+                events |= KILLED_WUMPUS
+        return state, events
+
+    cell = state & _CELL_MASK
+    target = destination(board.size, cell, action)
+    events = MOVED if target != cell else BUMPED
+    state = (state & ~_CELL_MASK) | target
+    flags = percept_flags(board, state)
+    if flags & DANGER_HERE:
+        events |= FELL_IN_PIT if flags & PIT_HERE else EATEN
+        state -= _LIVES_ONE
+        if lives_of(state) == 0:
+            events |= LOST
+        else:
+            state &= ~_CELL_MASK
+    elif flags & TREASURE_HERE:
+        state |= HAS_TREASURE
+        events |= FOUND_TREASURE
+    elif state & HAS_TREASURE and target == 0:
+        events |= WON
+    return state, events
+
+
+def agent_action(agent, had_arrow, direction):
+    # Acción que tomó auto_move (que dispara por su cuenta); None si no hizo nada
+    if had_arrow and not agent.has_arrow:
+        return SHOOT + MOVE_ACTIONS[agent.last_shot]
+    if direction:
+        return MOVE_ACTIONS[direction]
+    return None
+
+
+def capture(board, agent, heard_scream=False):
+    # Estado de una partida guardada en objetos (Agent o Player y Board)
+    return pack(agent.x * board.size + agent.y, agent.lives, agent.has_arrow,
+                agent.has_treasure, board.wumpus_alive, heard_scream)
+
+
+def sync(state, board, agent):
+    """Vuelca el estado en el agente y deja el tablero como lo ve la interfaz."""
+    agent.x, agent.y = divmod(state & _CELL_MASK, board.size)
+    agent.lives = (state >> _LIVES_SHIFT) & 0xFF
+    agent.has_arrow = bool(state & HAS_ARROW)
+    agent.has_treasure = bool(state & HAS_TREASURE)
+    if agent.has_treasure and board.treasure_pos is not None:
+        board.set_cell(*board.treasure_pos, EMPTY)
+    if not state & WUMPUS_ALIVE and board.wumpus_alive:
+        board.kill_wumpus()
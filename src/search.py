@@ -0,0 +1,508 @@
+# src/search.py
+#
+# Política de búsqueda para el modo reasoning='search' del agente: cuando
+# ya no quedan casillas seguras sin visitar, en vez de entrar a la de menor
+# riesgo muestrea mundos compatibles con lo que el agente observó y hace
+# expectimax de profundidad limitada sobre ellos (mover a una casilla de la
+# frontera o disparar la flecha), con una tabla de transposición LRU y un
+# presupuesto por jugada: de tiempo al jugar, o de nodos cuando la partida
+# tiene que repetirse igual con la misma semilla.
+#
+# Cada mundo muestreado es una partícula (máscara de pozos, casilla del
+# Wumpus, casilla del tesoro). Un nodo de azar reparte las partículas según
+# lo que se percibiría al llegar (viento, hedor, grito), así que el valor
+# de la información sale solo del árbol.
+
+import random
+import time
+from bisect import bisect
+from math import log
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from src.board import safe_zone
+from src.config import DENSIDAD_POZOS
+
+PARTICULAS = 64         # Mundos muestreados por decisión
+PROFUNDIDAD = 3         # Profundidad máxima del expectimax (se profundiza de a uno)
+PRESUPUESTO_MS = 20     # Tiempo por jugada; entra en un tick del auto-juego
+NODOS = 10_000          # Nodos por jugada en vez de tiempo (~20 ms), para partidas con semilla
+ENTRADAS_TABLA = 1 << 16
+COMPONENTE_EXACTA = 10  # Casillas máximas de una componente para sortear entre sus modelos exactos
+
+_POOLS = {}             # workers -> ProcessPoolExecutor compartido por todos los agentes
+
+# Valores (en la escala de las recompensas de src.vecenv)
+VALOR_MUERTE = -1000.0
+VALOR_TESORO = 1000.0
+COSTE_FLECHA = -10.0
+DESCUENTO_HOJA = 0.9    # El tesoro en casillas seguras todavía hay que ir a buscarlo
+
+
+class _Timeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=16)
+def _geometry(size):
+    # Máscaras de vecinas y de las cuatro líneas de tiro de cada casilla
+    neighbors = []
+    lines = []
+    for cell in range(size * size):
+        x, y = divmod(cell, size)
+        mask = 0
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < size and 0 <= ny < size:
+                mask |= 1 << (nx * size + ny)
+        neighbors.append(mask)
+        up = sum(1 << (i * size + y) for i in range(x))
+        down = sum(1 << (i * size + y) for i in range(x + 1, size))
+        left = sum(1 << (x * size + j) for j in range(y))
+        right = sum(1 << (x * size + j) for j in range(y + 1, size))
+        lines.append((up, down, left, right))
+    return tuple(neighbors), tuple(lines)
+
+
+@lru_cache(maxsize=4096)
+def _layouts(n_cells, constraints, prior):
+    """
+    Modelos de pozos de una componente que cumplen todas sus restricciones
+    (máscaras relativas a sus n_cells casillas) y sus pesos acumulados según
+    la probabilidad a priori, para sortear uno con un solo número al azar.
+    """
+    models, cumulative, total = [], [], 0.0
+    for model in range(1 << n_cells):
+        if all(model & c for c in constraints):
+            k = model.bit_count()
+            total += prior ** k * (1 - prior) ** (n_cells - k)
+            models.append(model)
+            cumulative.append(total)
+    return tuple(models), tuple(cumulative)
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class TranspositionTable:
+    """Valores de nodos ya evaluados, con tamaño acotado y descarte LRU."""
+
+    def __init__(self, maxsize=ENTRADAS_TABLA):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class _Context:
+    # Lo que comparte una búsqueda: partículas, geometría, reloj y tablas
+    __slots__ = ('size', 'particles', 'neighbors', 'lines', 'deadline', 'nodes', 'table',
+                 'frontiers')
+
+    def __init__(self, size, particles, deadline, nodes, table):
+        self.size = size
+        self.particles = particles
+        self.neighbors, self.lines = _geometry(size)
+        self.deadline = deadline
+        self.nodes = nodes            # Nodos que quedan por expandir (None: sin límite)
+        self.table = table
+        self.frontiers = {}           # visitadas -> frontera (la de cada hija sale de la madre)
+
+
+def _frontier(ctx, visited):
+    frontier = ctx.frontiers.get(visited)
+    if frontier is None:
+        adjacent = 0
+        neighbors = ctx.neighbors
+        for c in _bits(visited):
+            adjacent |= neighbors[c]
+        frontier = ctx.frontiers[visited] = adjacent & ~visited
+    return frontier
+
+
+def _enter(ctx, visited, frontier, c):
+    # Visitadas al entrar en c, con su frontera calculada sin recorrer todo lo visitado
+    child = visited | 1 << c
+    if child not in ctx.frontiers:
+        ctx.frontiers[child] = (frontier | ctx.neighbors[c]) & ~child
+    return child
+
+
+def _spend(ctx, frontier):
+    # Cada casilla de la frontera que se evalúa es un nodo de azar del árbol: se
+    # descuentan del presupuesto de nodos (o se mira el reloj)
+    if ctx.nodes is not None:
+        ctx.nodes -= frontier.bit_count() + 1
+        if ctx.nodes < 0:
+            raise _Timeout
+    elif time.perf_counter() > ctx.deadline:
+        raise _Timeout
+
+
+def _leaf(ctx, visited, alive, parts):
+    # Tesoro en una casilla de la frontera segura en todas las partículas
+    frontier = _frontier(ctx, visited)
+    _spend(ctx, frontier)
+    particles = ctx.particles
+    safe = []
+    for c in _bits(frontier):
+        if not any(particles[i][0] >> c & 1 or (alive and particles[i][1] == c) for i in parts):
+            safe.append(c)
+    if not safe:
+        return 0.0
+    found = sum(1 for i in parts if particles[i][2] in safe)
+    return DESCUENTO_HOJA * VALOR_TESORO * found / len(parts)
+
+
+def _value(ctx, pos, visited, arrow, alive, parts, depth, root=False):
+    """
+    Valor esperado del nodo (pos, casillas visitadas, flecha, Wumpus vivo)
+    con las partículas parts. Con root=True devuelve el valor de cada acción
+    ({('go', casilla) | ('shoot', dirección): valor}).
+    """
+    if depth == 0:
+        return _leaf(ctx, visited, alive, parts)
+    key = (pos, visited, arrow, alive, parts, depth)
+    if not root:
+        cached = ctx.table.get(key)
+        if cached is not None:
+            return cached
+    frontier = _frontier(ctx, visited)
+    _spend(ctx, frontier)
+    particles, neighbors, size = ctx.particles, ctx.neighbors, ctx.size
+    n = len(parts)
+    px, py = divmod(pos, size)
+    values = {}
+
+    # Ir hasta una casilla de la frontera (el costo es la distancia en pasos)
+    for c in _bits(frontier):
+        cx, cy = divmod(c, size)
+        value = -float(abs(cx - px) + abs(cy - py))
+        deaths = treasures = 0
+        groups = {}
+        near = neighbors[c]
+        for i in parts:
+            pits, wumpus, treasure = particles[i]
+            if pits >> c & 1 or (alive and wumpus == c):
+                deaths += 1
+            elif treasure == c:
+                treasures += 1
+            else:
+                seen = bool(near & pits) | (alive and wumpus >= 0 and near >> wumpus & 1) << 1
+                groups.setdefault(seen, []).append(i)
+        value += (deaths * VALOR_MUERTE + treasures * VALOR_TESORO) / n
+        child = _enter(ctx, visited, frontier, c) if groups else 0
+        for group in groups.values():
+            value += len(group) / n * _value(ctx, c, child, arrow, alive, tuple(group), depth - 1)
+        values[('go', c)] = value
+
+    # Disparar desde donde está: el grito (o su falta) reparte las partículas
+    if arrow and alive:
+        for direction, line in enumerate(ctx.lines[pos]):
+            hit = tuple(i for i in parts if particles[i][1] >= 0 and line >> particles[i][1] & 1)
+            if not hit:
+                continue
+            miss = tuple(i for i in parts if i not in hit)
+            value = COSTE_FLECHA + len(hit) / n * _value(ctx, pos, visited, False, False, hit, depth - 1)
+            if miss:
+                value += len(miss) / n * _value(ctx, pos, visited, False, True, miss, depth - 1)
+            values[('shoot', direction)] = value
+
+    if root:
+        return values
+    best = max(values.values()) if values else _leaf(ctx, visited, alive, parts)
+    ctx.table.put(key, best)
+    return best
+
+
+def _pool(workers):
+    pool = _POOLS.get(workers)
+    if pool is None:
+        pool = _POOLS[workers] = ProcessPoolExecutor(workers)
+    return pool
+
+
+def _search_root(size, particles, pos, visited, arrow, alive, depth, budget, nodes):
+    # Punto de entrada de los procesos del pool: una búsqueda completa a una profundidad
+    ctx = _Context(size, particles, time.perf_counter() + budget, nodes, TranspositionTable())
+    try:
+        result = _value(ctx, pos, visited, arrow, alive, tuple(range(len(particles))), depth, root=True)
+    except _Timeout:
+        return None
+    return result, ctx.nodes
+
+
+class SearchPolicy:
+    """
+    Decide a dónde arriesgarse (o si disparar a ciegas) con expectimax sobre
+    mundos muestreados.
+
+    choose(agent, pos) devuelve la casilla (x, y) a la que ir, la dirección
+    ('UP', ...) en la que disparar desde pos, o None si no terminó ni la
+    profundidad 1 dentro del presupuesto (el agente sigue entonces con la
+    casilla de menor riesgo). Se profundiza de a uno hasta
+    depth o hasta agotar el presupuesto y se usa la última profundidad
+    completa. El presupuesto es budget_ms, o nodes nodos si se da (un nodo
+    por casilla de frontera evaluada y por sorteo al muestrear; no depende
+    del reloj, así que con la misma semilla la partida es la misma). La tabla de transposición vale dentro de una búsqueda (entre
+    profundidades y ramas que llegan al mismo nodo); entre jugadas se
+    guarda solo la decisión de la raíz, por firma de lo observado, así que
+    una situación repetida en la misma partida se resuelve sin buscar
+    (cada SearchPolicy tiene sus tablas). Con workers > 1
+    cada profundidad se busca en paralelo en un pool de procesos compartido
+    (para presupuestos largos); nodes es entonces por proceso.
+    """
+
+    def __init__(self, size, rng=None, particles=PARTICULAS, depth=PROFUNDIDAD,
+                 budget_ms=PRESUPUESTO_MS, nodes=None, table_size=ENTRADAS_TABLA, workers=1,
+                 pit_prior=DENSIDAD_POZOS):
+        self.size = size
+        self.rng = rng if rng is not None else random
+        self.n_particles = particles
+        self.depth = depth
+        self.budget = budget_ms / 1000
+        self.nodes = nodes
+        self.table = TranspositionTable(table_size)      # Nodos de la búsqueda en curso
+        self.decisions = TranspositionTable(table_size)  # Firma de lo observado -> decisión
+        self.workers = workers
+        self.pit_prior = pit_prior
+        self.searches = 0
+        self._forbidden = sum(1 << c for c in safe_zone(size))
+
+    # --- Mundos compatibles con lo observado ---
+    def _reach(self, visited):
+        # Casillas a distancia <= depth + 1 de lo visitado: las únicas cuyos
+        # pozos puede mirar el árbol (entra a lo sumo depth casillas y percibe sus vecinas)
+        neighbors = _geometry(self.size)[0]
+        reach = edge = visited
+        for _ in range(self.depth + 1):
+            grown = 0
+            for c in _bits(edge):
+                grown |= neighbors[c]
+            edge = grown & ~reach
+            reach |= edge
+        return reach
+
+    def sample(self, hazards, visited):
+        """
+        Partículas compatibles con lo que sabe el modelo de peligros.
+
+        El Wumpus va a una casilla posible según el hedor; los pozos cumplen
+        cada restricción de viento (se sortean las vecinas hasta que todas
+        tienen al menos uno); el tesoro va a una casilla sin visitar libre.
+        Nada cae en la zona segura inicial, como en Board.place_elements.
+        Los pozos se sortean solo cerca de lo visitado (_reach); cada
+        componente de restricciones se sortea entre sus modelos válidos
+        (_layouts) o, si es grande, por rechazo, así el costo no crece con
+        el tablero.
+        """
+        return self._sample(hazards, visited)[0]
+
+    def _sample(self, hazards, visited, deadline=None, nodes=None):
+        # sample() dentro del presupuesto de la jugada: con deadline deja de
+        # sortear al pasarlo; con nodes cada partícula cuesta un nodo por sorteo
+        # y se usa a lo sumo la mitad. Devuelve (partículas, nodos gastados)
+        size, rng, prior = self.size, self.rng, self.pit_prior
+        index = lambda pos: pos[0] * size + pos[1]
+        known_pits = sum(1 << index(p) for p in hazards.pits)
+        no_pit = sum(1 << index(p) for p in hazards.no_pit) | self._forbidden | visited
+        constraints = []
+        for b in hazards.breezes:
+            cons = sum(1 << index(n) for n in hazards.neighbors(b))
+            if not cons & known_pits and cons & ~no_pit:
+                constraints.append(cons & ~no_pit)
+        # Restricciones que comparten casillas van juntas; las componentes se
+        # sortean por separado (son independientes) y cada una se reintenta sola
+        components = []
+        for cons in constraints:
+            merged = [cons, [cons]]
+            for comp in [comp for comp in components if comp[0] & cons]:
+                components.remove(comp)
+                merged[0] |= comp[0]
+                merged[1] += comp[1]
+            components.append(merged)
+        exact, rejected = [], []
+        for cells, group in components:
+            cells = list(_bits(cells))
+            if len(cells) > COMPONENTE_EXACTA:
+                rejected.append((cells, group))
+                continue
+            index_of = {c: i for i, c in enumerate(cells)}
+            relative = tuple(sorted({sum(1 << index_of[c] for c in _bits(cons)) for cons in group}))
+            models, cumulative = _layouts(len(cells), relative, prior)
+            if models:
+                exact.append(([sum(1 << cells[i] for i in _bits(m)) for m in models], cumulative))
+            else:
+                rejected.append((cells, group))
+        constrained = 0
+        for cons in constraints:
+            constrained |= cons
+        open_cells = self._reach(visited) & ~(no_pit | known_pits)
+        loose = list(_bits(open_cells & ~constrained))
+        skip = log(1.0 - prior) if 0 < prior < 1 else -1e-300
+        if hazards.wumpus_dead:
+            wumpus_cells = []
+        else:
+            if hazards.wumpus_at is not None:
+                candidates = [hazards.wumpus_at]
+            elif hazards.wumpus_candidates is not None:
+                candidates = hazards.wumpus_candidates
+            else:
+                candidates = ((x, y) for x in range(size) for y in range(size))
+            wumpus_cells = sorted(index(p) for p in candidates if hazards.wumpus_possible(p)
+                                  and not self._forbidden >> index(p) & 1)
+        treasure_cells = [c for c in range(size * size)
+                          if not (visited | self._forbidden) >> c & 1]
+
+        def pick(cells, taken):
+            # Una casilla de cells que no esté en taken (por rechazo: casi siempre al primer intento)
+            for _ in range(20):
+                c = rng.choice(cells)
+                if not taken >> c & 1:
+                    return c
+            return rng.choice([c for c in cells if not taken >> c & 1] or cells)
+
+        cost = 2 + len(exact) + sum(len(cells) for cells, _ in rejected) + int(prior * len(loose))
+        count = self.n_particles
+        if nodes is not None:
+            count = max(1, min(count, nodes // 2 // cost))
+        particles = []
+        for _ in range(count):
+            if deadline is not None and particles and time.perf_counter() > deadline:
+                break
+            # Casillas sueltas: saltos geométricos entre pozos, un sorteo por pozo y no por casilla
+            pits = known_pits
+            i = -1
+            while True:
+                i += 1 + int(log(1.0 - rng.random()) / skip)
+                if i >= len(loose):
+                    break
+                pits |= 1 << loose[i]
+            for layouts, cumulative in exact:
+                pits |= layouts[bisect(cumulative, rng.random() * cumulative[-1])
+                                if len(layouts) > 1 else 0]
+            for cells, group in rejected:
+                for _ in range(20):
+                    drawn = 0
+                    for c in cells:
+                        if rng.random() < prior:
+                            drawn |= 1 << c
+                    if all(cons & drawn for cons in group):
+                        break
+                else:
+                    # Sin suerte: forzar un pozo en cada restricción que falte
+                    for cons in group:
+                        if cons and not cons & drawn:
+                            drawn |= 1 << rng.choice(list(_bits(cons)))
+                pits |= drawn
+            wumpus = pick(wumpus_cells, pits) if wumpus_cells else -1
+            treasure = pick(treasure_cells, pits | (1 << wumpus if wumpus >= 0 else 0)) \
+                if treasure_cells else -1
+            particles.append((pits, wumpus, treasure))
+        return particles, cost * len(particles)
+
+    def _signature(self, agent, pos):
+        # Todo lo observado que afecta la decisión (la clave de decisions entre jugadas)
+        h = agent.hazards
+        return ('root', pos, frozenset(h.observed), frozenset(h.breezes), frozenset(h.pits),
+                frozenset(h.no_wumpus), None if h.wumpus_candidates is None
+                else frozenset(h.wumpus_candidates), h.wumpus_dead, agent.has_arrow)
+
+    def choose(self, agent, pos):
+        signature = self._signature(agent, pos)
+        decision = self.decisions.get(signature)
+        if decision is None:
+            decision = self._search(agent, pos)
+            if decision is None:
+                return None
+            self.decisions.put(signature, decision)
+        kind, arg = decision
+        if kind == 'go':
+            return divmod(arg, self.size)
+        return ('UP', 'DOWN', 'LEFT', 'RIGHT')[arg]
+
+    def _search(self, agent, pos):
+        inicio = time.perf_counter()
+        deadline = inicio + self.budget
+        size = self.size
+        # Las casillas donde murió cuentan como visitadas pero no se exploran desde ellas
+        visited = sum(1 << (x * size + y) for x, y in agent.visited
+                      if (x, y) not in agent.danger_cells)
+        if self.nodes is None:
+            particles, _ = self._sample(agent.hazards, visited, deadline=deadline)
+            nodes = None
+        else:
+            particles, spent = self._sample(agent.hazards, visited, nodes=self.nodes)
+            nodes = self.nodes - spent
+        cell = pos[0] * size + pos[1]
+        alive = not agent.hazards.wumpus_dead
+        parts = tuple(range(len(particles)))
+        self.searches += 1
+        best = None
+        # Un solo contexto para todas las profundidades: comparten el presupuesto
+        # y la tabla (las claves usan índices de estas partículas, no sirven después)
+        self.table.clear()
+        ctx = _Context(size, particles, deadline, nodes, self.table)
+        for depth in range(1, self.depth + 1):
+            if self.workers > 1:
+                result = self._search_parallel(ctx, cell, visited, agent.has_arrow, alive, depth)
+            else:
+                try:
+                    result = _value(ctx, cell, visited, agent.has_arrow, alive, parts, depth,
+                                    root=True)
+                except _Timeout:
+                    result = None
+            if result is None:
+                break
+            if result:
+                best = max(result, key=result.get)
+            if ctx.nodes is None and time.perf_counter() > deadline:
+                break
+        return best
+
+    def _search_parallel(self, ctx, cell, visited, arrow, alive, depth):
+        # Las partículas se reparten entre los procesos; cada uno evalúa todas las
+        # acciones con su parte y los valores se promedian ponderados por partículas
+        budget = ctx.deadline - time.perf_counter()
+        if ctx.nodes is None and budget <= 0:
+            return None
+        particles = ctx.particles
+        chunks = [particles[k::self.workers] for k in range(self.workers)]
+        pool = _pool(self.workers)
+        futures = [pool.submit(_search_root, self.size, chunk, cell, visited, arrow,
+                               alive, depth, budget, ctx.nodes) for chunk in chunks if chunk]
+        totals = {}
+        left = None
+        for future, chunk in zip(futures, chunks):
+            done = future.result()
+            if done is None:
+                return None
+            result, remaining = done
+            if remaining is not None:
+                left = remaining if left is None else min(left, remaining)
+            for action, value in result.items():
+                totals[action] = totals.get(action, 0.0) + value * len(chunk) / len(particles)
+        if left is not None:
+            ctx.nodes = left
+        return totals
@@ -0,0 +1,253 @@
+# src/server.py
+#
+# Servidor asyncio de partidas por TCP: un proceso y un solo bucle de
+# eventos atienden miles de sesiones de Game a la vez, cada una con su
+# tablero y un Player (sin la memoria del agente automático).
+#
+# Protocolo por líneas en UTF-8. El cliente manda los mismos comandos que
+# Game.play: UP, DOWN, LEFT, RIGHT, SHOOT <DIRECCION> o Q. El servidor
+# responde a cada turno (y al conectarse) con:
+#
+#   PERCEPCIONES Viento Hedor ...   lo que se percibe en la casilla
+#   MENSAJE <texto>                 avisos del juego (pozo, tesoro, flecha...)
+#   ESTADO <x> <y> <vidas> <flecha> <tesoro>   fin del turno: espera comando
+#   FIN GANASTE|PERDISTE|SALISTE|INACTIVO|ERROR   fin de la partida; cierra
+#
+# Las sesiones que no mandan nada en 'inactividad' segundos se cierran, y
+# una línea de más de 64 KiB (el límite del StreamReader) termina la
+# sesión con MENSAJE y FIN ERROR.
+#
+#   python -m src.server servir [--puerto 7777]
+#   python -m src.server carga [--sesiones 10000] [--turnos 20]
+
+import asyncio
+import random
+import time
+
+from src.board import Board
+from src.config import TAM, VIDAS
+from src.game import Game, Player
+
+PUERTO = 7777
+INACTIVIDAD = 60.0  # Segundos sin comandos antes de cerrar la sesión
+
+
+class Session:
+    __slots__ = ('game', 'writer', 'last_seen')
+
+    def __init__(self, game, writer):
+        self.game = game
+        self.writer = writer
+        self.last_seen = time.monotonic()
+
+
+def _turn_lines(game, mensajes=()):
+    # Líneas que cierran un turno: mensajes, percepciones y ESTADO (o FIN)
+    lines = [f"MENSAJE {m}" for m in mensajes]
+    agent = game.agent
+    if game.running:
+        lines.append("PERCEPCIONES " + " ".join(game.observe()))
+        lines.append(f"ESTADO {agent.x} {agent.y} {agent.lives} "
+                     f"{int(agent.has_arrow)} {int(agent.has_treasure)}")
+    elif agent.has_treasure and agent.get_position() == (0, 0):
+        lines.append("FIN GANASTE")
+    elif agent.lives == 0:
+        lines.append("FIN PERDISTE")
+    else:
+        lines.append("FIN SALISTE")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class GameServer:
+    """
+    Atiende una sesión de Game por conexión TCP.
+
+    Las partidas se crean con tablero de size x size, n_pits pozos y lives
+    vidas; rng (por defecto uno propio con la semilla dada) genera los
+    tableros. Una sola tarea barre las sesiones inactivas cada tanto en vez
+    de un temporizador por conexión.
+    """
+
+    def __init__(self, size=TAM, n_pits=None, lives=VIDAS, idle_timeout=INACTIVIDAD, seed=None):
+        self.size = size
+        self.n_pits = n_pits
+        self.lives = lives
+        self.idle_timeout = idle_timeout
+        self.rng = random.Random(seed)
+        self.sessions = {}  # writer -> Session
+        self.server = None
+        self._sweeper = None
+
+    def new_game(self):
+        board = Board(self.size, self.n_pits, rng=self.rng)
+        return Game(board=board, agent=Player(self.size, self.lives))
+
+    async def start(self, host='127.0.0.1', port=PUERTO):
+        self.server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        self._sweeper = asyncio.create_task(self._evict_idle())
+        return self.server
+
+    async def close(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.sessions):
+            writer.close()
+        # Cada handle() termina al ver el fin de su conexión
+        while self.sessions:
+            await asyncio.sleep(0.01)
+
+    async def handle(self, reader, writer):
+        session = Session(self.new_game(), writer)
+        self.sessions[writer] = session
+        game = session.game
+        try:
+            writer.write(_turn_lines(game))
+            while game.running:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Línea más larga que el límite del StreamReader
+                    game.running = False
+                    writer.write("MENSAJE Línea demasiado larga.\nFIN ERROR\n".encode())
+                    break
+                if not line:
+                    break  # El cliente cortó (o lo cerró el barrido de inactivas)
+                session.last_seen = time.monotonic()
+                mensajes = game.command(line.decode(errors='replace'))
+                writer.write(_turn_lines(game, mensajes))
+                await writer.drain()
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.sessions[writer]
+            writer.close()
+
+    async def _evict_idle(self):
+        while True:
+            await asyncio.sleep(max(0.1, self.idle_timeout / 4))
+            limite = time.monotonic() - self.idle_timeout
+            for writer, session in list(self.sessions.items()):
+                if session.last_seen < limite:
+                    session.game.running = False
+                    writer.write(b"FIN INACTIVO\n")
+                    writer.close()
+
+
+# --- Prueba de carga: muchas sesiones simultáneas jugando al azar ---
+
+COMANDOS = ('UP', 'DOWN', 'LEFT', 'RIGHT', 'UP', 'DOWN', 'LEFT', 'RIGHT', 'SHOOT UP', 'SHOOT RIGHT')
+
+
+async def _read_turn(reader):
+    # Lee hasta ESTADO o FIN; devuelve True si la partida sigue
+    while True:
+        line = await reader.readline()
+        if not line or line.startswith(b"FIN"):
+            return False
+        if line.startswith(b"ESTADO"):
+            return True
+
+
+async def _client(host, port, turns, rng, latencies, conectar):
+    async with conectar:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        sigue = await _read_turn(reader)
+        for _ in range(turns):
+            if not sigue:
+                break
+            inicio = time.perf_counter()
+            writer.write(rng.choice(COMANDOS).encode() + b"\n")
+            sigue = await _read_turn(reader)
+            latencies.append(time.perf_counter() - inicio)
+    finally:
+        writer.close()
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def load_test(sessions=10000, turns=20, host=None, port=PUERTO, seed=0):
+    """
+    Abre 'sessions' conexiones a la vez y juega hasta 'turns' turnos al azar
+    en cada una. Sin host levanta un GameServer en este mismo proceso.
+    Devuelve un dict con turnos, turnos/s y latencias p50/p99 en segundos.
+    """
+    server = None
+    if host is None:
+        server = GameServer(seed=seed)
+        await server.start('127.0.0.1', port)
+        host = '127.0.0.1'
+    rng = random.Random(seed)
+    latencies = []
+    conectar = asyncio.Semaphore(512)  # Sin avalancha de conexiones contra el backlog
+    inicio = time.perf_counter()
+    try:
+        await asyncio.gather(*(_client(host, port, turns, rng, latencies, conectar)
+                               for _ in range(sessions)))
+    finally:
+        if server:
+            await server.close()
+    duracion = time.perf_counter() - inicio
+    latencies.sort()
+    return {
+        'sesiones': sessions,
+        'turnos': len(latencies),
+        'turnos_por_s': len(latencies) / duracion,
+        'p50': _percentile(latencies, 0.5),
+        'p99': _percentile(latencies, 0.99),
+    }
+
+
+def _raise_fd_limit(needed):
+    # Cada sesión local usa dos descriptores (cliente y servidor)
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor de partidas del Wumpus por TCP')
+    sub = parser.add_subparsers(dest='orden', required=True)
+    servir = sub.add_parser('servir', help='atiende partidas hasta Ctrl+C')
+    servir.add_argument('--host', default='127.0.0.1')
+    servir.add_argument('--puerto', type=int, default=PUERTO)
+    servir.add_argument('--tam', type=int, default=TAM, help='lado del tablero')
+    servir.add_argument('--pozos', type=int, default=None, help='cantidad de pozos')
+    servir.add_argument('--vidas', type=int, default=VIDAS)
+    servir.add_argument('--inactividad', type=float, default=INACTIVIDAD,
+                        help='segundos sin comandos antes de cerrar una sesión')
+    carga = sub.add_parser('carga', help='prueba de carga con sesiones que juegan al azar')
+    carga.add_argument('--sesiones', type=int, default=10000)
+    carga.add_argument('--turnos', type=int, default=20, help='turnos por sesión como máximo')
+    carga.add_argument('--host', default=None, help='servidor a probar (por defecto uno local)')
+    carga.add_argument('--puerto', type=int, default=PUERTO)
+    args = parser.parse_args()
+
+    if args.orden == 'servir':
+        async def servir_siempre():
+            game_server = GameServer(args.tam, args.pozos, args.vidas, args.inactividad)
+            server = await game_server.start(args.host, args.puerto)
+            print(f"Escuchando en {args.host}:{args.puerto}")
+            async with server:
+                await server.serve_forever()
+        try:
+            asyncio.run(servir_siempre())
+        except KeyboardInterrupt:
+            pass
+    else:
+        _raise_fd_limit(2 * args.sesiones + 64)
+        r = asyncio.run(load_test(args.sesiones, args.turnos, args.host, args.puerto))
+        print(f"{r['sesiones']} sesiones, {r['turnos']} turnos, {r['turnos_por_s']:.0f} turnos/s")
+        print(f"latencia por turno: p50 {r['p50'] * 1000:.2f} ms, p99 {r['p99'] * 1000:.2f} ms")
@@ -0,0 +1,127 @@
+# src/simulation.py
+
+import random
+from collections import namedtuple
+
+from src.board import Board
+from src.agent import Agent
+from src.config import TAM, VIDAS
+from src.rules import (SHOOT, DIED, LOST, WON, HEARD_SCREAM,
+                       agent_action, capture, cell_of, destination, step, sync)
+
+
+def max_steps_for(size):
+    # Tope de pasos por episodio: el agente puede quedarse dando vueltas con el tesoro
+    return 8 * size * size
+
+
+MAX_PASOS = max_steps_for(TAM)
+
+# Resultado de un episodio: ganó, pasos dados, vidas restantes y si usó la flecha
+EpisodeResult = namedtuple('EpisodeResult', ['won', 'steps', 'lives', 'arrow_used'])
+
+
+def run_episode(board, agent, max_steps=None, actions=None):
+    """
+    Juega un episodio completo de auto-juego sin interfaz.
+
+    Las reglas son las de src.rules.step, igual que en main.py y Game:
+    pozo y Wumpus quitan una vida y devuelven al agente a la entrada,
+    el tesoro se recoge al pisarlo y se gana saliendo por (0, 0) con él.
+    Si se pasa una lista en actions, se le agrega cada acción del agente
+    (códigos de MOVE_ACTIONS y SHOOT), que es lo que graba src.replay.
+
+    Casi todo el tiempo se va en las decisiones del agente (auto_move y su
+    memoria), no en las reglas. En 5x5 y un núcleo rinde unos 2,4 a 2,9 mil
+    episodios por segundo en modo 'basic', 1,3 a 1,4 mil en 'probabilistic'
+    y 1,1 a 1,5 mil en 'logic' (medianas de cinco corridas de 2000; varía
+    con la máquina): lejos de cientos de miles, que con este agente en
+    Python no se alcanzan. src.vecenv.VectorEnv corre las mismas reglas
+    mucho más rápido, pero sin el agente (la política va como arreglos).
+    """
+    if max_steps is None:
+        max_steps = max_steps_for(board.size)
+    state = capture(board, agent)
+    steps = 0
+    while steps < max_steps:
+        had_arrow = agent.has_arrow
+        direction = agent.auto_move(board, bool(state & HEARD_SCREAM))
+        steps += 1
+
+        # Sin moverse ni disparar el estado no cambia: el agente quedó atascado
+        action = agent_action(agent, had_arrow, direction)
+        if action is None:
+            break
+        if actions is not None:
+            actions.append(action)
+
+        cell = cell_of(state)
+        state, events = step(board, state, action)
+        sync(state, board, agent)
+        if action >= SHOOT:
+            continue
+        # La casilla pisada es la del estado, salvo que murió y volvió a la entrada
+        if events & DIED and not events & LOST:
+            cell = destination(board.size, cell, action)
+        else:
+            cell = cell_of(state)
+        agent.learn(divmod(cell, board.size), events, bool(state & HEARD_SCREAM))
+        if events & LOST:
+            break
+        if events & DIED:
+            agent.visited.add((0, 0))
+        elif events & WON:
+            return EpisodeResult(True, steps, agent.lives, not agent.has_arrow)
+
+    return EpisodeResult(False, steps, agent.lives, not agent.has_arrow)
+
+
+def simulate(n_episodes, seed=None, max_steps=None, worlds=None,
+             size=TAM, n_pits=None, lives=VIDAS, agent_options=None):
+    """
+    Corre n_episodes episodios de auto-juego sin pygame.
+
+    Devuelve la lista de EpisodeResult, uno por episodio. Tablero y agente
+    comparten un generador propio, así que con la misma semilla se obtienen
+    los mismos resultados sin tocar el estado global de random. Si se pasa
+    worlds (un arreglo de src.worldgen.generate_worlds) los tableros se
+    arman con una copia de cada fila en vez de generarse uno por uno (el
+    arreglo queda intacto y se puede volver a usar); tiene que traer
+    exactamente n_episodes mundos. agent_options se pasa tal cual a Agent
+    (p. ej. {'knowledge': 'bitboard'}).
+    """
+    if worlds is not None and len(worlds) != n_episodes:
+        raise ValueError(f"Se pidieron {n_episodes} episodios pero hay {len(worlds)} mundos")
+    agent_options = agent_options or {}
+    rng = random.Random(seed)
+    if worlds is None:
+        boards = (Board(size, n_pits, rng=rng) for _ in range(n_episodes))
+    else:
+        boards = (Board(len(world), rng=rng, layout=bytearray(world)) for world in worlds)
+    return [run_episode(board, Agent(board.size, lives, rng=rng, n_pits=board.n_pits, **agent_options), max_steps)
+            for board in boards]
+
+def summarize(results):
+    # Resumen rápido de una lista de resultados
+    n = len(results)
+    wins = sum(1 for r in results if r.won)
+    return {
+        'episodes': n,
+        'wins': wins,
+        'win_rate': wins / n if n else 0.0,
+        'avg_steps': sum(r.steps for r in results) / n if n else 0.0,
+        'arrows_used': sum(1 for r in results if r.arrow_used),
+    }
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tam = int(sys.argv[2]) if len(sys.argv) > 2 else TAM
+    inicio = time.perf_counter()
+    resultados = simulate(n, seed=0, size=tam)
+    duracion = time.perf_counter() - inicio
+    print(summarize(resultados))
+    print(f"{n / duracion:.0f} episodios/s")
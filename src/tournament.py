@@ -0,0 +1,140 @@
+# src/tournament.py
+
+import random
+from multiprocessing import Pool, cpu_count
+
+from src.board import Board
+from src.agent import Agent, REASONING_MODES
+from src.config import TAM, VIDAS
+from src.simulation import run_episode
+
+TAM_LOTE = 1000  # Partidas por lote; fijo para que el resultado no dependa de los procesos
+
+
+class TournamentStats:
+    """
+    Estadísticas agregadas de un torneo.
+
+    Solo guarda sumas y conteos, así que dos mitades se combinan con merge()
+    en cualquier orden y dan siempre el mismo total.
+    """
+
+    def __init__(self):
+        self.episodes = 0
+        self.wins = 0
+        self.steps = 0
+        self.arrows_used = 0
+        self.lives_left = {}  # vidas restantes -> cantidad de episodios
+
+    def add(self, result):
+        self.episodes += 1
+        self.wins += result.won
+        self.steps += result.steps
+        self.arrows_used += result.arrow_used
+        self.lives_left[result.lives] = self.lives_left.get(result.lives, 0) + 1
+
+    def merge(self, other):
+        self.episodes += other.episodes
+        self.wins += other.wins
+        self.steps += other.steps
+        self.arrows_used += other.arrows_used
+        for lives, count in other.lives_left.items():
+            self.lives_left[lives] = self.lives_left.get(lives, 0) + count
+        return self
+
+    @property
+    def win_rate(self):
+        return self.wins / self.episodes if self.episodes else 0.0
+
+    @property
+    def avg_steps(self):
+        return self.steps / self.episodes if self.episodes else 0.0
+
+    def as_dict(self):
+        return {
+            'episodes': self.episodes,
+            'wins': self.wins,
+            'win_rate': self.win_rate,
+            'avg_steps': self.avg_steps,
+            'arrows_used': self.arrows_used,
+            'lives_left': dict(sorted(self.lives_left.items())),
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, TournamentStats) and self.as_dict() == other.as_dict()
+
+
+def batch_seed(seed, index):
+    # Semilla independiente para cada lote, derivada de la semilla del torneo
+    return random.Random(f'{seed}:{index}').getrandbits(64)
+
+
+def run_batch(task):
+    """Juega un lote de partidas con su propio generador y devuelve sus estadísticas."""
+    seed, index, n_games, max_steps, size, n_pits, lives, agent_options = task
+    rng = random.Random(batch_seed(seed, index))
+    stats = TournamentStats()
+    for _ in range(n_games):
+        board = Board(size, n_pits, rng=rng)
+        stats.add(run_episode(board, Agent(size, lives, rng=rng, n_pits=board.n_pits, **agent_options), max_steps))
+    return stats
+
+
+def _tasks(n_games, seed, batch_size, *params):
+    index = 0
+    for start in range(0, n_games, batch_size):
+        yield (seed, index, min(batch_size, n_games - start)) + params
+        index += 1
+
+
+def run_tournament(n_games, seed=0, workers=None, batch_size=TAM_LOTE, max_steps=None,
+                   size=TAM, n_pits=None, lives=VIDAS, agent_options=None, on_batch=None):
+    """
+    Reparte n_games partidas en un pool de procesos y combina los resultados.
+
+    Las partidas se dividen en lotes de tamaño fijo y cada lote se siembra
+    a partir de (seed, índice de lote), no del proceso que lo corre: con la
+    misma semilla el total es idéntico para cualquier número de procesos.
+    Los lotes se combinan a medida que terminan; on_batch(stats) recibe el
+    acumulado parcial después de cada uno. agent_options se pasa a cada Agent.
+    """
+    workers = workers or cpu_count()
+    tasks = _tasks(n_games, seed, batch_size, max_steps, size, n_pits, lives, agent_options or {})
+    if workers == 1:
+        return _merge(map(run_batch, tasks), on_batch)
+    with Pool(workers) as pool:
+        return _merge(pool.imap_unordered(run_batch, tasks), on_batch)
+
+
+def _merge(parts, on_batch):
+    total = TournamentStats()
+    for part in parts:
+        total.merge(part)
+        if on_batch:
+            on_batch(total)
+    return total
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Torneo de auto-juego en paralelo')
+    parser.add_argument('partidas', type=int, nargs='?', default=100000)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--tam', type=int, default=TAM)
+    parser.add_argument('--pozos', type=int, default=None)
+    parser.add_argument('--vidas', type=int, default=VIDAS)
+    parser.add_argument('--conocimiento', choices=['sets', 'bitboard'], default='sets')
+    parser.add_argument('--razonamiento', choices=REASONING_MODES, default='probabilistic')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    stats = run_tournament(args.partidas, seed=args.semilla, workers=args.procesos,
+                           size=args.tam, n_pits=args.pozos, lives=args.vidas,
+                           agent_options={'knowledge': args.conocimiento,
+                                          'reasoning': args.razonamiento})
+    duracion = time.perf_counter() - inicio
+    print(stats.as_dict())
+    print(f"{stats.episodes / duracion:.0f} partidas/s")
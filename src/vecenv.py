@@ -0,0 +1,228 @@
+# src/vecenv.py
+#
+# Entorno vectorizado al estilo Gym para entrenar agentes: N tableros
+# independientes avanzan juntos con una sola llamada a step(actions).
+# Todo el estado vive en arreglos NumPy (dependencia opcional, como en
+# src.worldgen): no hay un Board ni un Agent por entorno.
+#
+# Las reglas son las de src.rules.step, escritas sobre arreglos: las
+# máscaras de percepción son las mismas banderas de Board.percept_flags, el
+# disparo es la misma prueba de alineación que Board.in_line_of_fire, y
+# caer en un pozo o en el Wumpus vivo cuesta una vida y devuelve a la entrada.
+
+import numpy as np
+
+from src.board import (BREEZE, STENCH, PIT_HERE, WUMPUS_HERE, TREASURE_HERE, SCREAM,
+                       DANGER_HERE, WUMPUS, TREASURE, PIT)
+from src.config import TAM, VIDAS
+from src.rules import SHOOT
+from src.simulation import max_steps_for
+from src.worldgen import generate_worlds
+
+# Columnas de la observación (una fila int32 por entorno)
+OBS_FLAGS, OBS_X, OBS_Y, OBS_LIVES, OBS_ARROW, OBS_TREASURE = range(6)
+OBS_SIZE = 6
+
+# Recompensas
+RECOMPENSA_PASO = -1
+RECOMPENSA_FLECHA = -10
+RECOMPENSA_MUERTE = -1000
+RECOMPENSA_VICTORIA = 1000
+
+# Desplazamiento de cada acción de movimiento, en el orden de DIRECTIONS
+_DX = np.array([-1, 1, 0, 0], dtype=np.int32)
+_DY = np.array([0, 0, -1, 1], dtype=np.int32)
+
+
+def percept_table(worlds):
+    """
+    Máscaras de percepción de cada casilla de cada mundo, como las de Board.
+
+    worlds es un arreglo (n, size, size) de códigos de casilla (p. ej. de
+    generate_worlds); devuelve un uint8 (n, size * size) con el Wumpus vivo.
+    """
+    pit = worlds == PIT
+    wumpus = worlds == WUMPUS
+    percepts = (pit * np.uint8(PIT_HERE) | wumpus * np.uint8(WUMPUS_HERE)
+                | (worlds == TREASURE) * np.uint8(TREASURE_HERE)).astype(np.uint8)
+    # Viento y hedor en las cuatro vecinas de cada pozo y del Wumpus
+    near = pit * np.uint8(BREEZE) | wumpus * np.uint8(STENCH)
+    percepts[:, 1:, :] |= near[:, :-1, :]
+    percepts[:, :-1, :] |= near[:, 1:, :]
+    percepts[:, :, 1:] |= near[:, :, :-1]
+    percepts[:, :, :-1] |= near[:, :, 1:]
+    return percepts.reshape(len(worlds), -1)
+
+
+class VectorEnv:
+    """
+    n mundos de size x size que avanzan juntos.
+
+    Acciones como en src.rules: 0-3 mover (UP, DOWN, LEFT, RIGHT) y
+    SHOOT + dirección (4-7) disparar. step(actions) devuelve
+    (obs, rewards, terminated, truncated, info): obs es un int32 (n, 6) con
+    las columnas OBS_*, rewards un float32 (n,), terminated/truncated bool
+    (n,) e info {'won': bool (n,)}. Los entornos que terminan se reinician
+    solos con un mundo nuevo, así que obs ya es la del episodio siguiente;
+    como en Gym, si alguno terminó info trae además 'final_observation'
+    (int32 (n, 6), la observación del último paso antes de reiniciar),
+    '_final_observation' (bool (n,), qué filas valen) y 'final_reward'
+    (float32 (n,), la recompensa de ese último paso; 0 en las demás).
+    Los mundos salen de a bloques de generate_worlds con sus percepciones
+    ya calculadas; reiniciar un entorno es copiar una fila.
+    """
+
+    def __init__(self, n, size=TAM, n_pits=None, lives=VIDAS, seed=None, max_steps=None,
+                 pool=None):
+        self.n = n
+        self.size = size
+        self.n_pits = n_pits
+        self.lives0 = lives
+        self.max_steps = max_steps_for(size) if max_steps is None else max_steps
+        self.rng = np.random.default_rng(seed)
+        self.pool_size = pool if pool is not None else max(n, 4096)
+        self._pool_next = self.pool_size  # Fuerza generar el primer bloque
+
+        cells = size * size
+        self.percepts = np.zeros((n, cells), dtype=np.uint8)
+        self.wumpus = np.zeros(n, dtype=np.int32)  # Casilla plana del Wumpus
+        self.x = np.zeros(n, dtype=np.int32)
+        self.y = np.zeros(n, dtype=np.int32)
+        self.lives = np.zeros(n, dtype=np.int32)
+        self.arrow = np.zeros(n, dtype=bool)
+        self.treasure = np.zeros(n, dtype=bool)
+        self.wumpus_alive = np.zeros(n, dtype=bool)
+        self.scream = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.obs = np.zeros((n, OBS_SIZE), dtype=np.int32)
+        self._rows = np.arange(n)
+
+    def _refill(self):
+        worlds = generate_worlds(self.pool_size, seed=self.rng, size=self.size, n_pits=self.n_pits)
+        self._pool_percepts = percept_table(worlds)
+        self._pool_wumpus = np.argmax(worlds.reshape(self.pool_size, -1) == WUMPUS, axis=1)
+        self._pool_next = 0
+
+    def _reset_envs(self, idx):
+        # Mundo nuevo y agente en la entrada para los entornos idx
+        start = 0
+        while start < len(idx):
+            if self._pool_next == self.pool_size:
+                self._refill()
+            take = min(len(idx) - start, self.pool_size - self._pool_next)
+            part = idx[start:start + take]
+            src = slice(self._pool_next, self._pool_next + take)
+            self.percepts[part] = self._pool_percepts[src]
+            self.wumpus[part] = self._pool_wumpus[src]
+            self._pool_next += take
+            start += take
+        self.x[idx] = 0
+        self.y[idx] = 0
+        self.lives[idx] = self.lives0
+        self.arrow[idx] = True
+        self.treasure[idx] = False
+        self.wumpus_alive[idx] = True
+        self.scream[idx] = False
+        self.steps[idx] = 0
+
+    def _observe(self):
+        obs = self.obs
+        flags = self.percepts[self._rows, self.x * self.size + self.y]
+        obs[:, OBS_FLAGS] = flags | self.scream * np.uint8(SCREAM)
+        obs[:, OBS_X] = self.x
+        obs[:, OBS_Y] = self.y
+        obs[:, OBS_LIVES] = self.lives
+        obs[:, OBS_ARROW] = self.arrow
+        obs[:, OBS_TREASURE] = self.treasure
+        return obs
+
+    def reset(self):
+        self._reset_envs(self._rows)
+        return self._observe().copy()
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        size = self.size
+        rewards = np.full(self.n, RECOMPENSA_PASO, dtype=np.float32)
+
+        # --- Disparos: la flecha acierta si el Wumpus vivo está alineado hacia ese lado ---
+        shoot = (actions >= SHOOT) & self.arrow
+        if shoot.any():
+            direction = actions - SHOOT
+            wx, wy = np.divmod(self.wumpus, size)
+            hit = shoot & self.wumpus_alive & np.select(
+                [direction == 0, direction == 1, direction == 2],
+                [(wy == self.y) & (wx < self.x), (wy == self.y) & (wx > self.x),
+                 (wx == self.x) & (wy < self.y)],
+                (wx == self.x) & (wy > self.y))
+            self.arrow &= ~shoot
+            rewards[shoot] += RECOMPENSA_FLECHA
+            if hit.any():
+                killed = np.flatnonzero(hit)
+                self.wumpus_alive[killed] = False
+                self.scream[killed] = True
+                # El hedor sigue, pero el Wumpus ya no mata en su casilla
+                self.percepts[killed, self.wumpus[killed]] &= np.uint8(~WUMPUS_HERE & 0xFF)
+
+        # --- Movimientos (contra la pared no se mueve, como Agent.move) ---
+        move = actions < SHOOT
+        direction = np.where(move, actions, 0)
+        self.x = np.where(move, np.clip(self.x + _DX[direction], 0, size - 1), self.x).astype(np.int32)
+        self.y = np.where(move, np.clip(self.y + _DY[direction], 0, size - 1), self.y).astype(np.int32)
+        cell = self.x * size + self.y
+        flags = self.percepts[self._rows, cell]
+
+        # Pozo o Wumpus vivo: una vida menos y vuelta a la entrada (sin vidas
+        # se queda donde murió, como en src.rules.step)
+        dead = move & ((flags & DANGER_HERE) != 0)
+        self.lives -= dead
+        rewards[dead] += RECOMPENSA_MUERTE
+        lost = dead & (self.lives == 0)
+        respawn = dead & ~lost
+        self.x[respawn] = 0
+        self.y[respawn] = 0
+
+        # Tesoro: se recoge al pisarlo y desaparece del tablero
+        found = move & ~dead & ((flags & TREASURE_HERE) != 0) & ~self.treasure
+        if found.any():
+            self.treasure |= found
+            taken = np.flatnonzero(found)
+            self.percepts[taken, cell[taken]] &= np.uint8(~TREASURE_HERE & 0xFF)
+
+        # Salir por la entrada con el tesoro gana
+        won = move & ~dead & ~found & self.treasure & (cell == 0)
+        rewards[won] += RECOMPENSA_VICTORIA
+
+        self.steps += 1
+        terminated = lost | won
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        finished = terminated | truncated
+        done = np.flatnonzero(finished)
+        info = {'won': won}
+        if len(done):
+            info['final_observation'] = self._observe().copy()
+            info['_final_observation'] = finished
+            info['final_reward'] = np.where(finished, rewards, np.float32(0))
+            self._reset_envs(done)
+        return self._observe().copy(), rewards, terminated, truncated, info
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    pasos = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    env = VectorEnv(n, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    acciones = rng.integers(0, SHOOT + 4, size=(pasos, n))
+    ganados = terminados = 0
+    inicio = time.perf_counter()
+    for t in range(pasos):
+        _, _, terminated, truncated, info = env.step(acciones[t])
+        terminados += int(terminated.sum())
+        ganados += int(info['won'].sum())
+    duracion = time.perf_counter() - inicio
+    print(f"{n * pasos / duracion:,.0f} pasos/s con {n} entornos; "
+          f"{terminados} episodios terminados, {ganados} ganados al azar")
@@ -0,0 +1,65 @@
+# src/worldgen.py
+#
+# Generación de muchos mundos a la vez con NumPy (dependencia opcional:
+# solo este módulo la necesita).
+
+import numpy as np
+
+from src.config import TAM
+from src.board import Board, ENTRANCE, WUMPUS, TREASURE, PIT, default_pits, safe_zone
+
+
+def _candidates(size):
+    # Casillas donde se puede colocar algo, como índices planos i * size + j
+    candidates = np.ones(size * size, dtype=bool)
+    candidates[list(safe_zone(size))] = False
+    return np.flatnonzero(candidates)
+
+
+def generate_worlds(n, seed=None, size=TAM, n_pits=None):
+    """
+    Genera n mundos de una vez como un arreglo uint8 de forma (n, size, size).
+
+    Cada mundo tiene la entrada en (0, 0), nada en la zona segura inicial,
+    un Wumpus, un tesoro y n_pits pozos (por defecto según la densidad de
+    config) en casillas distintas. Los códigos de casilla son los de
+    src.board (EMPTY, ENTRANCE, WUMPUS, TREASURE, PIT).
+    """
+    rng = np.random.default_rng(seed)
+    if n_pits is None:
+        n_pits = default_pits(size)
+    candidates = _candidates(size)
+    k = 2 + n_pits
+    if k > len(candidates):
+        raise ValueError("No hay lugar para todos los elementos en el tablero")
+
+    # Una clave aleatoria por casilla candidata: las k menores, ordenadas,
+    # son una elección uniforme y sin repetición de (Wumpus, tesoro, pozos...)
+    keys = rng.random((n, len(candidates)))
+    chosen = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(keys, chosen, axis=1), axis=1)
+    cells = candidates[np.take_along_axis(chosen, order, axis=1)]
+
+    worlds = np.zeros((n, size * size), dtype=np.uint8)
+    rows = np.arange(n)
+    worlds[:, 0] = ENTRANCE
+    worlds[rows, cells[:, 0]] = WUMPUS
+    worlds[rows, cells[:, 1]] = TREASURE
+    worlds[rows[:, None], cells[:, 2:]] = PIT
+    return worlds.reshape(n, size, size)
+
+
+def boards(worlds, rng=None):
+    # Un Board por mundo, cada uno apoyado directamente sobre su fila del arreglo
+    for world in worlds:
+        yield Board(rng=rng, layout=world)
+
+
+if __name__ == '__main__':
+    import time
+
+    inicio = time.perf_counter()
+    mundos = generate_worlds(1_000_000, seed=0)
+    duracion = time.perf_counter() - inicio
+    print(f"{len(mundos) / duracion:.0f} mundos/s")
+    Board(layout=mundos[0]).print_board()
@@ -0,0 +1,135 @@
+# tests/test_board.py
+
+import random
+
+import pytest
+
+from src.board import (Board, EMPTY, ENTRANCE, PIT, WUMPUS, TREASURE, BREEZE, STENCH, PIT_HERE,
+                       WUMPUS_HERE, TREASURE_HERE, default_pits, safe_zone)
+from src.config import N_POZOS, TAM
+
+
+def _expected_percepts(board):
+    # Máscaras recalculadas desde cero a partir de las casillas
+    size, cells = board.size, board.cells
+    masks = bytearray(size * size)
+    for cell, code in enumerate(cells):
+        x, y = divmod(cell, size)
+        if code == PIT:
+            masks[cell] |= PIT_HERE
+        elif code == WUMPUS and board.wumpus_alive:
+            masks[cell] |= WUMPUS_HERE
+        elif code == TREASURE:
+            masks[cell] |= TREASURE_HERE
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < size and 0 <= ny < size:
+                near = cells[nx * size + ny]
+                if near == PIT:
+                    masks[cell] |= BREEZE
+                elif near == WUMPUS:
+                    masks[cell] |= STENCH
+    return masks
+
+
+def _played(size, seed):
+    # Un tablero al azar con el tesoro recogido, el Wumpus muerto y algunas
+    # escrituras por la vista clásica grid[x][y], en orden al azar
+    rng = random.Random(seed)
+    board = Board(size, rng=rng)
+    yield board
+    changes = ['treasure', 'kill', 'grid']
+    rng.shuffle(changes)
+    for change in changes:
+        if change == 'treasure':
+            board.set_cell(*board.treasure_pos, EMPTY)
+        elif change == 'kill':
+            board.kill_wumpus()
+        else:
+            pit = sorted(board.pits)[0]
+            board.grid[pit[0]][pit[1]] = ''
+            free = [(x, y) for x in range(size) for y in range(size)
+                    if board.cells[x * size + y] == EMPTY and (x, y) > (1, 1)]
+            x, y = rng.choice(free)
+            board.grid[x][y] = 'P'
+        yield board
+
+
+@pytest.mark.parametrize('size', [4, 5, 8, 17])
+@pytest.mark.parametrize('seed', range(5))
+def test_percepts_match_recompute(size, seed):
+    for board in _played(size, seed):
+        assert board.percepts == _expected_percepts(board)
+
+
+def test_killed_wumpus_keeps_stench():
+    board = Board(5, rng=random.Random(1))
+    wx, wy = board.wumpus_pos
+    board.kill_wumpus()
+    assert not board.percept_flags(wx, wy) & WUMPUS_HERE
+    x, y = (wx - 1, wy) if wx > 0 else (wx + 1, wy)
+    assert board.percept_flags(x, y) & STENCH
+    # Un cambio en una vecina recalcula la casilla del Wumpus sin revivirlo
+    board.set_cell(x, y, EMPTY)
+    assert board.percepts == _expected_percepts(board)
+
+
+def _expected_index(board):
+    # Posiciones de los elementos buscadas recorriendo todas las casillas
+    found = {code: {divmod(cell, board.size) for cell, c in enumerate(board.cells) if c == code}
+             for code in (ENTRANCE, WUMPUS, TREASURE, PIT)}
+    wumpus = found[WUMPUS].pop() if found[WUMPUS] else None
+    treasure = found[TREASURE].pop() if found[TREASURE] else None
+    return wumpus, treasure, found[PIT], found[ENTRANCE]
+
+
+@pytest.mark.parametrize('size', [4, 5, 8, 17])
+@pytest.mark.parametrize('seed', range(5))
+def test_index_matches_scan(size, seed):
+    for board in _played(size, seed):
+        wumpus, treasure, pits, entrance = _expected_index(board)
+        assert (board.wumpus_pos, board.treasure_pos, board.pits) == (wumpus, treasure, pits)
+        entities = list(board.entities())
+        assert len(entities) == len(set(entities))
+        expected = ({(p, PIT) for p in pits} | {(p, ENTRANCE) for p in entrance}
+                    | {(wumpus, WUMPUS)} | ({(treasure, TREASURE)} if treasure else set()))
+        assert set(entities) == expected
+
+
+def test_grid_writes_move_the_index():
+    # Mover el Wumpus y el tesoro por la vista clásica actualiza el índice y el tiro
+    board = Board(6, rng=random.Random(2))
+    wx, wy = board.wumpus_pos
+    tx, ty = board.treasure_pos
+    board.grid[wx][wy] = ''
+    assert board.wumpus_pos is None
+    assert not any(board.in_line_of_fire(x, 0, 'RIGHT') for x in range(6))
+    board.grid[tx][ty] = 'W'
+    assert board.wumpus_pos == (tx, ty) and board.treasure_pos is None
+    assert board.in_line_of_fire(tx, ty + 1, 'LEFT') and not board.in_line_of_fire(tx, ty + 1, 'RIGHT')
+    board.grid[wx][wy] = 'T'
+    assert board.treasure_pos == (wx, wy)
+    assert (board.wumpus_pos, board.treasure_pos, board.pits) == _expected_index(board)[:3]
+    assert board.percepts == _expected_percepts(board)
+
+
+@pytest.mark.parametrize('size', [3, 4, 7, 16, 64])
+def test_place_elements_any_size(size):
+    for seed in range(5):
+        board = Board(size, rng=random.Random(seed))
+        cells = list(board.cells)
+        assert [cells[c] for c in safe_zone(size)] == [ENTRANCE, EMPTY, EMPTY, EMPTY]
+        assert cells.count(WUMPUS) == cells.count(TREASURE) == 1
+        assert cells.count(PIT) == len(board.pits) == board.n_pits == default_pits(size)
+        assert cells.count(EMPTY) == size * size - 3 - board.n_pits
+
+
+def test_pit_count_and_limits():
+    # La densidad por defecto deja el tablero del proyecto como estaba
+    assert default_pits(TAM) == N_POZOS
+    assert Board(9, n_pits=20, rng=random.Random(0)).n_pits == 20
+    # 3x3 tiene 5 casillas fuera de la zona segura: Wumpus, tesoro y 3 pozos la llenan
+    assert Board(3, n_pits=3, rng=random.Random(0)).cells.count(EMPTY) == 3
+    with pytest.raises(ValueError):
+        Board(3, n_pits=4)
+    with pytest.raises(ValueError):
+        Board(1)
@@ -0,0 +1,25 @@
+# tests/test_game.py
+
+import random
+
+import pytest
+
+from src.game import Game
+
+
+@pytest.mark.parametrize('size', [3, 7, 12])
+def test_console_game_of_any_size(size, capsys):
+    random.seed(size)
+    game = Game(size=size, n_pits=2, lives=3)
+    assert (game.board.size, game.agent.size, game.board.n_pits, game.agent.lives) == (size, size, 2, 3)
+    game.print_state()
+    rows = capsys.readouterr().out.splitlines()[:size]
+    assert [len(row.split()) for row in rows] == [size] * size
+    # Caminar contra los bordes no saca al agente del tablero
+    for move in ['RIGHT'] * (size + 2) + ['DOWN'] * (size + 2) + ['LEFT', 'UP'] * size:
+        if not game.running:
+            break
+        game.command(move)
+        x, y = game.agent.get_position()
+        assert 0 <= x < size and 0 <= y < size
+        assert 0 <= game.agent.lives <= 3
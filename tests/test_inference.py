@@ -0,0 +1,123 @@
+# tests/test_inference.py
+
+import random
+from itertools import product
+
+import pytest
+
+from src.agent import Agent
+from src.board import Board, BREEZE
+from src.inference import MAX_COMPONENTE, HazardModel
+from src.knowledge import SetKnowledge
+from src.simulation import run_episode
+
+
+def _played(size, seed, steps):
+    # Un agente probabilístico a medio jugar en un tablero de size x size
+    rng = random.Random(seed)
+    board = Board(size, rng=rng)
+    agent = Agent(size, rng=rng, n_pits=board.n_pits)
+    run_episode(board, agent, max_steps=steps)
+    return agent.hazards
+
+
+def _brute_force(hazards):
+    # Marginales exactas enumerando todos los pozos posibles en las casillas desconocidas
+    size, prior = hazards.size, hazards.pit_prior
+    unknown = [(x, y) for x in range(size) for y in range(size)
+               if (x, y) not in hazards.no_pit and (x, y) not in hazards.pits]
+    totals = dict.fromkeys(unknown, 0.0)
+    weight_sum = 0.0
+    for model in product((False, True), repeat=len(unknown)):
+        pits = hazards.pits | {c for c, pit in zip(unknown, model) if pit}
+        if all(any(n in pits for n in hazards.neighbors(b)) for b in hazards.breezes):
+            w = prior ** sum(model) * (1 - prior) ** (len(model) - sum(model))
+            weight_sum += w
+            for c, pit in zip(unknown, model):
+                if pit:
+                    totals[c] += w
+    return {c: t / weight_sum for c, t in totals.items()}
+
+
+def _observed(size, seed):
+    # Modelo con percepciones de viento de casillas al azar de un tablero con
+    # pozos al azar (y a veces una caída en un pozo conocido)
+    rng = random.Random(seed)
+    cells = list(product(range(size), repeat=2))
+    pits = {c for c in cells if rng.random() < 0.25}
+    hazards = HazardModel(SetKnowledge(size), size, 0.25)
+    for pos in rng.sample([c for c in cells if c not in pits], rng.randint(3, 8)):
+        breeze = any(n in pits for n in hazards.neighbors(pos))
+        hazards.observe(pos, BREEZE if breeze else 0)
+    if pits and rng.random() < 0.3:
+        hazards.pit_found(rng.choice(sorted(pits)))
+    return hazards
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_marginals_match_brute_force(seed):
+    hazards = _observed(4, seed)
+    assert all(len({c for b in group for c in hazards._constraints[b]}) <= MAX_COMPONENTE
+               for group in hazards._component.values())
+    for cell, p in _brute_force(hazards).items():
+        assert hazards.pit_probability(cell) == pytest.approx(p)
+
+
+def test_large_component_is_not_enumerated():
+    # Una componente de más de MAX_COMPONENTE casillas usa la estimación local
+    hazards = HazardModel(SetKnowledge(8), 8, 0.2)
+    for x in range(0, 8, 2):
+        for y in range(x % 4 // 2, 8, 2):
+            hazards.observe((x, y), BREEZE)
+    cells = {c for b in hazards.breezes for c in hazards._constraints.get(b, ())}
+    assert len(cells) > MAX_COMPONENTE
+    for cell in cells:
+        assert 0.2 <= hazards.pit_probability(cell) < 1.0
+
+
+def test_deductions_happen_on_observe():
+    # Viento en (0, 1) con (1, 1) sin pozo: el pozo está en (0, 2), sin preguntar risk()
+    knowledge = SetKnowledge(4)
+    hazards = HazardModel(knowledge, 4, 0.2)
+    hazards.observe((0, 0), 0)
+    hazards.observe((1, 0), 0)
+    hazards.observe((0, 1), BREEZE)
+    assert (0, 2) in knowledge.unsafe_cells
+    # Y las consultas no cambian nada
+    before = (set(hazards.no_pit), set(knowledge.unsafe_cells), set(knowledge.safe_cells))
+    for x, y in product(range(4), repeat=2):
+        hazards.risk((x, y))
+    hazards.safest(random.Random(0))
+    assert before == (set(hazards.no_pit), set(knowledge.unsafe_cells), set(knowledge.safe_cells))
+
+
+def test_incremental_components_match_rebuild():
+    # Las componentes actualizadas de a una observación valen lo mismo que
+    # rehacer todo desde cero con las mismas observaciones
+    hazards = _played(12, 5, 120)
+    fresh = HazardModel(SetKnowledge(12), 12, hazards.pit_prior)
+    fresh.no_pit, fresh.pits, fresh.breezes = set(hazards.no_pit), set(hazards.pits), set(hazards.breezes)
+    fresh._deduce(set(hazards.breezes))
+    for x, y in product(range(12), repeat=2):
+        assert hazards.pit_probability((x, y)) == pytest.approx(fresh.pit_probability((x, y)))
+
+
+@pytest.mark.parametrize('size', [5, 16])
+def test_safest_is_lowest_risk(size):
+    rng = random.Random(size)
+    board = Board(size, rng=rng)
+    agent = Agent(size, rng=rng, n_pits=board.n_pits)
+    hazards = agent.hazards
+    original = agent.auto_move
+
+    def checked(*args):
+        risks = [hazards.risk(c) for c in agent.frontier_cells if c not in agent.unsafe_cells]
+        risks = [r for r in risks if r < 1.0]
+        target = hazards.safest(random.Random(0))
+        assert (target is None) == (not risks)
+        if risks:
+            assert hazards.risk(target) == min(risks)
+        return original(*args)
+
+    agent.auto_move = checked
+    run_episode(board, agent, max_steps=400)
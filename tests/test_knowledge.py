@@ -0,0 +1,116 @@
+# tests/test_knowledge.py
+
+import random
+
+import pytest
+
+from src.knowledge import BitboardKnowledge, IndexedSet, SetKnowledge
+
+
+class _Recorder:
+    # Listener que anota los avisos de la base de conocimiento
+    def __init__(self):
+        self.known = []
+        self.blocked = []
+
+    def cell_known(self, pos):
+        self.known.append(pos)
+
+    def cell_blocked(self, pos):
+        self.blocked.append(pos)
+
+
+def _state(knowledge):
+    return (set(knowledge.visited), set(knowledge.safe_cells), set(knowledge.unsafe_cells),
+            set(knowledge.danger_cells), set(knowledge.frontier_cells))
+
+
+@pytest.mark.parametrize('size', [2, 5, 13, 64])
+def test_bitboard_matches_sets(size):
+    rng = random.Random(size)
+    backends = [SetKnowledge(size), BitboardKnowledge(size)]
+    recorders = [_Recorder(), _Recorder()]
+    for knowledge, recorder in zip(backends, recorders):
+        knowledge.listeners.append(recorder)
+        knowledge.visited.add((0, 0))
+        knowledge.safe_cells.add((0, 0))
+    kinds = ['visited', 'safe_cells', 'unsafe_cells', 'danger_cells', 'mark']
+    for _ in range(20 * size):
+        kind = rng.choice(kinds)
+        pos = (rng.randrange(size), rng.randrange(size))
+        for knowledge in backends:
+            if kind == 'mark':
+                knowledge.mark_neighbors_safe(pos)
+            else:
+                getattr(knowledge, kind).add(pos)
+        sets, bits = backends
+        assert _state(sets) == _state(bits)
+        assert len(sets.frontier_cells) == len(bits.frontier_cells)
+        for cell in [pos] + list(sets.neighbors(pos)):
+            for name in ('visited', 'safe_cells', 'unsafe_cells', 'frontier_cells'):
+                assert (cell in getattr(sets, name)) == (cell in getattr(bits, name))
+        if bits.frontier_cells:
+            assert bits.frontier_cells.choice(rng) in sets.frontier_cells
+    assert sorted(recorders[0].known) == sorted(recorders[1].known)
+    assert recorders[0].blocked == recorders[1].blocked
+
+
+def test_indexed_set_matches_set():
+    rng = random.Random(0)
+    indexed, expected = IndexedSet(), set()
+    for _ in range(2000):
+        item = rng.randrange(50)
+        if rng.random() < 0.5:
+            indexed.add(item)
+            expected.add(item)
+        else:
+            indexed.discard(item)
+            expected.discard(item)
+        assert len(indexed) == len(expected) and set(indexed) == expected
+        assert all(indexed.items[i] == x for x, i in indexed.index.items())
+        if expected:
+            assert indexed.choice(rng) in expected
+
+
+def _rebuilt_frontier(knowledge):
+    # Frontera recalculada desde cero: vecinas de una segura, sin visitar y no peligrosas
+    return {n for pos in knowledge.safe_cells for n in knowledge.neighbors(pos)
+            if n not in knowledge.visited and n not in knowledge.unsafe_cells}
+
+
+class _CountingSet(IndexedSet):
+    # IndexedSet que cuenta cuántas altas y bajas recibe
+    __slots__ = ('ops',)
+
+    def __init__(self):
+        super().__init__()
+        self.ops = 0
+
+    def add(self, item):
+        self.ops += 1
+        super().add(item)
+
+    def discard(self, item):
+        self.ops += 1
+        super().discard(item)
+
+
+def test_frontier_updates_are_local():
+    # Cada alta toca a lo sumo las cuatro vecinas, sin importar cuánto se exploró
+    size = 64
+    knowledge = SetKnowledge(size)
+    knowledge.frontier_cells = frontier = _CountingSet()
+    rng = random.Random(3)
+    for step in range(3000):
+        pos = (rng.randrange(size), rng.randrange(size))
+        before = frontier.ops
+        kind = rng.choice(['visited', 'safe_cells', 'unsafe_cells'])
+        if kind == 'visited':
+            knowledge.safe_cells.add(pos)
+            knowledge.visited.add(pos)
+        else:
+            getattr(knowledge, kind).add(pos)
+        assert frontier.ops - before <= 5
+        if step % 500 == 0:
+            assert set(frontier) == _rebuilt_frontier(knowledge)
+    assert set(frontier) == _rebuilt_frontier(knowledge)
@@ -0,0 +1,86 @@
+# tests/test_logic.py
+
+import pytest
+
+from src.board import STENCH
+from src.knowledge import SetKnowledge
+from src.logic import KnowledgeBase, LogicModel
+
+
+def test_unit_clause_assigns_at_once():
+    assigned = []
+    kb = KnowledgeBase(lambda var, value: assigned.append((var, value)))
+    kb.add_clause([-3])
+    assert kb.literal_value(3) is False and kb.literal_value(-3) is True
+    assert assigned == [(3, False)]
+    # Un literal ya falso se descarta al agregar: [3, 4] queda unitaria
+    kb.add_clause([3, 4])
+    assert kb.literal_value(4) is True
+    assert not kb.clauses
+
+
+def test_watch_moves_to_a_free_literal():
+    kb = KnowledgeBase()
+    kb.add_clause([1, 2, 3])
+    assert kb.clauses[0][:2] == [1, 2]
+    kb.assert_literal(-1)
+    # La cláusula dejó de vigilar 1 y pasó a vigilar 3, sin deducir nada
+    clause = kb.clauses[0]
+    assert -1 not in clause[:2] and 1 not in clause[:2] and set(clause[:2]) == {2, 3}
+    assert 0 not in kb.watches[1] and 0 in kb.watches[3]
+    assert kb.literal_value(2) is None and kb.literal_value(3) is None
+    # Con el segundo literal vigilado falso ya es unitaria
+    kb.assert_literal(-2)
+    assert kb.literal_value(3) is True
+
+
+def test_propagation_chains_through_clauses():
+    kb = KnowledgeBase()
+    kb.add_clause([-1, 2])
+    kb.add_clause([-2, 3])
+    kb.add_clause([-3, -4])
+    kb.assert_literal(1)
+    assert [kb.literal_value(v) for v in (1, 2, 3, 4)] == [True, True, True, False]
+
+
+def test_enqueue_waits_for_propagate():
+    kb = KnowledgeBase()
+    kb.add_clause([1, 2])
+    kb.enqueue(-1)
+    assert kb.literal_value(2) is None
+    kb.propagate()
+    assert kb.literal_value(2) is True
+
+
+def test_conflict_is_raised_and_sticks():
+    kb = KnowledgeBase()
+    kb.add_clause([1, 2])
+    kb.assert_literal(-1)
+    with pytest.raises(ValueError):
+        kb.assert_literal(-2)
+    assert kb.conflict
+    # Inconsistente: ya no responde
+    with pytest.raises(ValueError):
+        kb.literal_value(1)
+    with pytest.raises(ValueError):
+        kb.add_clause([5])
+
+
+def test_empty_clause_is_a_conflict():
+    kb = KnowledgeBase()
+    kb.assert_literal(1)
+    with pytest.raises(ValueError):
+        kb.add_clause([-1])
+    assert kb.conflict
+
+
+def test_dead_wumpus_does_not_contradict_its_cell():
+    # Muerte por el Wumpus en (0, 1), se lo mata y después se pisa esa casilla
+    model = LogicModel(SetKnowledge(4), 4)
+    model.observe((0, 0), STENCH)
+    model.wumpus_found((0, 1))
+    assert model.wumpus_at == (0, 1)
+    model.wumpus_killed()
+    model.observe((0, 1), 0)
+    assert not model.kb.conflict
+    assert model.risk((0, 2)) == 0.0
@@ -0,0 +1,139 @@
+# tests/test_main.py
+#
+# El bucle de main.py con el driver de video dummy (sin ventana ni audio).
+
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+
+import main
+from src.agent import Agent
+from src.board import Board, ENTRANCE, PIT, WUMPUS, TREASURE
+from src.rules import MOVE_ACTIONS
+
+
+@pytest.fixture
+def game():
+    main.configure(main.parse_args(['--sin-sonido']))
+    main.open_window()
+    yield main
+    pygame.quit()
+
+
+def start(main, cells, pos=(0, 0)):
+    main.board = Board(5, layout=cells)
+    main.agent = Agent(5, 2)
+    main.agent.x, main.agent.y = pos
+    main.agent.visited.add(pos)
+    main.heard_scream = False
+    main.message = ""
+    main.running = True
+    main.peligros_revelados = set()
+    main.show_menu = False
+    main.esperando_respawn = False
+
+
+def test_auto_shot_kill_is_heard(game):
+    # El Wumpus en (2, 0) y el agente al lado, sabiendo dónde está: dispara solo
+    cells = bytearray(25)
+    cells[0] = ENTRANCE
+    cells[10] = WUMPUS
+    cells[24] = TREASURE
+    start(game, cells, pos=(1, 0))
+    game.agent.wumpus_target = (2, 0)
+
+    assert game.auto_step()
+    assert not game.agent.has_arrow
+    assert not game.board.wumpus_alive
+    assert game.heard_scream
+    assert "Grito" in game.message
+
+    # La percepción siguiente trae el grito: el modelo da al Wumpus por muerto
+    game.auto_step()
+    assert game.agent.hazards.wumpus_dead
+
+
+def _pit_ahead(main):
+    # Pozo en (0, 2) con el agente al lado, en (0, 1)
+    cells = bytearray(25)
+    cells[0] = ENTRANCE
+    cells[2] = PIT
+    cells[20] = WUMPUS
+    cells[24] = TREASURE
+    start(main, cells, pos=(0, 1))
+
+
+def _wait_for(event_type, ms):
+    event = pygame.event.wait(ms)
+    while event.type not in (event_type, pygame.NOEVENT):
+        event = pygame.event.wait(ms)
+    return event.type == event_type
+
+
+def test_death_schedules_a_single_respawn(game, monkeypatch):
+    monkeypatch.setattr(game, 'PAUSA_MUERTE', 20)
+    _pit_ahead(game)
+    pygame.event.clear()
+    game.apply_action(MOVE_ACTIONS['RIGHT'])
+    # Se muestra la muerte en el pozo hasta que llega RESPAWN, sin bloquear el bucle
+    assert game.esperando_respawn
+    assert game.agent.get_position() == (0, 2) and game.agent.lives == 1
+    assert "pozo" in game.message
+    assert _wait_for(game.RESPAWN, 500)
+    game.respawn()
+    assert not game.esperando_respawn
+    assert game.agent.get_position() == (0, 0) and game.message == ""
+    # El temporizador es de una sola vez
+    assert not _wait_for(game.RESPAWN, 60)
+
+
+def test_turbo_death_respawns_at_once(game):
+    _pit_ahead(game)
+    pygame.event.clear()
+    game.apply_action(MOVE_ACTIONS['RIGHT'], turbo=True)
+    assert not game.esperando_respawn
+    assert game.agent.get_position() == (0, 0) and game.agent.lives == 1
+    assert not _wait_for(game.RESPAWN, 60)
+
+
+def test_turbo_steps_end_a_pending_respawn(game, monkeypatch):
+    monkeypatch.setattr(game, 'PAUSA_MUERTE', 10_000)
+    _pit_ahead(game)
+    game.apply_action(MOVE_ACTIONS['RIGHT'])
+    assert game.esperando_respawn
+    game.run_steps(4)
+    assert not game.esperando_respawn
+    assert game.agent.get_position() != (0, 2)
+    pygame.time.set_timer(game.RESPAWN, 0)
+
+
+def test_auto_timer_never_beats_the_frame_rate(game, monkeypatch):
+    monkeypatch.setattr(game, 'velocidad', 1)
+    assert game.intervalo_auto_move() == 1000
+    monkeypatch.setattr(game, 'velocidad', game.VELOCIDAD_MAX)
+    assert game.intervalo_auto_move() == game.CUADRO_MS
+
+
+@pytest.mark.parametrize('size', [3, 9, 40])
+def test_other_sizes_play_in_the_window(size):
+    # La ventana se arma para el lado pedido y la partida automática llega al final
+    main.configure(main.parse_args(['--tam', str(size), '--pozos', '2', '--vidas', '3', '--sin-sonido']))
+    main.open_window()
+    try:
+        (main.board, main.agent, main.heard_scream, main.message, main.running,
+         main.peligros_revelados, main.show_menu) = main.reset_vars()
+        main.esperando_respawn = False
+        assert (main.board.size, main.board.n_pits, main.agent.lives) == (size, 2, 3)
+        assert main.WINDOW_SIZE <= main.BOARD_PIXELS
+        main.draw_frame(main.window, main.board, main.agent, main.peligros_revelados,
+                        main.message, main.show_menu)
+        main.run_to_end()
+        assert not main.running or main.message
+        main.draw_frame(main.window, main.board, main.agent, main.peligros_revelados,
+                        main.message, main.show_menu)
+    finally:
+        pygame.quit()
@@ -0,0 +1,102 @@
+# tests/test_metrics.py
+
+import json
+import math
+import re
+
+import pytest
+
+from src import metrics
+from src.simulation import simulate
+
+_SAMPLE = re.compile(r'^(wumpus_call_seconds_(?:bucket|sum|count))\{([^}]*)\} (\S+)$')
+
+
+@pytest.fixture
+def registry():
+    registry = metrics.Registry()
+    yield registry
+    metrics.disable()
+
+
+def _current(owner, attr):
+    return owner.__dict__[attr] if isinstance(owner, type) else getattr(owner, attr)
+
+
+def test_disable_restores_originals(registry):
+    paths = metrics._hot_paths()
+    originals = {(owner, attr): _current(owner, attr) for owner, attr, _ in paths}
+    metrics.enable(registry)
+    assert metrics.enabled()
+    for owner, attr, _ in paths:
+        assert _current(owner, attr) is not originals[(owner, attr)]
+    # Medir dos veces no envuelve dos veces
+    wrapped = {key: _current(*key) for key in originals}
+    metrics.enable(registry)
+    assert all(_current(*key) is fn for key, fn in wrapped.items())
+    simulate(5, seed=0)
+    assert registry.histograms['agent.auto_move'].count > 0
+    metrics.disable()
+    assert not metrics.enabled()
+    for key, original in originals.items():
+        assert _current(*key) is original
+
+
+def test_instrument_module_function_and_exceptions(registry):
+    import src.rules as rules
+    originals = rules.is_over, rules.position
+    metrics.instrument(rules, 'is_over', 'rules.is_over', registry)
+    metrics.instrument(rules, 'position', 'rules.position', registry)
+    assert rules.is_over(0) and rules.position(7, 5) == (1, 2)
+    with pytest.raises(TypeError):
+        rules.position()
+    assert registry.histograms['rules.position'].count == 2
+    metrics.disable()
+    assert (rules.is_over, rules.position) == originals
+
+
+def _measured(registry):
+    metrics.enable(registry)
+    simulate(20, seed=1)
+    metrics.disable()
+    return registry
+
+
+def test_prometheus_export_is_well_formed(registry):
+    text = _measured(registry).to_prometheus()
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    assert lines[0].startswith('# HELP wumpus_call_seconds ')
+    assert lines[1] == '# TYPE wumpus_call_seconds histogram'
+    series = {}
+    for line in lines[2:]:
+        match = _SAMPLE.match(line)
+        assert match, line
+        metric, labels, value = match.groups()
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+        series.setdefault(labels['op'], []).append((metric, labels.get('le'), float(value)))
+    assert set(series) == set(registry.histograms)
+    for op, samples in series.items():
+        buckets = [(le, v) for metric, le, v in samples if metric.endswith('_bucket')]
+        counts = [v for _, v in buckets]
+        assert counts == sorted(counts)  # Acumulados
+        assert buckets[-1][0] == '+Inf'
+        assert all(float(le) < float(next_le) for (le, _), (next_le, _) in zip(buckets, buckets[1:]))
+        total = {metric: v for metric, _, v in samples if not metric.endswith('_bucket')}
+        assert total['wumpus_call_seconds_count'] == counts[-1] == registry.histograms[op].count
+        assert math.isclose(total['wumpus_call_seconds_sum'], registry.histograms[op].sum)
+
+
+def test_json_export_is_well_formed(registry, tmp_path):
+    _measured(registry)
+    json_path, prom_path = metrics.export(str(tmp_path / 'metricas'), registry)
+    with open(json_path, encoding='utf-8') as f:
+        data = json.load(f)
+    with open(prom_path, encoding='utf-8') as f:
+        assert f.read() == registry.to_prometheus()
+    assert data == json.loads(registry.to_json())
+    assert data['agent.auto_move']['count'] > 0
+    for h in data.values():
+        assert sum(h['buckets'].values()) == h['count']
+        assert h['p50'] <= h['p90'] <= h['p99']
+        assert math.isclose(h['mean'] * h['count'], h['sum'])
@@ -0,0 +1,95 @@
+# tests/test_planner.py
+
+import random
+from collections import deque
+
+import pytest
+
+from src.planner import MOVES, DistanceField, Planner
+
+
+def _bfs(planner, goals):
+    # Distancias recalculadas desde cero sobre las casillas transitables
+    dist = {g: 0 for g in goals if g in planner.passable}
+    queue = deque(dist)
+    while queue:
+        cell = queue.popleft()
+        for n in planner.neighbors(cell):
+            if n in planner.passable and n not in dist:
+                dist[n] = dist[cell] + 1
+                queue.append(n)
+    return dist
+
+
+def _walk(pos, route):
+    offsets = {direction: (dx, dy) for direction, dx, dy in MOVES}
+    for direction in route:
+        dx, dy = offsets[direction]
+        pos = pos[0] + dx, pos[1] + dy
+        yield pos
+
+
+def _planner(size, cells):
+    planner = Planner(size)
+    for pos in cells:
+        planner.cell_known(pos)
+    return planner
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_incremental_field_matches_bfs(seed):
+    rng = random.Random(seed)
+    size = 12
+    planner = Planner(size)
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    rng.shuffle(cells)
+    for i, pos in enumerate(cells[:100]):
+        planner.cell_known(pos)
+        if i % 10 == 0:
+            planner.step_to_target((0, 0), cells[i], 'explore')
+            assert planner.exit_field.dist == _bfs(planner, {(0, 0)})
+    target, field = planner.target_fields['explore']
+    assert field.dist == _bfs(planner, set(planner.neighbors(target)))
+
+
+def test_route_is_shortest_and_stays_on_known_cells():
+    # Un pasillo en U: la salida queda a 2 columnas pero el único camino da la vuelta
+    cells = [(x, 0) for x in range(5)] + [(4, y) for y in range(5)] + [(x, 4) for x in range(5)]
+    planner = _planner(5, cells)
+    route = planner.route_to_exit((0, 4))
+    assert len(route) == 12
+    walked = list(_walk((0, 4), route))
+    assert walked[-1] == (0, 0)
+    assert all(pos in planner.passable for pos in walked)
+    assert planner.step_to_exit((0, 0)) is None
+
+
+def test_blocked_cell_reroutes_or_stalls():
+    # Dos caminos hacia la salida; bloquear el corto obliga a rodear, bloquear ambos traba
+    cells = [(0, y) for y in range(4)] + [(x, 3) for x in range(4)] + [(3, y) for y in range(4)]
+    cells += [(x, 0) for x in range(4)]
+    planner = _planner(4, cells)
+    assert planner.route_to_exit((0, 3)) == ['LEFT'] * 3
+    planner.cell_blocked((0, 1))
+    assert planner.exit_field.dist == _bfs(planner, {(0, 0)})
+    route = planner.route_to_exit((0, 3))
+    assert len(route) == 9 and (0, 1) not in _walk((0, 3), route)
+    planner.cell_blocked((2, 0))
+    assert planner.step_to_exit((0, 3)) is None
+    assert planner.route_to_exit((0, 3)) == []
+    # Una casilla bloqueada no vuelve a ser transitable aunque se la vea segura
+    planner.cell_known((2, 0))
+    assert (2, 0) not in planner.passable and planner.step_to_exit((0, 3)) is None
+
+
+def test_target_field_is_reused_until_the_target_changes():
+    planner = _planner(5, [(0, y) for y in range(5)] + [(1, 4)])
+    assert planner.step_to_target((0, 0), (2, 4)) == 'RIGHT'
+    field = planner.target_fields['hunt'][1]
+    planner.cell_known((1, 3))
+    assert planner.target_fields['hunt'][1] is field
+    assert field.dist == _bfs(planner, set(planner.neighbors((2, 4))))
+    planner.step_to_target((0, 4), (2, 0))
+    assert planner.target_fields['hunt'][1] is not field
+    # Sin conexión con el objetivo no hay paso
+    assert DistanceField(planner, {(4, 4)}).next_step((0, 0)) is None
@@ -0,0 +1,37 @@
+# tests/test_policytable.py
+
+import pytest
+
+from src.agent import Agent
+from src.policytable import default_path, default_table, write_table
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    default_table.cache_clear()
+    yield
+    default_table.cache_clear()
+
+
+def test_default_table_matches_the_whole_header(cache):
+    write_table({1: 0}, default_path(5), size=5, n_pits=3, lives=2)
+    assert default_table(5, 3, 2) is not None
+    assert default_table(5, 4, 2) is None
+    assert default_table(5, 3, 3) is None
+    assert Agent(5, 3, reasoning='table', n_pits=3).table is None
+
+
+def test_second_death_in_a_cell_keeps_the_key():
+    agent = Agent(5, 3, reasoning='table', table={})
+    agent.record_death((2, 2), by_wumpus=False)
+    key = agent.key
+    assert key
+    agent.record_death((2, 2), by_wumpus=False)
+    assert agent.key == key
+
+
+def test_agent_finds_the_default_table(cache):
+    write_table({1: 0}, default_path(5), size=5, n_pits=3, lives=2)
+    assert Agent(5, 2, reasoning='table').table is not None
+    assert Agent(5, 2, reasoning='table', n_pits=4).table is None
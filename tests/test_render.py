@@ -0,0 +1,138 @@
+# tests/test_render.py
+#
+# GridRenderer a través del bucle de main.py, con el driver de video dummy.
+
+import os
+import random
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+
+import main
+from src.render import TextCache
+
+
+@pytest.fixture
+def game():
+    main.configure(main.parse_args(['--tam', '12', '--sin-sonido']))
+    main.open_window()
+    random.seed(3)
+    (main.board, main.agent, main.heard_scream, main.message, main.running,
+     main.peligros_revelados, main.show_menu) = main.reset_vars()
+    main.modo_auto_juego = True
+    yield main
+    pygame.quit()
+
+
+def draw(main):
+    main.draw_frame(main.window, main.board, main.agent, main.peligros_revelados,
+                    main.message, main.show_menu)
+
+
+def test_turbo_shows_every_visited_cell(game):
+    # Varios pasos por cuadro: las casillas que el agente pisó entre dos
+    # cuadros también se destapan
+    draw(game)
+    for _ in range(30):
+        game.run_steps(8)
+        draw(game)
+    assert set(game.agent.visited) <= set(game.renderer.shown)
+
+
+def test_recenter_then_zoom_and_pan(game):
+    # C deja la cámara centrada en el agente y se puede seguir usando enseguida
+    draw(game)
+    renderer = game.renderer
+    renderer.pan(200, 200)
+    renderer.recenter()
+    assert renderer.follow
+    renderer.zoom(1)
+    renderer.recenter()
+    renderer.pan(-10, 5)
+    draw(game)
+    assert not renderer.follow
+
+
+def _view_pixels(main):
+    return pygame.image.tobytes(main.window.subsurface(main.renderer.view), 'RGB')
+
+
+def test_dirty_rects_match_a_full_redraw(game):
+    renderer = game.renderer
+    assert renderer.draw(game.window, game.board, game.agent, game.peligros_revelados) == [renderer.view]
+    # Sin cambios no se toca nada
+    assert renderer.draw(game.window, game.board, game.agent, game.peligros_revelados) == []
+    for _ in range(40):
+        before = game.agent.get_position()
+        if not game.running or not game.auto_step(turbo=True):
+            break
+        rects = renderer.draw(game.window, game.board, game.agent, game.peligros_revelados)
+        after = game.agent.get_position()
+        if renderer.view in rects or after == before:
+            continue  # La cámara se movió (se pegó la vista entera) o el agente no
+        c, (ox, oy) = renderer.cell_size, renderer.offset
+        for pos in (before, after):
+            cell = pygame.Rect(pos[1] * c - ox, pos[0] * c - oy, c, c).clip(renderer.view)
+            assert not cell or any(rect.contains(cell) for rect in rects)
+        assert len(rects) <= 4
+    incremental = _view_pixels(game)
+    renderer.invalidate()
+    assert renderer.draw(game.window, game.board, game.agent, game.peligros_revelados) == [renderer.view]
+    assert _view_pixels(game) == incremental
+
+
+def test_camera_moves_and_resets_redraw_the_view(game):
+    renderer = game.renderer
+    draw(game)
+    renderer.zoom(2)
+    assert renderer.draw(game.window, game.board, game.agent, game.peligros_revelados) == [renderer.view]
+    renderer.pan(renderer.cell_size, 0)
+    assert renderer.draw(game.window, game.board, game.agent, game.peligros_revelados) == [renderer.view]
+    # Una partida nueva (otro tablero y agente) también redibuja todo
+    (game.board, game.agent, *_) = game.reset_vars()
+    assert renderer.draw(game.window, game.board, game.agent, set()) == [renderer.view]
+    assert renderer.draw(game.window, game.board, game.agent, set()) == []
+
+
+class _Font:
+    # Fuente de prueba que cuenta cuántas veces rasteriza
+    def __init__(self):
+        self.calls = []
+
+    def render(self, text, antialias, color):
+        self.calls.append((text, color))
+        return pygame.Surface((len(text) + 1, 10))
+
+
+def test_text_cache_hits_and_misses():
+    font, other = _Font(), _Font()
+    cache = TextCache(maxsize=3)
+    first = cache.render(font, 'Vidas: 2', (0, 0, 0))
+    assert cache.render(font, 'Vidas: 2', (0, 0, 0)) is first
+    assert len(font.calls) == 1
+    # Otro color u otra fuente es otra clave
+    cache.render(font, 'Vidas: 2', (255, 0, 0))
+    cache.render(other, 'Vidas: 2', (0, 0, 0))
+    assert len(font.calls) == 2 and len(other.calls) == 1
+    # Al pasar de maxsize se va el menos usado: 'Vidas: 2' en negro se usó recién
+    cache.render(font, 'Vidas: 2', (0, 0, 0))
+    cache.render(font, 'Vidas: 1', (0, 0, 0))
+    assert len(cache.surfaces) == 3
+    assert ('Vidas: 2', font, (255, 0, 0)) not in cache.surfaces
+    assert cache.render(font, 'Vidas: 2', (0, 0, 0)) is first
+
+
+def test_status_panel_redraws_only_on_change(game):
+    game.status_key = None
+    assert game.draw_status(game.window, game.agent, 'Hola', False)
+    misses = len(game.text_cache.surfaces)
+    assert not game.draw_status(game.window, game.agent, 'Hola', False)
+    game.agent.lives -= 1
+    assert game.draw_status(game.window, game.agent, 'Hola', False)
+    # Volver a un estado ya visto sale de la cache
+    game.agent.lives += 1
+    assert game.draw_status(game.window, game.agent, 'Hola', False)
+    assert len(game.text_cache.surfaces) == misses + 1
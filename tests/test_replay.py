@@ -0,0 +1,95 @@
+# tests/test_replay.py
+
+import random
+
+import pytest
+
+from src.agent import Agent
+from src.board import Board
+from src.replay import (INDICES_32, HEADER, ReplayLog, ReplayWriter, _segments, encode_episode,
+                        record_episodes)
+from src.simulation import run_episode
+
+
+def _seeded(i):
+    # Episodio 5x5 guardado como semilla, con los mismos generadores que record_episodes
+    board = Board(5, None, rng=random.Random(i))
+    return board, Agent(5, 2, rng=random.Random(~i), n_pits=board.n_pits)
+
+
+def _play(board, agent, max_steps=None):
+    actions = []
+    initial = bytearray(board.cells)
+    result = run_episode(board, agent, max_steps, actions)
+    return result, actions, initial
+
+
+def _write(directory, n):
+    # Casi todos 5x5 (por semilla o por posiciones, 6x6 con 3 vidas cada tanto) y
+    # cada 35 uno de 300x300, que necesita índices de 32 bits
+    expected = []
+    with ReplayWriter(directory, segment_bytes=4096) as writer:
+        for i in range(n):
+            if i % 35 == 34:
+                board = Board(300, rng=random.Random(i))
+                agent = Agent(300, 2, rng=random.Random(i), reasoning='basic')
+                result, actions, initial = _play(board, agent, max_steps=200)
+                writer.add(encode_episode(300, 2, result.won, actions,
+                                          board=Board(300, layout=bytearray(initial))))
+                expected.append((None, 300, 2, result, actions, initial))
+            elif i % 3:
+                result, actions, initial = _play(*_seeded(i))
+                writer.add(encode_episode(5, 2, result.won, actions, seed=i, n_pits=3))
+                expected.append((i, 5, 2, result, actions, initial))
+            else:
+                board = Board(6, rng=random.Random(i))
+                agent = Agent(6, 3, rng=random.Random(i), n_pits=board.n_pits)
+                initial = bytearray(board.cells)
+                result = writer.record(board, agent)
+                expected.append((None, 6, 3, result, None, initial))
+    return expected
+
+
+def test_round_trip_across_segments(tmp_path):
+    expected = _write(str(tmp_path), 350)
+    assert len(_segments(str(tmp_path))) > 10
+    with ReplayLog(str(tmp_path)) as log:
+        assert len(log) == 350
+        records = list(log)
+        for k, (record, (seed, size, lives, result, actions, initial)) in enumerate(
+                zip(records, expected)):
+            assert (record.seed, record.size, record.lives, record.won) == (seed, size, lives, result.won)
+            assert bool(HEADER.unpack_from(record.data)[3] & INDICES_32) == (size == 300)
+            assert record.board().cells == initial
+            if actions is not None:
+                assert record.n_actions == len(actions) and list(record.actions()) == actions
+            replayed = record.replay()
+            assert (replayed.won, replayed.lives, replayed.arrow_used) == \
+                (result.won, result.lives, result.arrow_used)
+            if result.won:
+                assert replayed.steps == result.steps
+            # Acceso directo, también desde el final
+            assert bytes(log[k].data) == bytes(record.data)
+            assert bytes(log[k - 350].data) == bytes(record.data)
+        with pytest.raises(IndexError):
+            log[350]
+        del records, record
+
+
+def test_writer_appends_to_an_existing_log(tmp_path):
+    directory = str(tmp_path)
+    wins = record_episodes(directory, 20, seed=5)
+    segments = _segments(directory)
+    wins += record_episodes(directory, 15, seed=25)
+    assert _segments(directory) == segments
+    with ReplayLog(directory) as log:
+        assert len(log) == 35
+        assert [log[k].seed for k in range(35)] == list(range(5, 40))
+        assert sum(record.won for record in log) == wins
+
+
+def test_reader_rejects_a_foreign_segment(tmp_path):
+    (tmp_path / 'seg-000000.rpl').write_bytes(b'no es un log')
+    (tmp_path / 'seg-000000.idx').write_bytes(bytes(8))
+    with pytest.raises(ValueError):
+        ReplayLog(str(tmp_path))
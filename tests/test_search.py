@@ -0,0 +1,46 @@
+# tests/test_search.py
+
+import random
+
+from src.agent import Agent
+from src.board import Board, DANGER_HERE
+from src.search import SearchPolicy
+from src.simulation import run_episode
+
+
+def _played(size, seed, steps):
+    # Un agente de búsqueda a medio jugar en un tablero de size x size
+    rng = random.Random(seed)
+    board = Board(size, rng=rng)
+    agent = Agent(size, rng=rng, reasoning='search')
+    run_episode(board, agent, max_steps=steps)
+    return board, agent
+
+
+def test_particles_agree_with_observations():
+    board, agent = _played(16, 3, 60)
+    hazards, size = agent.hazards, agent.size
+    index = lambda pos: pos[0] * size + pos[1]
+    visited = sum(1 << index(p) for p in agent.visited if p not in agent.danger_cells)
+    policy = SearchPolicy(size, random.Random(1))
+    particles = policy.sample(hazards, visited)
+    assert len(particles) == policy.n_particles
+    for pits, wumpus, treasure in particles:
+        for pos in hazards.no_pit:
+            assert not pits >> index(pos) & 1
+        for pos in hazards.pits:
+            assert pits >> index(pos) & 1
+        for b in hazards.breezes:
+            assert any(pits >> index(n) & 1 for n in hazards.neighbors(b))
+        assert wumpus == -1 or hazards.wumpus_possible(divmod(wumpus, size))
+        assert treasure != wumpus and not pits >> treasure & 1
+
+
+def test_node_budget_is_deterministic_on_big_boards():
+    # El presupuesto en nodos cuenta las casillas evaluadas: la misma semilla
+    # da las mismas jugadas aunque el tablero sea grande
+    first = _played(16, 7, 120)[1]
+    second = _played(16, 7, 120)[1]
+    assert first.search.searches > 0
+    assert first.get_position() == second.get_position()
+    assert set(first.visited) == set(second.visited)
@@ -0,0 +1,92 @@
+# tests/test_server.py
+#
+# Sesiones reales contra GameServer en un puerto libre (el que elija el sistema).
+
+import asyncio
+
+from src.board import Board, ENTRANCE, WUMPUS, TREASURE, PIT
+from src.game import Game, Player
+from src.server import GameServer
+
+
+class FixedServer(GameServer):
+    # Siempre el mismo tablero: tesoro en (0, 2), Wumpus en (4, 4), pozo en (2, 0)
+    def new_game(self):
+        cells = bytearray(25)
+        cells[0] = ENTRANCE
+        cells[2] = TREASURE
+        cells[24] = WUMPUS
+        cells[10] = PIT
+        return Game(board=Board(5, layout=cells), agent=Player(5, self.lives))
+
+
+async def _turn(reader):
+    # Líneas de un turno, hasta ESTADO o FIN inclusive
+    lines = []
+    while True:
+        line = (await reader.readline()).decode().rstrip("\n")
+        lines.append(line)
+        if not line or line.startswith(("ESTADO", "FIN")):
+            return lines
+
+
+def _session(commands, **options):
+    async def play():
+        server = FixedServer(**options)
+        await server.start('127.0.0.1', 0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            turns = [await _turn(reader)]
+            for command in commands:
+                writer.write(command.encode() + b"\n")
+                turns.append(await _turn(reader))
+            if not commands:
+                turns.append(await _turn(reader))
+            writer.close()
+        finally:
+            await server.close()
+        return turns
+    return asyncio.run(play())
+
+
+def test_session_wins():
+    turns = _session(['RIGHT', 'RIGHT', 'LEFT', 'LEFT'])
+    assert turns[0] == ["PERCEPCIONES ", "ESTADO 0 0 2 1 0"]
+    assert turns[2][-1] == "ESTADO 0 2 2 1 1"
+    assert "MENSAJE ¡Encontraste el tesoro!" in turns[2]
+    assert turns[4][-1] == "FIN GANASTE"
+
+
+def test_invalid_command_and_quit():
+    turns = _session(['JUMP', 'DOWN', 'Q'])
+    assert turns[1] == ["MENSAJE Acción inválida.", "PERCEPCIONES ", "ESTADO 0 0 2 1 0"]
+    assert turns[2][-1] == "ESTADO 1 0 2 1 0"
+    assert turns[2][0] == "PERCEPCIONES Viento"
+    assert turns[3] == ["FIN SALISTE"]
+
+
+def test_idle_session_is_closed():
+    turns = _session([], idle_timeout=0.2)
+    assert turns[1] == ["FIN INACTIVO"]
+
+
+def test_oversized_line_closes_the_session():
+    # Más de 64 KiB sin fin de línea: error, FIN y conexión cerrada
+    async def play():
+        server = FixedServer()
+        await server.start('127.0.0.1', 0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await _turn(reader)
+            writer.write(b"UP" * 40000 + b"\n")
+            turn = await _turn(reader)
+            closed = await reader.read() == b""
+            writer.close()
+            return turn, closed, len(server.sessions)
+        finally:
+            await server.close()
+    turn, closed, sessions = asyncio.run(play())
+    assert turn == ["MENSAJE Línea demasiado larga.", "FIN ERROR"]
+    assert closed and sessions == 0
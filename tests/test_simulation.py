@@ -0,0 +1,55 @@
+# tests/test_simulation.py
+
+import pytest
+
+from src.board import Board
+from src.simulation import max_steps_for, simulate, summarize
+
+
+def test_same_seed_same_results():
+    assert simulate(200, seed=4) == simulate(200, seed=4)
+
+
+def test_worlds_can_be_reused():
+    np = pytest.importorskip('numpy')
+    from src.worldgen import generate_worlds
+
+    worlds = generate_worlds(200, seed=3)
+    before = worlds.copy()
+    first = simulate(200, seed=1, worlds=worlds)
+    assert np.array_equal(worlds, before)
+    assert simulate(200, seed=1, worlds=worlds) == first
+    assert summarize(first)['wins'] > 150
+    # Cada mundo es un episodio: una cantidad distinta es un error, no un recorte
+    with pytest.raises(ValueError):
+        simulate(100, seed=1, worlds=worlds)
+    with pytest.raises(ValueError):
+        simulate(300, seed=1, worlds=worlds)
+
+
+def test_search_same_seed_same_results():
+    # El presupuesto de la búsqueda se cuenta en nodos: no depende del reloj
+    options = {'reasoning': 'search'}
+    assert simulate(200, seed=4, agent_options=options) == simulate(200, seed=4, agent_options=options)
+
+
+@pytest.mark.parametrize('reasoning', ['basic', 'probabilistic', 'logic'])
+@pytest.mark.parametrize('size', [3, 8, 16])
+def test_other_sizes_play_to_the_end(size, reasoning):
+    results = simulate(20, seed=size, size=size, lives=3, agent_options={'reasoning': reasoning})
+    assert all(0 <= r.lives <= 3 and 0 < r.steps <= max_steps_for(size) for r in results)
+    assert all(r.lives > 0 for r in results if r.won)
+    if reasoning != 'basic':
+        assert summarize(results)['wins'] > 0
+
+
+def test_worlds_of_other_sizes():
+    np = pytest.importorskip('numpy')
+    from src.worldgen import generate_worlds
+
+    worlds = generate_worlds(30, seed=2, size=9, n_pits=6)
+    assert worlds.shape == (30, 9, 9)
+    for world in worlds:
+        board = Board(layout=world.copy())
+        assert board.size == 9 and board.n_pits == 6
+    assert len(simulate(30, seed=2, worlds=worlds)) == 30
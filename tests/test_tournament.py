@@ -0,0 +1,41 @@
+# tests/test_tournament.py
+
+import pytest
+
+from src.tournament import TournamentStats, _tasks, run_batch, run_tournament
+
+
+def test_same_result_for_any_worker_count():
+    # Lotes de 40 con el último incompleto: el total depende de la semilla, no del pool
+    single = run_tournament(230, seed=7, workers=1, batch_size=40)
+    assert single.episodes == 230
+    for workers in (2, 3):
+        assert run_tournament(230, seed=7, workers=workers, batch_size=40) == single
+    assert run_tournament(230, seed=8, workers=1, batch_size=40) != single
+
+
+@pytest.mark.parametrize('options', [{'knowledge': 'bitboard'}, {'reasoning': 'logic'}])
+def test_agent_options_reach_the_workers(options):
+    kwargs = dict(seed=2, batch_size=25, size=6, n_pits=4, lives=2, agent_options=options)
+    single = run_tournament(60, workers=1, **kwargs)
+    assert run_tournament(60, workers=2, **kwargs) == single
+    assert set(single.lives_left) <= {0, 1, 2}
+
+
+def test_merge_order_does_not_matter():
+    parts = [run_batch(task) for task in _tasks(90, 5, 30, None, 5, None, 2, {})]
+    forward, backward = TournamentStats(), TournamentStats()
+    for part in parts:
+        forward.merge(part)
+    for part in reversed(parts):
+        backward.merge(part)
+    assert forward == backward
+    assert forward.episodes == 90 and sum(forward.lives_left.values()) == 90
+
+
+def test_on_batch_sees_the_running_total():
+    seen = []
+    total = run_tournament(100, seed=1, workers=2, batch_size=30,
+                           on_batch=lambda stats: seen.append(stats.episodes))
+    assert sorted(seen) == seen and len(seen) == 4
+    assert seen[-1] == total.episodes == 100
@@ -0,0 +1,76 @@
+# tests/test_vecenv.py
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from src.board import Board, ENTRANCE, PIT, WUMPUS, TREASURE, PIT_HERE, WUMPUS_HERE, TREASURE_HERE
+from src.rules import (SHOOT, SHOT, DIED, LOST, WON, HAS_ARROW, HAS_TREASURE, initial_state,
+                       lives_of, percept_flags, position, step)
+from src.vecenv import (OBS_SIZE, RECOMPENSA_FLECHA, RECOMPENSA_MUERTE, RECOMPENSA_PASO,
+                        RECOMPENSA_VICTORIA, VectorEnv)
+
+
+def _board(env, i):
+    # Tablero de src.board con el mundo que el entorno i tiene recién cargado
+    cells = bytearray(env.size * env.size)
+    for cell, flags in enumerate(env.percepts[i]):
+        if flags & PIT_HERE:
+            cells[cell] = PIT
+        elif flags & WUMPUS_HERE:
+            cells[cell] = WUMPUS
+        elif flags & TREASURE_HERE:
+            cells[cell] = TREASURE
+    cells[0] = ENTRANCE
+    return Board(env.size, layout=cells)
+
+
+def _observation(board, state):
+    x, y = position(state, board.size)
+    return [percept_flags(board, state), x, y, lives_of(state),
+            bool(state & HAS_ARROW), bool(state & HAS_TREASURE)]
+
+
+def _reward(events):
+    return (RECOMPENSA_PASO + RECOMPENSA_FLECHA * bool(events & SHOT)
+            + RECOMPENSA_MUERTE * bool(events & DIED) + RECOMPENSA_VICTORIA * bool(events & WON))
+
+
+@pytest.mark.parametrize('size', [4, 5, 9])
+def test_step_matches_rules(size):
+    n, max_steps = 32, 60
+    env = VectorEnv(n, size=size, seed=size, max_steps=max_steps, pool=50)
+    obs = env.reset()
+    boards = [_board(env, i) for i in range(n)]
+    states = [initial_state(env.lives0)] * n
+    steps = [0] * n
+    for i in range(n):
+        assert obs[i].tolist() == _observation(boards[i], states[i])
+    rng = np.random.default_rng(size)
+    finished_any = False
+    for _ in range(400):
+        actions = rng.integers(0, SHOOT + 4, size=n)
+        obs, rewards, terminated, truncated, info = env.step(actions)
+        assert obs.shape == (n, OBS_SIZE)
+        for i in range(n):
+            states[i], events = step(boards[i], states[i], int(actions[i]))
+            steps[i] += 1
+            over = bool(events & (LOST | WON))
+            assert rewards[i] == _reward(events)
+            assert bool(info['won'][i]) == bool(events & WON)
+            assert bool(terminated[i]) == over
+            assert bool(truncated[i]) == (not over and steps[i] >= max_steps)
+            expected = _observation(boards[i], states[i])
+            if terminated[i] or truncated[i]:
+                finished_any = True
+                assert info['_final_observation'][i]
+                assert info['final_observation'][i].tolist() == expected
+                assert info['final_reward'][i] == rewards[i]
+                boards[i] = _board(env, i)
+                states[i] = initial_state(env.lives0)
+                steps[i] = 0
+                expected = _observation(boards[i], states[i])
+            elif 'final_observation' in info:
+                assert not info['_final_observation'][i] and info['final_reward'][i] == 0
+            assert obs[i].tolist() == expected
+    assert finished_any